@@ -0,0 +1,184 @@
+"""Regenerate the calendar pages in benchmarks/fixtures.
+
+The pages follow the markup of the live calendars (the four sites share one
+layout): a page shell with scripts and navigation around a `calendar__table`.
+Each new day starts with a `calendar__row--new-day` row, and the time cell is
+left empty for later events in the same slot. Content is pseudo-random
+with a fixed seed, so regenerating gives byte-identical files.
+Row counts are close to real pages: a busy day, a full week and a month.
+
+    python -m benchmarks.make_fixtures
+"""
+
+import gzip
+import os
+import random
+from datetime import date, timedelta
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# site -> (host, impact icon prefix, currencies)
+SITES = {
+    "forexfactory": (
+        "www.forexfactory.com",
+        "ff",
+        ("USD", "EUR", "GBP", "JPY", "AUD", "NZD", "CAD", "CHF", "CNY"),
+    ),
+    "cryptocraft": (
+        "www.cryptocraft.com",
+        "cc",
+        ("BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "USDT", "BNB"),
+    ),
+    "energyexch": (
+        "www.energyexch.com",
+        "ee",
+        ("OIL", "GAS", "USD", "EUR", "CNY", "NGL"),
+    ),
+    "metalsmine": (
+        "www.metalsmine.com",
+        "mm",
+        ("XAU", "XAG", "XPT", "XPD", "CU", "USD", "CNY"),
+    ),
+}
+
+# timeline -> (page date, days covered, events per day range)
+TIMELINES = {
+    "day": (date(2024, 3, 6), 1, (18, 18)),
+    "week": (date(2024, 3, 3), 7, (6, 22)),
+    "month": (date(2024, 3, 1), 31, (6, 22)),
+}
+
+EVENTS = (
+    "CPI m/m",
+    "Core CPI y/y",
+    "Non-Farm Employment Change",
+    "Unemployment Rate",
+    "Retail Sales m/m",
+    "GDP q/q",
+    "Manufacturing PMI",
+    "Services PMI",
+    "Trade Balance",
+    "Crude Oil Inventories",
+    "Natural Gas Storage",
+    "Interest Rate Decision",
+    "Press Conference",
+    "FOMC Member Speaks",
+    "Network Upgrade",
+    "Token Unlock",
+    "Building Permits",
+    "Consumer Confidence",
+    "PPI m/m",
+    "Bank Holiday",
+)
+IMPACTS = (("yel", "Low"), ("ora", "Medium"), ("red", "High"), ("gra", "Non-Economic"))
+MONTHS = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+WEEKDAYS = "Mon Tue Wed Thu Fri Sat Sun".split()
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} | Calendar</title>
+<script>window.calendarComponentStates = {{"1": {{"days": [], "time": 1709700000}}}};
+for (var i = 0; i < 10; i++) {{ if (i < 5 && window.x) {{ console.log("<td>" + i); }} }}</script>
+<link rel="stylesheet" href="/assets/css/site.css"></head>
+<body><header><nav><table class="navigation"><tr><td><a href="/">Home</a></td>
+<td><a href="/forums">Forums</a></td><td><a href="/calendar">Calendar</a></td></tr></table></nav></header>
+<div class="calendar__control"><a class="calendar__control--prev" href="#">Prev</a></div>
+"""
+PAGE_FOOT = """<div class="footer"><p>Times shown in GMT.</p>
+<script>document.querySelectorAll("tr").forEach(function (r) {{ r.dataset.seen = 1; }});</script>
+</div></body></html>
+"""
+
+
+def _time_text(minutes):
+    hour, minute = divmod(minutes, 60)
+    suffix = "am" if hour < 12 else "pm"
+    return f"{(hour % 12) or 12}:{minute:02d}{suffix}"
+
+
+def _value(rng, suffix):
+    return f"{rng.uniform(-5, 300):.1f}{suffix}" if rng.random() < 0.8 else ""
+
+
+def _event_row(rng, event_id, day, new_day, time_text, currencies, icon):
+    impact_class, impact_title = rng.choice(IMPACTS)
+    suffix = rng.choice(("%", "K", "B", "M", ""))
+    actual = _value(rng, suffix) if rng.random() < 0.6 else ""
+    classes = "calendar__row calendar__row--new-day" if new_day else "calendar__row"
+    date_cell = (
+        f'<span class="date">{WEEKDAYS[day.weekday()]} <span>{MONTHS[day.month - 1]} {day.day}</span></span>'
+        if new_day
+        else ""
+    )
+    return (
+        f'<tr data-event-id="{event_id}" class="{classes}">'
+        f'<td class="calendar__cell calendar__date">{date_cell}</td>'
+        f'<td class="calendar__cell calendar__time"><div>{time_text}</div></td>'
+        f'<td class="calendar__cell calendar__currency">{rng.choice(currencies)}</td>'
+        f'<td class="calendar__cell calendar__impact"><span title="{impact_title} Impact Expected"'
+        f' class="icon icon--{icon}-impact-{impact_class}"></span></td>'
+        f'<td class="calendar__cell calendar__event event"><div class="calendar__event-title">'
+        f"{rng.choice(EVENTS)}</div></td>"
+        f'<td class="calendar__cell calendar__detail"><a class="calendar__detail-link" title="Open Detail"></a></td>'
+        f'<td class="calendar__cell calendar__actual"><span class="better">{actual}</span></td>'
+        f'<td class="calendar__cell calendar__forecast">{_value(rng, suffix)}</td>'
+        f'<td class="calendar__cell calendar__previous">{_value(rng, suffix)}</td>'
+        '<td class="calendar__cell calendar__graph"><a class="calendar__graph-link"></a></td>'
+        "</tr>\n"
+    )
+
+
+def build_page(site, timeline, seed=0):
+    """Return (url, html, expected row count) for one fixture page."""
+    host, icon, currencies = SITES[site]
+    start, days, (low, high) = TIMELINES[timeline]
+    rng = random.Random(f"{site}-{timeline}-{seed}")
+    if timeline == "month":
+        url = f"https://{host}/calendar?month={MONTHS[start.month - 1]}.{start.year}"
+    else:
+        url = f"https://{host}/calendar?{timeline}={MONTHS[start.month - 1]}{start.day}.{start.year}"
+
+    rows = []
+    event_id = 140000
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        count = rng.randint(low, high)
+        slots = sorted(rng.sample(range(0, 24 * 60, 15), count))
+        previous_slot = None
+        for i, slot in enumerate(slots):
+            # consecutive events often share a slot; the site prints the time once
+            if previous_slot is not None and rng.random() < 0.3:
+                slot = previous_slot
+            time_text = "" if slot == previous_slot else _time_text(slot)
+            event_id += 1
+            rows.append(
+                _event_row(rng, event_id, day, i == 0, time_text, currencies, icon)
+            )
+            previous_slot = slot
+
+    table = (
+        '<table class="calendar__table calendar__table--no-event">\n'
+        '<thead><tr class="calendar__header"><th>Date</th><th>Time</th><th>Cur.</th><th>Impact</th>'
+        "<th>Event</th><th></th><th>Actual</th><th>Forecast</th><th>Previous</th><th>Graph</th></tr></thead>\n"
+        f"<tbody>\n{''.join(rows)}</tbody>\n</table>\n"
+    )
+    html = PAGE_HEAD.format(title=site) + table + PAGE_FOOT.format()
+    return url, html, len(rows)
+
+
+def fixture_path(site, timeline):
+    return os.path.join(FIXTURE_DIR, f"{site}_{timeline}.html.gz")
+
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for site in SITES:
+        for timeline in TIMELINES:
+            url, html, rows = build_page(site, timeline)
+            # mtime=0 keeps the gzip bytes reproducible
+            with open(fixture_path(site, timeline), "wb") as fh:
+                fh.write(gzip.compress(html.encode("utf-8"), mtime=0))
+            print(f"{site}_{timeline}: {rows} rows, {len(html) / 1024:.0f} KiB  {url}")
+
+
+if __name__ == "__main__":
+    main()
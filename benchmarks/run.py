@@ -0,0 +1,238 @@
+"""Parser benchmarks over the checked-in fixture pages.
+
+For every fixture (four sites x day/week/month) this times
+`parse_calendar_from_html` and reports latency percentiles, rows/s and peak
+traced memory. Results can be saved as a baseline and later runs compared
+against it; the run fails (exit status 1) when a fixture is slower or uses
+more memory than the baseline beyond the allowed tolerance, or parses a
+different number of rows.
+
+    python -m benchmarks.run                         # print results
+    python -m benchmarks.run --save baseline.json    # record a baseline
+    python -m benchmarks.run --compare baseline.json # fail on regressions
+
+Timings depend on the machine, so record the baseline on the machine (or CI
+runner) the comparison runs on, e.g. from the main branch before a change.
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.make_fixtures import SITES, TIMELINES, build_page, fixture_path
+from src.scrapper._parser import parse_calendar_from_html
+
+DEFAULT_REPEAT = 30
+DEFAULT_TOLERANCE = 0.15  # allowed slow-down of p50
+DEFAULT_MEMORY_TOLERANCE = 0.10  # allowed growth of peak memory
+
+
+def load_fixtures(sites=None, timelines=None):
+    """Return [(name, url, html)] for the fixture pages, sites x timelines."""
+    fixtures = []
+    for site in sites or SITES:
+        for timeline in timelines or TIMELINES:
+            url = build_page(site, timeline)[0]
+            with gzip.open(fixture_path(site, timeline), "rt", encoding="utf-8") as fh:
+                fixtures.append((f"{site}_{timeline}", url, fh.read()))
+    return fixtures
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def bench_fixture(url, html, repeat=DEFAULT_REPEAT, warmup=3, backend=None):
+    """Time one page; returns a dict of latency (ms), rows/s and peak memory (KiB)."""
+
+    def parse():
+        return parse_calendar_from_html(html, url, backend=backend)
+
+    for _ in range(warmup):
+        rows = len(parse())
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parse()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # tracemalloc slows parsing down, so memory is measured in a separate run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parse()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    p50 = percentile(timings, 50)
+    return {
+        "rows": rows,
+        "html_kib": round(len(html) / 1024, 1),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "rows_per_s": round(rows / p50) if p50 else 0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(fixtures, repeat=DEFAULT_REPEAT, backend=None):
+    return {
+        name: bench_fixture(url, html, repeat=repeat, backend=backend)
+        for name, url, html in fixtures
+    }
+
+
+def compare(
+    results,
+    baseline,
+    tolerance=DEFAULT_TOLERANCE,
+    memory_tolerance=DEFAULT_MEMORY_TOLERANCE,
+):
+    """Return a list of regression messages (empty when within tolerance)."""
+    problems = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if res["rows"] != base["rows"]:
+            problems.append(
+                f"{name}: parsed {res['rows']} rows, baseline {base['rows']}"
+            )
+        if res["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            problems.append(
+                f"{name}: p50 {res['p50_ms']:.2f} ms vs baseline {base['p50_ms']:.2f} ms"
+                f" (+{res['p50_ms'] / base['p50_ms'] - 1:.0%}, allowed +{tolerance:.0%})"
+            )
+        if res["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance):
+            problems.append(
+                f"{name}: peak memory {res['peak_kib']:.0f} KiB vs baseline {base['peak_kib']:.0f} KiB"
+                f" (+{res['peak_kib'] / base['peak_kib'] - 1:.0%}, allowed +{memory_tolerance:.0%})"
+            )
+    return problems
+
+
+def format_table(results, baseline=None):
+    header = (
+        f"{'fixture':<20} {'rows':>5} {'KiB':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'rows/s':>8} {'peak KiB':>9}"
+    )
+    if baseline:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for name, res in results.items():
+        line = (
+            f"{name:<20} {res['rows']:>5} {res['html_kib']:>6.0f} {res['p50_ms']:>8.2f}"
+            f" {res['p95_ms']:>8.2f} {res['p99_ms']:>8.2f} {res['rows_per_s']:>8}"
+            f" {res['peak_kib']:>9.0f}"
+        )
+        base = (baseline or {}).get(name)
+        if base:
+            line += f" {res['p50_ms'] / base['p50_ms'] - 1:>+8.0%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the calendar parser on fixture pages.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT, help="timed parses per fixture"
+    )
+    parser.add_argument(
+        "--backend", default=None, help="parser backend (lxml or html.parser)"
+    )
+    parser.add_argument(
+        "--site",
+        action="append",
+        choices=sorted(SITES),
+        help="limit to a site (repeatable)",
+    )
+    parser.add_argument(
+        "--timeline",
+        action="append",
+        choices=list(TIMELINES),
+        help="limit to a page size (repeatable)",
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="write the results as a baseline JSON file"
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="baseline JSON to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed p50 slow-down as a fraction (default 0.15)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=DEFAULT_MEMORY_TOLERANCE,
+        help="allowed peak memory growth as a fraction (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+
+    results = run(
+        load_fixtures(args.site, args.timeline),
+        repeat=args.repeat,
+        backend=args.backend,
+    )
+    print(format_table(results, baseline))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                fh,
+                indent=2,
+                sort_keys=True,
+            )
+            fh.write("\n")
+        print(f"\nBaseline written to {os.path.relpath(args.save)}")
+
+    if baseline is not None:
+        problems = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        if problems:
+            print("\nREGRESSIONS:", file=sys.stderr)
+            for problem in problems:
+                print(f"  {problem}", file=sys.stderr)
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# Gunicorn configuration for production (`gunicorn -c gunicorn.conf.py src.wsgi:app`).
+# Values come from environment variables (or .env) with production-friendly defaults.
+#
+# `kill -HUP <master pid>` reloads this configuration and replaces the workers
+# gracefully, but with preload_app the new workers fork from the code already
+# loaded in the master. To deploy new code without dropping requests, send
+# `kill -USR2 <master pid>` (starts a new master and workers on the new code),
+# then `kill -QUIT <old master pid>` once the new workers are up.
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv(os.getenv("DOTENV_PATH") or None)
+
+from src.scrapper._utils import env_int  # noqa: E402  (after .env is loaded)
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{env_int('PORT', 5000)}"
+
+# Scraping is I/O-bound: (2 x CPU) + 1 workers, each with a few threads
+workers = env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = env_int("WORKER_THREADS", 4)
+worker_class = "gthread"
+
+# Import the app, scrapers, parser backend and session pool once in the master
+preload_app = True
+
+# Recycle workers after N requests (with jitter so they don't restart together)
+# to bound memory creep
+max_requests = env_int("MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("MAX_REQUESTS_JITTER", 100)
+
+# Upstream pages can be slow; give requests time, then drain gracefully
+timeout = env_int("WORKER_TIMEOUT", 60)
+graceful_timeout = env_int("GRACEFUL_TIMEOUT", 30)
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    # Sessions/locks inherited from the preloaded master must not be shared
+    from src.scrapper._http import session_pool
+    from src.scrapper._scheduler import start_prefetcher
+
+    session_pool.reset()
+    # threads don't survive fork; the workers elect one refresher (PREFETCH_LOCK_PATH)
+    start_prefetcher()
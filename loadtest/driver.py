@@ -0,0 +1,247 @@
+"""Open-loop load driver for the daily endpoints.
+
+Sends GET /api/<site>/daily at a fixed rate, whether or not earlier requests
+have finished. Latency is measured from each request's scheduled start, so
+queueing inside a saturated server shows up in the percentiles instead of
+quietly lowering the request rate. Reports throughput, p50/p95/p99 latency
+and a breakdown of failures, overall and per site.
+
+    python -m loadtest.driver --rps 50 --duration 30 --dates 5
+
+`--dates` spreads requests over that many distinct days (today and earlier)
+to control how often the record cache can answer.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+SITES = ("forex", "cryptocraft", "energyexch", "metalsmine")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class _Client:
+    """Keep-alive HTTP connection per driver thread."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self._conn_cls = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._netloc = parts.netloc
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def get(self, path):
+        """Return the response status; raises on connection errors and timeouts."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._conn_cls(self._netloc, timeout=self._timeout)
+            self._local.conn = conn
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status
+        except BaseException:
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def classify(exc):
+    if isinstance(exc, (socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(exc, ConnectionError):
+        return "connection"
+    return type(exc).__name__
+
+
+def build_paths(sites, dates, today=None):
+    """Return every request path the driver picks from: sites x distinct days."""
+    today = today or date.today()
+    return [
+        (site, f"/api/{site}/daily?day={d.day}&month={d.month}&year={d.year}")
+        for site in sites
+        for d in (today - timedelta(days=i) for i in range(dates))
+    ]
+
+
+def run_load(
+    base_url,
+    rps,
+    duration,
+    sites=SITES,
+    dates=1,
+    concurrency=64,
+    timeout=30.0,
+    seed=None,
+    get=None,
+):
+    """Drive `rps` requests/second for `duration` seconds; returns a report dict.
+
+    `get(path)` returns an HTTP status or raises; defaults to a keep-alive
+    client for `base_url`.
+    """
+    get = get or _Client(base_url, timeout).get
+    rng = random.Random(seed)
+    paths = build_paths(sites, dates)
+    total = max(1, int(rps * duration))
+    results = []  # (site, outcome, latency seconds)
+    results_lock = threading.Lock()
+    max_lag = 0.0
+
+    def send(site, path, scheduled):
+        try:
+            status = get(path)
+            outcome = "ok" if status < 400 else f"http_{status}"
+        except Exception as e:
+            outcome = classify(e)
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((site, outcome, latency))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = started + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            site, path = rng.choice(paths)
+            pool.submit(send, site, path, scheduled)
+    elapsed = time.perf_counter() - started
+
+    report = summarize(results, elapsed)
+    report["target_rps"] = rps
+    report["max_send_lag_ms"] = round(max_lag * 1000, 1)
+    return report
+
+
+def _latency_stats(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 1),
+    }
+
+
+def summarize(results, elapsed):
+    """Aggregate (site, outcome, latency) tuples into the report dict.
+
+    Latency percentiles cover successful requests only; failures are counted
+    by kind (`http_<status>`, `timeout`, `connection`, ...).
+    """
+    by_site = defaultdict(list)
+    for row in results:
+        by_site[row[0]].append(row)
+
+    def block(rows):
+        ok = [latency for _, outcome, latency in rows if outcome == "ok"]
+        errors = Counter(outcome for _, outcome, _ in rows if outcome != "ok")
+        return {
+            "requests": len(rows),
+            "ok": len(ok),
+            "throughput_rps": round(len(ok) / elapsed, 1) if elapsed else 0.0,
+            **_latency_stats(ok),
+            "errors": dict(errors.most_common()),
+        }
+
+    report = block(results)
+    report["elapsed_s"] = round(elapsed, 2)
+    report["sites"] = {site: block(rows) for site, rows in sorted(by_site.items())}
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_s']}s"
+        f" (target {report.get('target_rps', '-')} rps,"
+        f" max send lag {report.get('max_send_lag_ms', 0)} ms)",
+        f"{'':<12} {'requests':>8} {'ok':>6} {'ok rps':>8} {'p50 ms':>8}"
+        f" {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  errors",
+    ]
+    rows = [("total", report)] + list(report["sites"].items())
+    for name, block in rows:
+        errors = ", ".join(f"{k}={v}" for k, v in block["errors"].items()) or "-"
+        lines.append(
+            f"{name:<12} {block['requests']:>8} {block['ok']:>6} {block['throughput_rps']:>8}"
+            f" {block['p50_ms']:>8} {block['p95_ms']:>8} {block['p99_ms']:>8}"
+            f" {block['max_ms']:>8}  {errors}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest.driver",
+        description="Load-test /api/<site>/daily at a fixed request rate.",
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument(
+        "--rps", type=float, default=20, help="target requests per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30, help="seconds to send for"
+    )
+    parser.add_argument(
+        "--site",
+        action="append",
+        choices=SITES,
+        help="site to hit (repeatable; default: all four)",
+    )
+    parser.add_argument(
+        "--dates", type=int, default=1, help="distinct days to spread requests over"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="max requests in flight"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="per-request timeout in seconds"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        args.base_url,
+        args.rps,
+        args.duration,
+        sites=tuple(args.site or SITES),
+        dates=max(1, args.dates),
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
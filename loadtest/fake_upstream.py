@@ -0,0 +1,292 @@
+"""Local stand-in for the four calendar sites, for load tests.
+
+Serves synthetic calendar pages with configurable latency, server errors and
+Cloudflare-like challenge pages, so the API can be load-tested without
+sending traffic to the real sites. The pages are the benchmark fixtures,
+generated for fixed dates by `benchmarks/make_fixtures.py` from a fixed
+seed. Their date rows are rewritten to the requested day, week or month
+(month pages are cut to the month's length), so records land on the dates
+the API asked for, but every date carries the same events. Each site gets
+its own port (`--port` and the next three), so per-host session pools and
+the event store see four different hosts, as in production.
+
+    python -m loadtest.fake_upstream --latency 150 --jitter 50 --error-rate 0.02
+
+Then start the API with the printed `*_URL` variables. `GET /__stats` on any
+port returns the response counters of that site.
+"""
+
+import argparse
+import functools
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from src.scrapper._constants import BASE_MONTH_NAMES, BASE_MONTH_NUMBERS
+from src.scrapper._utils import page_span, parse_page_url
+
+FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures"
+)
+
+# site name -> scraper URL variable, in port order
+SITES = (
+    ("forexfactory", "FOREXFACTORY_URL"),
+    ("cryptocraft", "CRYPTOCRAFT_URL"),
+    ("energyexch", "ENERGYEXCH_URL"),
+    ("metalsmine", "METALSMINE_URL"),
+)
+TIMELINES = ("day", "week", "month")
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_DATE_CELL_RE = re.compile(
+    rb'<span class="date">[A-Za-z]{3} <span>([A-Za-z]{3}) ([0-9]{1,2})</span></span>'
+)
+
+CHALLENGE_HTML = (
+    "<!DOCTYPE html><html><head><title>Just a moment...</title></head><body>"
+    '<div id="challenge-platform"><noscript>Enable JavaScript and cookies to continue</noscript>'
+    "<script>window._cf_chl_opt = {cType: 'managed'};</script></div></body></html>"
+)
+
+
+def load_pages(site, fixture_dir=FIXTURE_DIR):
+    """Return {timeline: html bytes} for one site from `<site>_<timeline>.html[.gz]`."""
+    pages = {}
+    for timeline in TIMELINES:
+        for suffix, opener in ((".html.gz", gzip.open), (".html", open)):
+            path = os.path.join(fixture_dir, f"{site}_{timeline}{suffix}")
+            if os.path.exists(path):
+                with opener(path, "rb") as fh:
+                    pages[timeline] = fh.read()
+                break
+    if not pages:
+        raise FileNotFoundError(f"No fixture pages for {site} in {fixture_dir}")
+    return pages
+
+
+@functools.lru_cache(maxsize=256)
+def redate_page(page, first, last):
+    """Return `page` with its day rows moved to start on `first`.
+
+    Days that would fall after `last` are dropped, e.g. when a 31-day fixture
+    month serves February.
+    """
+    out = []
+    pos = 0
+    origin = previous = None
+    for m in _DATE_CELL_RE.finditer(page):
+        month = BASE_MONTH_NUMBERS.get(m.group(1).decode().title())
+        if month is None:
+            continue
+        # fixture pages carry no year; 2024 is a leap year, so Feb 29 parses
+        year = 2024 if previous is None else previous.year
+        day = date(year, month, int(m.group(2)))
+        if previous is not None and day < previous:
+            day = day.replace(year=year + 1)
+        previous = day
+        origin = origin or day
+        shifted = first + (day - origin)
+        if shifted > last:
+            end = page.find(b"</tbody>", m.end())
+            if end != -1:
+                out.append(page[pos : page.rfind(b"<tr", 0, m.start())])
+                pos = end
+            break
+        out.append(page[pos : m.start()])
+        out.append(
+            f'<span class="date">{WEEKDAYS[shifted.weekday()]} <span>'
+            f"{BASE_MONTH_NAMES[shifted.month]} {shifted.day}</span></span>".encode()
+        )
+        pos = m.end()
+    out.append(page[pos:])
+    return b"".join(out)
+
+
+class UpstreamBehaviour:
+    """Latency and failure knobs shared by every site server."""
+
+    def __init__(
+        self,
+        latency=0.1,
+        jitter=0.0,
+        error_rate=0.0,
+        challenge_rate=0.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.challenge_rate = challenge_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay seconds, outcome) for one request: 'ok', 'error' or 'challenge'."""
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return delay, "error"
+        if roll < self.error_rate + self.challenge_rate:
+            return delay, "challenge"
+        return delay, "ok"
+
+
+class FakeSiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site, pages, behaviour):
+        super().__init__(address, _Handler)
+        self.site = site
+        self.pages = pages
+        self.behaviour = behaviour
+        self.counts = {"ok": 0, "error": 0, "challenge": 0, "not_found": 0}
+        self._counts_lock = threading.Lock()
+
+    def count(self, outcome):
+        with self._counts_lock:
+            self.counts[outcome] += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/calendar"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, content_type="text/html; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path == "/__stats":
+            with server._counts_lock:
+                body = json.dumps({"site": server.site, **server.counts}).encode()
+            return self._reply(200, body, "application/json")
+
+        timeline = next((k for k, _ in parse_qsl(parts.query) if k in TIMELINES), None)
+        page = server.pages.get(timeline) if parts.path == "/calendar" else None
+        if page is None:
+            server.count("not_found")
+            return self._reply(404, b"Not Found", "text/plain")
+        key = parse_page_url(self.path)
+        if key is not None:
+            page = redate_page(page, *page_span(key[1], key[2]))
+
+        delay, outcome = server.behaviour.draw()
+        time.sleep(delay)
+        server.count(outcome)
+        if outcome == "error":
+            return self._reply(500, b"<html><body>Internal Server Error</body></html>")
+        if outcome == "challenge":
+            return self._reply(
+                403,
+                CHALLENGE_HTML.encode(),
+                headers=(("Server", "cloudflare"), ("cf-mitigated", "challenge")),
+            )
+        return self._reply(200, page)
+
+
+def start_servers(host="127.0.0.1", port=8700, behaviour=None, fixture_dir=FIXTURE_DIR):
+    """Start one server per site on consecutive ports (0 picks free ports).
+
+    Returns the servers; each serves from a daemon thread until `shutdown()`.
+    """
+    behaviour = behaviour or UpstreamBehaviour()
+    servers = []
+    for i, (site, _) in enumerate(SITES):
+        server = FakeSiteServer(
+            (host, port + i if port else 0),
+            site,
+            load_pages(site, fixture_dir),
+            behaviour,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def env_for(servers):
+    """Return {variable: url} pointing the scrapers at `servers`."""
+    return {env: server.url for (_, env), server in zip(SITES, servers)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest.fake_upstream",
+        description="Serve synthetic calendar pages with configurable latency and failures.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port", type=int, default=8700, help="port of the first site (default 8700)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=150,
+        help="mean response delay in ms (default 150)",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=50, help="standard deviation of the delay in ms"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of 500 responses"
+    )
+    parser.add_argument(
+        "--challenge-rate",
+        type=float,
+        default=0.0,
+        help="fraction of Cloudflare-like 403 challenge pages",
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=FIXTURE_DIR,
+        help="directory of <site>_<timeline>.html[.gz]",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    behaviour = UpstreamBehaviour(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        challenge_rate=args.challenge_rate,
+        seed=args.seed,
+    )
+    servers = start_servers(args.host, args.port, behaviour, args.fixtures)
+    print("Fake upstream running. Start the API with:")
+    for env, url in env_for(servers).items():
+        print(f"  export {env}={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from src.app import app, run_app  # noqa: F401
 # causing all endpoints to default to one scraper.
 get_records = None
 get_url = None
+async_get_records = None
 
 
 if __name__ == "__main__":
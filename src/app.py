@@ -10,6 +10,7 @@ from flask_cors import CORS
 # None so routes can fall back to their site-specific scrapers.
 get_records = None
 get_url = None
+async_get_records = None
 
 # Load .env file if present. Use DOTENV_PATH to override if needed.
 dotenv_path = os.getenv("DOTENV_PATH")
@@ -85,9 +86,15 @@ def run_app():
         logger.warning("PORT env var is not an integer; falling back to 5000")
         port = 5000
 
-    debug_env = os.getenv("DEBUG", "True").lower()
+    # Debug is opt-in: this is Flask's development server; production runs
+    # under gunicorn (src/wsgi.py) or uvicorn (src/asgi.py).
+    debug_env = os.getenv("DEBUG", "False").lower()
     debug = debug_env in ("1", "true", "yes", "on")
 
+    from .scrapper._scheduler import start_prefetcher
+
+    start_prefetcher()
+
     try:
         app.run(host=host, port=port, debug=debug)
     except OSError as e:
@@ -0,0 +1,248 @@
+"""ASGI entry point for running the API under an ASGI server (uvicorn).
+
+`application` serves GET /api/<site>/daily natively: the handler awaits the
+site scraper's `async_get_records`, so a slow upstream holds no thread while
+it waits. Every other request goes to the Flask app through asgiref's
+WsgiToAsgi adapter, so blueprints, error handlers and middleware are shared.
+
+Run with `python -m src.asgi` (configured from HOST/PORT/ASGI_WORKERS) or
+`uvicorn src.asgi:application --workers N`. The prefetch scheduler starts
+from the lifespan startup event, so it runs in the workers rather than in
+uvicorn's supervisor process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qs
+from uuid import uuid4
+
+from asgiref.wsgi import WsgiToAsgi
+
+from .app import app
+from .routes.common_helpers import (
+    _daily_body,
+    _day_or_none,
+    _json_body,
+    _max_age_for,
+    _resolve_async_records,
+    _resolve_helpers,
+    _validate_date_params,
+    _validate_query_params,
+)
+from .routes.crypto_craft_routes import _normalize_crypto_records
+from .scrapper._async_http import close_client_sessions
+from .scrapper._metrics import request_seconds
+from .scrapper._scheduler import get_prefetcher, start_prefetcher
+
+logger = logging.getLogger(__name__)
+
+wsgi_application = WsgiToAsgi(app)
+
+# path -> (scraper module, include page url in body, record normalizer)
+DAILY_ROUTES = {
+    "/api/forex/daily": ("src.scrapper.forexFactoryScrapper", True, None),
+    "/api/cryptocraft/daily": (
+        "src.scrapper.cryptoCraftScrapper",
+        False,
+        _normalize_crypto_records,
+    ),
+    "/api/energyexch/daily": ("src.scrapper.energyExchScrapper", False, None),
+    "/api/metalsmine/daily": ("src.scrapper.metalsMineScrapper", False, None),
+}
+
+# Query parameters the native handler understands. Requests with any other
+# parameter, e.g. `since` (delta polling from the event store) or `stream`,
+# are answered by the Flask route instead.
+DAILY_PARAMS = {
+    "day",
+    "month",
+    "year",
+    "limit",
+    "offset",
+    "currency",
+    "impact",
+    "event",
+    "time_from",
+    "time_to",
+}
+
+
+def _encode(payload):
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+async def _send(send, status, body, correlation_id, headers=()):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"access-control-allow-origin", b"*"),
+                (b"x-request-id", correlation_id.encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload, correlation_id):
+    await _send(send, status, _encode(payload), correlation_id)
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _header(scope, name):
+    for key, value in scope.get("headers") or []:
+        if key.decode("latin-1").lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _daily(scope, send, route, params):
+    site_module_path, include_url, normalize = route
+    cid = _header(scope, "x-request-id") or uuid4().hex
+    args = {name: values[0] for name, values in params.items()}
+
+    date_err, day_i, month_i, year_i = _validate_date_params(
+        args.get("day"), args.get("month"), args.get("year")
+    )
+    if date_err:
+        return await _send_json(send, 400, {"error": date_err}, cid)
+
+    query, query_err = _validate_query_params(args)
+    if query_err:
+        return await _send_json(send, 400, {"error": query_err}, cid)
+
+    try:
+        _, get_url = _resolve_helpers(site_module_path)
+        async_get_records = _resolve_async_records(site_module_path)
+        url = get_url(day_i, month_i, year_i, "day")
+        records = await async_get_records(url)
+    except Exception:
+        logger.exception(
+            "Unhandled exception occurred while processing request (cid=%s)", cid
+        )
+        payload = {
+            "error": "Internal Server Error",
+            "message": "An unexpected error occurred",
+            "status": "error",
+            "code": 500,
+            "correlation_id": cid,
+        }
+        return await _send_json(send, 500, payload, cid)
+
+    # an overridden helper may return something other than a record list
+    if not isinstance(records, list):
+        return await _send_json(send, 200, records, cid)
+
+    # same body, ETag and Cache-Control as the Flask daily routes
+    total, records = query.select(records)
+    payload = _daily_body(url, total, records, query, include_url, normalize)
+    body, etag = _json_body(payload, scope["path"])
+    etag = f'"{etag}"'
+    max_age = _max_age_for(_day_or_none(day_i, month_i, year_i))
+    headers = [
+        (b"etag", etag.encode()),
+        (b"cache-control", f"public, max-age={max_age}".encode()),
+    ]
+    if _etag_matches(_header(scope, "if-none-match"), etag):
+        return await _send(send, 304, b"", cid, headers)
+    await _send(send, 200, body, cid, headers)
+
+
+async def _timed_daily(scope, send, route, params):
+    """Run `_daily`, recording its latency like the Flask request middleware."""
+    started = time.perf_counter()
+    status = 500
+
+    async def send_and_record_status(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        await send(message)
+
+    try:
+        await _daily(scope, send_and_record_status, route, params)
+    finally:
+        request_seconds.observe(
+            time.perf_counter() - started,
+            endpoint=scope["path"],
+            method="GET",
+            status=status,
+        )
+
+
+async def _lifespan(receive, send):
+    """Start the prefetcher when a worker starts; on shutdown stop it and close
+    the worker's aiohttp session."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # every worker runs this, not uvicorn's supervisor, so the refresher
+            # elected through PREFETCH_LOCK_PATH warms a cache that serves requests
+            start_prefetcher()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            scheduler = get_prefetcher()
+            if scheduler is not None:
+                await asyncio.to_thread(scheduler.stop, 5)
+            await close_client_sessions()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI app: native async daily handlers, Flask for everything else."""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] == "http" and scope.get("method") == "GET":
+        route = DAILY_ROUTES.get(scope.get("path"))
+        if route is not None:
+            params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            if set(params) <= DAILY_PARAMS:
+                return await _timed_daily(scope, send, route, params)
+    await wsgi_application(scope, receive, send)
+
+
+def run_asgi():
+    """Start uvicorn using environment configuration (HOST/PORT/ASGI_WORKERS).
+
+    ASGI_WORKERS defaults to the CPU count; each worker is a separate process
+    with its own event loop, session pool and record cache.
+    """
+    import uvicorn
+
+    host = os.getenv("HOST", "0.0.0.0")
+    try:
+        port = int(os.getenv("PORT", "5000"))
+    except ValueError:
+        logger.warning("PORT env var is not an integer; falling back to 5000")
+        port = 5000
+    try:
+        workers = int(os.getenv("ASGI_WORKERS", str(os.cpu_count() or 1)))
+    except ValueError:
+        logger.warning("ASGI_WORKERS env var is not an integer; using CPU count")
+        workers = os.cpu_count() or 1
+
+    uvicorn.run(
+        "src.asgi:application",
+        host=host,
+        port=port,
+        workers=max(1, workers),
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+    )
+
+
+if __name__ == "__main__":
+    run_asgi()
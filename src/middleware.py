@@ -1,6 +1,11 @@
-from flask import g, request
+import time
 from uuid import uuid4
 
+from flask import g, request
+
+from .routes.common_helpers import _endpoint_label
+from .scrapper._metrics import request_seconds
+
 
 def register_middleware(app):
     """Register request lifecycle middleware on the Flask app.
@@ -11,6 +16,7 @@ def register_middleware(app):
 
     @app.before_request
     def set_correlation_id():
+        g.request_started = time.perf_counter()
         cid = request.headers.get("X-Request-ID") or uuid4().hex
         g.correlation_id = cid
 
@@ -20,3 +26,16 @@ def register_middleware(app):
         if cid:
             response.headers.setdefault("X-Request-ID", cid)
         return response
+
+    @app.after_request
+    def observe_request_latency(response):
+        # streamed bodies are still being produced here: this is time to first byte
+        started = getattr(g, "request_started", None)
+        if started is not None:
+            request_seconds.observe(
+                time.perf_counter() - started,
+                endpoint=_endpoint_label(),
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
@@ -1,4 +1,130 @@
 # Minimal OpenAPI spec shared across the app
+
+# Record filters accepted by the daily and range endpoints
+FILTER_PARAMETERS = [
+    {
+        "name": "currency",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "string"},
+        "description": "Comma-separated currency codes to keep (e.g. USD,EUR)",
+    },
+    {
+        "name": "impact",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "string"},
+        "description": "Comma-separated impact levels to keep: low, medium, high, n/a",
+    },
+    {
+        "name": "event",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "string"},
+        "description": "Keep events whose name contains this text (case-insensitive)",
+    },
+    {
+        "name": "time_from",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "string", "example": "08:00"},
+        "description": "Earliest event time of day, inclusive (HH:MM)",
+    },
+    {
+        "name": "time_to",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "string", "example": "16:00"},
+        "description": "Latest event time of day, inclusive (HH:MM)",
+    },
+]
+
+# Query parameters shared by the /api/<site>/range endpoints
+RANGE_PARAMETERS = [
+    {
+        "name": "start",
+        "in": "query",
+        "required": True,
+        "schema": {"type": "string", "format": "date"},
+        "description": "First day of the range (YYYY-MM-DD)",
+    },
+    {
+        "name": "end",
+        "in": "query",
+        "required": True,
+        "schema": {"type": "string", "format": "date"},
+        "description": "Last day of the range, inclusive (YYYY-MM-DD)",
+    },
+    {
+        "name": "limit",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "integer", "minimum": 0},
+        "description": "Max number of results to return",
+    },
+    {
+        "name": "offset",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "integer", "minimum": 0},
+        "description": "Number of records to skip",
+    },
+    {
+        "name": "stream",
+        "in": "query",
+        "required": False,
+        "schema": {"type": "boolean"},
+        "description": (
+            "Stream records as NDJSON, one per line, page by page "
+            "(same as Accept: application/x-ndjson)"
+        ),
+    },
+    *FILTER_PARAMETERS,
+]
+
+# Delta cursor accepted by the /api/<site>/daily endpoints
+SINCE_PARAMETER = {
+    "name": "since",
+    "in": "query",
+    "required": False,
+    "schema": {"type": "integer", "minimum": 0},
+    "description": (
+        "Return only records changed after this store revision, wrapped as "
+        "{since, cursor, total, url, results}; pass the returned cursor next time. "
+        'Removed events are included with "Removed": true (requires EVENT_STORE_PATH)'
+    ),
+}
+
+
+def _range_path(summary, tag, schema_ref):
+    return {
+        "get": {
+            "summary": summary,
+            "tags": [tag],
+            "parameters": RANGE_PARAMETERS,
+            "responses": {
+                "200": {
+                    "description": "Time-ordered records for the range with paging metadata",
+                    "content": {
+                        "application/json": {"schema": {"$ref": schema_ref}},
+                        "application/x-ndjson": {
+                            "schema": {"$ref": "#/components/schemas/Record"}
+                        },
+                    },
+                },
+                "400": {
+                    "description": "Bad Request - invalid params",
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/ErrorResponse"}
+                        }
+                    },
+                },
+            },
+        }
+    }
+
+
 OPENAPI_SPEC = {
     "openapi": "3.0.0",
     "info": {
@@ -39,6 +165,19 @@ OPENAPI_SPEC = {
                 "responses": {"200": {"description": "OK"}},
             }
         },
+        "/metrics": {
+            "get": {
+                "summary": "Prometheus metrics of the answering worker process",
+                "tags": ["health"],
+                "responses": {
+                    "200": {
+                        "description": "Prometheus text exposition format",
+                        "content": {"text/plain": {"schema": {"type": "string"}}},
+                    },
+                    "404": {"description": "Metrics disabled (METRICS_ENABLED=False)"},
+                },
+            }
+        },
         "/api/forex/daily": {
             "get": {
                 "summary": "Get forex calendar for a day",
@@ -79,6 +218,8 @@ OPENAPI_SPEC = {
                         "schema": {"type": "integer", "minimum": 0},
                         "description": "Number of records to skip",
                     },
+                    SINCE_PARAMETER,
+                    *FILTER_PARAMETERS,
                 ],
                 "responses": {
                     "200": {
@@ -142,6 +283,8 @@ OPENAPI_SPEC = {
                         "schema": {"type": "integer", "minimum": 0},
                         "description": "Number of records to skip",
                     },
+                    SINCE_PARAMETER,
+                    *FILTER_PARAMETERS,
                 ],
                 "responses": {
                     "200": {
@@ -205,6 +348,8 @@ OPENAPI_SPEC = {
                         "schema": {"type": "integer", "minimum": 0},
                         "description": "Number of records to skip",
                     },
+                    SINCE_PARAMETER,
+                    *FILTER_PARAMETERS,
                 ],
                 "responses": {
                     "200": {
@@ -268,6 +413,8 @@ OPENAPI_SPEC = {
                         "schema": {"type": "integer", "minimum": 0},
                         "description": "Number of records to skip",
                     },
+                    SINCE_PARAMETER,
+                    *FILTER_PARAMETERS,
                 ],
                 "responses": {
                     "200": {
@@ -291,6 +438,26 @@ OPENAPI_SPEC = {
                 },
             }
         },
+        "/api/forex/range": _range_path(
+            "Get forex calendar for a date range",
+            "forex",
+            "#/components/schemas/PaginatedRecords",
+        ),
+        "/api/cryptocraft/range": _range_path(
+            "Get cryptocraft events for a date range",
+            "cryptocraft",
+            "#/components/schemas/PaginatedCryptoRecords",
+        ),
+        "/api/metalsmine/range": _range_path(
+            "Get MetalsMine events for a date range",
+            "metals",
+            "#/components/schemas/PaginatedRecords",
+        ),
+        "/api/energyexch/range": _range_path(
+            "Get EnergyExch events for a date range",
+            "energy",
+            "#/components/schemas/PaginatedRecords",
+        ),
     },
     "components": {
         "schemas": {
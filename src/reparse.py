@@ -0,0 +1,329 @@
+"""Offline bulk re-parse of saved calendar pages.
+
+Runs `parse_calendar_from_html` over a directory or archive of saved pages
+in a process pool (one worker per CPU by default) and writes every record to
+one NDJSON, Parquet or SQLite file. Used to rebuild history after parser
+fixes without touching the upstream sites.
+
+Accepted inputs:
+  - a snapshot directory written with SNAPSHOT_DIR (the newest snapshot per URL)
+  - any directory of .html/.htm files, optionally .gz or .zst compressed
+  - a .zip, .tar, .tar.gz/.tgz, .tar.bz2 or .tar.xz archive of such files
+
+The page URL is only used to infer the year of the calendar; for plain
+files it is the path relative to the input, so keep the year in the file
+or directory name.
+
+Example:
+    python -m src.reparse data/snapshots -o history.ndjson
+    python -m src.reparse pages.tar.gz -o history.sqlite3 --format sqlite -j 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.scrapper._snapshots import SnapshotStore, decompress
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "parquet", "sqlite")
+_PAGE_SUFFIXES = (".html", ".htm")
+_CODEC_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def _page_codec(name):
+    """Return (is_page, codec) for a file name; codec is None for plain HTML."""
+    lower = name.lower()
+    codec = None
+    for suffix, value in _CODEC_SUFFIXES.items():
+        if lower.endswith(suffix):
+            lower, codec = lower[: -len(suffix)], value
+            break
+    return lower.endswith(_PAGE_SUFFIXES), codec
+
+
+def collect_tasks(source):
+    """Yield one task tuple per saved page under `source`.
+
+    A task is (name, url, kind, location, codec) and is resolved to HTML in
+    the worker process, so file contents are not shipped through the pool.
+    Tar members cannot be read out of order and are passed as bytes.
+    """
+    if os.path.isdir(source):
+        if os.path.exists(os.path.join(source, "index.sqlite3")):
+            store = SnapshotStore(source, codec="gzip")
+            for url, fetched_at, digest in store.entries(latest_only=True):
+                path, codec = store.locate(digest)
+                name = f"{digest[:12]}@{fetched_at:.0f}"
+                yield name, url, "file", path, codec
+            return
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                is_page, codec = _page_codec(filename)
+                if is_page:
+                    path = os.path.join(dirpath, filename)
+                    name = os.path.relpath(path, source)
+                    yield name, name, "file", path, codec
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.namelist():
+                is_page, codec = _page_codec(member)
+                if is_page:
+                    yield member, member, "zip", (source, member), codec
+    elif source.lower().endswith(_TAR_SUFFIXES):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                is_page, codec = _page_codec(member.name)
+                if member.isfile() and is_page:
+                    data = archive.extractfile(member).read()
+                    yield member.name, member.name, "bytes", data, codec
+    else:
+        raise ValueError(f"{source} is not a directory or a supported archive")
+
+
+def _read_task(kind, location):
+    if kind == "file":
+        with open(location, "rb") as fh:
+            return fh.read()
+    if kind == "zip":
+        path, member = location
+        with zipfile.ZipFile(path) as archive:
+            return archive.read(member)
+    return location
+
+
+def reparse_task(task, backend=None):
+    """Parse one page in a worker; returns a result dict (never raises)."""
+    from src.scrapper._parser import parse_calendar_from_html
+
+    name, url, kind, location, codec = task
+    started = time.perf_counter()
+    result = {"name": name, "url": url, "records": [], "bytes": 0, "error": None}
+    try:
+        data = _read_task(kind, location)
+        if codec:
+            data = decompress(data, codec)
+        result["bytes"] = len(data)
+        html = data.decode("utf-8", errors="replace")
+        result["records"] = parse_calendar_from_html(html, url, backend=backend)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def iter_results(tasks, workers=None, backend=None):
+    """Parse `tasks` in a process pool, yielding result dicts in input order.
+
+    At most a few tasks per worker are queued at once, so large archives are
+    not read into memory up front.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(
+            pool.submit(reparse_task, task, backend)
+            for _, task in zip(range(workers * 4), tasks)
+        )
+        try:
+            while pending:
+                result = pending.popleft().result()
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(pool.submit(reparse_task, task, backend))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class NdjsonWriter:
+    def __init__(self, path):
+        self._fh = open(path, "w", encoding="utf-8")
+
+    def write(self, url, records):
+        for rec in records:
+            self._fh.write(json.dumps({**rec, "Url": url}, ensure_ascii=False))
+            self._fh.write("\n")
+
+    def close(self):
+        self._fh.close()
+
+
+class SqliteWriter:
+    """One `records` table: indexed time/currency/impact/event columns plus the JSON record."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                time TEXT,
+                currency TEXT,
+                impact TEXT,
+                event TEXT,
+                record TEXT NOT NULL,
+                PRIMARY KEY (url, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_time ON records (time);
+            """)
+
+    def write(self, url, records):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    url,
+                    i,
+                    rec.get("Time"),
+                    rec.get("Currency"),
+                    rec.get("Impact"),
+                    rec.get("Event"),
+                    json.dumps(rec, ensure_ascii=False),
+                )
+                for i, rec in enumerate(records)
+            ],
+        )
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+class ParquetWriter:
+    """Buffers every record and writes one Parquet file (needs pandas and pyarrow)."""
+
+    def __init__(self, path):
+        from src.scrapper._export import records_to_dataframe
+
+        self._path = path
+        self._to_frame = records_to_dataframe
+        self._rows = []
+
+    def write(self, url, records):
+        self._rows.extend({**rec, "Url": url} for rec in records)
+
+    def close(self):
+        self._to_frame(self._rows).to_parquet(self._path, index=False)
+
+
+_WRITERS = {"ndjson": NdjsonWriter, "parquet": ParquetWriter, "sqlite": SqliteWriter}
+
+
+def reparse(source, output, fmt="ndjson", workers=None, backend=None, report=None):
+    """Re-parse every page under `source` into `output`; returns a summary dict.
+
+    `report(result)` is called once per page as results arrive.
+    """
+    writer = _WRITERS[fmt](output)
+    summary = {"files": 0, "failed": 0, "records": 0, "bytes": 0}
+    started = time.perf_counter()
+    try:
+        for result in iter_results(collect_tasks(source), workers, backend):
+            summary["files"] += 1
+            summary["bytes"] += result["bytes"]
+            if result["error"]:
+                summary["failed"] += 1
+            else:
+                summary["records"] += len(result["records"])
+                writer.write(result["url"], result["records"])
+            if report:
+                report(result)
+    finally:
+        writer.close()
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else 0.0
+
+
+def _print_result(result):
+    if result["error"]:
+        print(f"FAIL {result['name']}: {result['error']}", file=sys.stderr)
+        return
+    seconds = result["seconds"]
+    print(
+        f"ok   {result['name']}: {len(result['records'])} records,"
+        f" {result['bytes'] / 1024:.1f} KiB in {seconds * 1000:.1f} ms"
+        f" ({_rate(len(result['records']), seconds):.0f} rows/s,"
+        f" {_rate(result['bytes'], seconds) / 2**20:.1f} MiB/s)",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.reparse",
+        description="Re-parse saved calendar pages in parallel and write the records to one file.",
+    )
+    parser.add_argument(
+        "source", help="snapshot directory, directory of pages or archive"
+    )
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="output format (default: from the output extension, else ndjson)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--backend", default=None, help="parser backend (lxml or html.parser)"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="only print the totals"
+    )
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output)[1].lower()
+        fmt = {
+            ".parquet": "parquet",
+            ".sqlite": "sqlite",
+            ".sqlite3": "sqlite",
+            ".db": "sqlite",
+        }.get(ext, "ndjson")
+
+    summary = reparse(
+        args.source,
+        args.output,
+        fmt,
+        workers=args.workers,
+        backend=args.backend,
+        report=None if args.quiet else _print_result,
+    )
+    seconds = summary["seconds"]
+    print(
+        f"{summary['files']} files ({summary['failed']} failed),"
+        f" {summary['records']} records, {summary['bytes'] / 2**20:.1f} MiB in {seconds:.2f}s:"
+        f" {_rate(summary['files'], seconds):.1f} files/s,"
+        f" {_rate(summary['records'], seconds):.0f} rows/s,"
+        f" {_rate(summary['bytes'], seconds) / 2**20:.1f} MiB/s",
+        file=sys.stderr,
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,39 @@
+import json
 import logging
+from datetime import date, datetime
+from itertools import islice
+
+from flask import Response, jsonify, request, stream_with_context
+from werkzeug.http import generate_etag
+
+from src.scrapper._metrics import serialize_seconds
+from src.scrapper._utils import env_int
 
 logger = logging.getLogger(__name__)
 
+RANGE_MAX_DAYS = env_int("RANGE_MAX_DAYS", 366)
+
+# Cache-Control max-age (seconds) for responses about today/future vs. past days
+HTTP_MAX_AGE = env_int("HTTP_MAX_AGE", 60)
+HTTP_PAST_MAX_AGE = env_int("HTTP_PAST_MAX_AGE", 86400)
+
+
+def _app_override(name):
+    """Return `name` from src.app, else from the top-level main module, if callable.
+
+    Both modules expose None placeholders that callers (and tests) may set.
+    """
+    import importlib
+
+    for module_name in ("src.app", "main"):
+        try:
+            value = getattr(importlib.import_module(module_name), name, None)
+        except Exception:
+            continue
+        if callable(value):
+            return value
+    return None
+
 
 def _resolve_helpers(site_module_path):
     """Return (get_records, get_url) functions resolved in this order:
@@ -11,33 +43,10 @@ def _resolve_helpers(site_module_path):
 
     Raises ImportError if site module cannot be imported when needed.
     """
-    get_records_fn = None
-    get_url_fn = None
-
-    # 1) src.app
-    try:
-        import src.app as src_app
-
-        if callable(getattr(src_app, "get_records", None)):
-            get_records_fn = getattr(src_app, "get_records")
-        if callable(getattr(src_app, "get_url", None)):
-            get_url_fn = getattr(src_app, "get_url")
-    except Exception:
-        pass
-
-    # 2) main module (tests sometimes monkeypatch main)
-    try:
-        import importlib
-
-        main_mod = importlib.import_module("main")
-        if get_records_fn is None and callable(getattr(main_mod, "get_records", None)):
-            get_records_fn = getattr(main_mod, "get_records")
-        if get_url_fn is None and callable(getattr(main_mod, "get_url", None)):
-            get_url_fn = getattr(main_mod, "get_url")
-    except Exception:
-        pass
+    get_records_fn = _app_override("get_records")
+    get_url_fn = _app_override("get_url")
 
-    # 3) fallback to site-specific scraper for missing functions
+    # fallback to site-specific scraper for missing functions
     if get_records_fn is None or get_url_fn is None:
         module = __import__(site_module_path, fromlist=["*"])
         if get_records_fn is None and hasattr(module, "get_records"):
@@ -48,6 +57,32 @@ def _resolve_helpers(site_module_path):
     return get_records_fn, get_url_fn
 
 
+def _resolve_async_records(site_module_path):
+    """Return a coroutine function fetching records for a URL, resolved like
+    `_resolve_helpers`:
+    1) `async_get_records` of src.app, then of main (if callable)
+    2) `get_records` of src.app or main, run in a worker thread
+    3) the site scraper's `async_get_records`
+
+    Raises ImportError if site module cannot be imported when needed.
+    """
+    import asyncio
+
+    async_get_records = _app_override("async_get_records")
+    if async_get_records is not None:
+        return async_get_records
+
+    get_records = _app_override("get_records")
+    if get_records is not None:
+
+        async def _records_in_thread(url):
+            return await asyncio.to_thread(get_records, url)
+
+        return _records_in_thread
+
+    return __import__(site_module_path, fromlist=["*"]).async_get_records
+
+
 # Shared validation helpers
 def _validate_date_params(day, month, year):
     """Validate and parse day/month/year. Returns tuple:
@@ -99,3 +134,393 @@ def _validate_paging_params(limit_param, offset_param):
             return None, None, "Parameter 'offset' must be >= 0"
 
     return limit, offset, None
+
+
+def _validate_since_param(since_param):
+    """Validate the optional `since` delta cursor. Returns (since_or_None, error).
+
+    Deltas are read from the event store, so the parameter is rejected when
+    the store is disabled.
+    """
+    if since_param is None:
+        return None, None
+    try:
+        since = int(since_param)
+    except ValueError:
+        return None, "Parameter 'since' must be an integer"
+    if since < 0:
+        return None, "Parameter 'since' must be >= 0"
+
+    from src.scrapper.common import get_event_store
+
+    if get_event_store() is None:
+        return None, "Parameter 'since' requires the event store (EVENT_STORE_PATH)"
+    return since, None
+
+
+def _validate_range_params(start_param, end_param):
+    """Validate ISO start/end dates (YYYY-MM-DD). Returns tuple:
+    (error_message_or_None, start_date, end_date)
+    """
+    if not (start_param and end_param):
+        return "Missing one or more required parameters: start, end", None, None
+
+    try:
+        start = date.fromisoformat(start_param)
+        end = date.fromisoformat(end_param)
+    except ValueError:
+        return "Parameters start and end must be dates formatted YYYY-MM-DD", None, None
+
+    if not (1900 <= start.year <= 2100 and 1900 <= end.year <= 2100):
+        return "Parameters out of reasonable range", None, None
+    if end < start:
+        return "Parameter 'end' must not be before 'start'", None, None
+    if (end - start).days + 1 > RANGE_MAX_DAYS:
+        return f"Date range must not exceed {RANGE_MAX_DAYS} days", None, None
+
+    return None, start, end
+
+
+def _split_csv(value):
+    """Split a comma-separated query parameter into non-empty stripped parts."""
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _parse_hhmm(value, name):
+    """Parse an optional HH:MM parameter. Returns (time_or_None, error)."""
+    if not value:
+        return None, None
+    try:
+        return datetime.strptime(value, "%H:%M").time(), None
+    except ValueError:
+        return None, f"Parameter '{name}' must be a time formatted HH:MM"
+
+
+def _validate_query_params(args):
+    """Build a RecordQuery from the filter and paging query parameters.
+
+    Filters: `currency` and `impact` (comma-separated lists), `event`
+    (case-insensitive substring) and `time_from`/`time_to` (HH:MM, inclusive).
+    Returns (query, None) on success or (None, error_message).
+    """
+    from src.scrapper.common import IMPACT_LEVELS, RecordQuery
+
+    limit, offset, paging_err = _validate_paging_params(
+        args.get("limit"), args.get("offset")
+    )
+    if paging_err:
+        return None, paging_err
+
+    impact = _split_csv(args.get("impact"))
+    if any(level.lower() not in IMPACT_LEVELS for level in impact):
+        return None, "Parameter 'impact' must be a list of: " + ", ".join(IMPACT_LEVELS)
+
+    time_from, err = _parse_hhmm(args.get("time_from"), "time_from")
+    if err:
+        return None, err
+    time_to, err = _parse_hhmm(args.get("time_to"), "time_to")
+    if err:
+        return None, err
+    if time_from and time_to and time_to < time_from:
+        return None, "Parameter 'time_to' must not be before 'time_from'"
+
+    query = RecordQuery(
+        currency=_split_csv(args.get("currency")),
+        impact=impact,
+        event=(args.get("event") or "").strip() or None,
+        time_from=time_from,
+        time_to=time_to,
+        offset=offset,
+        limit=limit,
+    )
+    return query, None
+
+
+def _select_records(site_module_path, get_records, url, query):
+    """Return (total, records) for the page at `url` filtered and paged by `query`.
+
+    Uses the site scraper's `query_records` (filters pushed into the scraping
+    layer) when `get_records` is that module's own function; an overridden
+    helper is called and its result filtered here. A result that is not a
+    record list is returned as (None, result).
+    """
+    import importlib
+
+    module = importlib.import_module(site_module_path)
+    if get_records is getattr(module, "get_records", None) and hasattr(
+        module, "query_records"
+    ):
+        return module.query_records(url, query)
+
+    records = get_records(url)
+    if not isinstance(records, list):
+        return None, records
+    return query.select(records)
+
+
+def _paged_body(total, records, query, extra=None):
+    """Build the {total, offset, limit, results} envelope for one page of records.
+
+    `extra` adds fields such as the page url or the requested range.
+    """
+    body = {"total": total, "offset": query.offset, "limit": query.limit}
+    if extra:
+        body.update(extra)
+    body["results"] = records
+    return body
+
+
+def _delta_body(url, since, normalize=None):
+    """Build the {since, cursor, total, url, results} envelope of the records on
+    the page at `url` that changed after revision `since`.
+
+    Clients pass the returned `cursor` as `since` on their next request
+    (start with 0 to receive every stored record). `normalize` reshapes the
+    records, but each keeps its ID and `Removed` flag so clients can match
+    the changes against the records they hold.
+    """
+    from src.scrapper.common import (
+        event_key,
+        get_event_store,
+        page_span,
+        parse_page_url,
+    )
+
+    records, cursor = [], since
+    key = parse_page_url(url)
+    if key is not None:
+        site, timeline, page_date = key
+        first, last = page_span(timeline, page_date)
+        records, cursor = get_event_store().changes_since(site, first, last, since)
+    if normalize is not None:
+        normalized = []
+        for raw, rec in zip(records, normalize(records)):
+            rec = {"ID": raw.get("ID") or event_key(raw), **rec}
+            if raw.get("Removed"):
+                rec["Removed"] = True
+            normalized.append(rec)
+        records = normalized
+    return {
+        "since": since,
+        "cursor": cursor,
+        "total": len(records),
+        "url": url,
+        "results": records,
+    }
+
+
+def _max_age_for(last_day):
+    """Pick the Cache-Control max-age for data ending on `last_day`.
+
+    Past days no longer change, so shared caches may keep them much longer.
+    `last_day` may be None (e.g. an impossible date like Feb 31).
+    """
+    if last_day is not None and last_day < date.today():
+        return HTTP_PAST_MAX_AGE
+    return HTTP_MAX_AGE
+
+
+def _day_or_none(day, month, year):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _endpoint_label():
+    """Route template of the current request, the `endpoint` label of metrics."""
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _json_body(body, endpoint):
+    """Serialize a response body; returns (bytes, etag).
+
+    Used by the Flask routes and the native ASGI daily handler alike, so the
+    same records get the same bytes and ETag from either server. The time
+    spent is recorded under the `endpoint` metrics label.
+    """
+    with serialize_seconds.time(endpoint=endpoint):
+        data = json.dumps(body, sort_keys=True, separators=(",", ":")).encode()
+    return data + b"\n", generate_etag(data)
+
+
+def _conditional_json(body, last_day):
+    """Serialize `body` as JSON with a content-hash ETag and Cache-Control headers.
+
+    Answers 304 Not Modified (no body) when the request's If-None-Match
+    matches the ETag.
+    """
+    data, etag = _json_body(body, _endpoint_label())
+    response = Response(data, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = _max_age_for(last_day)
+    return response.make_conditional(request)
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _wants_stream():
+    """True when the client asked for NDJSON via `?stream=1` or the Accept header."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes", "on"):
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _ndjson_response(records, query, normalize=None, label="records"):
+    """Stream an iterable of records as newline-delimited JSON.
+
+    Records are serialized one at a time as `records` produces them, so the
+    first lines go out before later pages are fetched. The RecordQuery's
+    filters and offset/limit are applied on the fly, and the source is closed
+    once `limit` is reached. An error after the response has started ends the
+    stream with an `{"error": ...}` line.
+    """
+
+    def generate():
+        stop = None if query.limit is None else query.offset + query.limit
+        source = iter(records)
+        matching = filter(query.matches, source) if query.has_filters else source
+        try:
+            for rec in islice(matching, query.offset, stop):
+                if normalize is not None:
+                    rec = normalize([rec])[0]
+                yield json.dumps(rec, sort_keys=True) + "\n"
+        except Exception:
+            logger.exception("Failed while streaming %s", label)
+            yield json.dumps({"error": f"Failed to fetch or parse {label}"}) + "\n"
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def _range_response(site_module_path, site_name, normalize=None):
+    """Shared handler body for the /api/<site>/range endpoints.
+
+    Fetches every calendar page covering [start, end] concurrently on the
+    shared async loop through the site's scraper helpers and returns the merged records in time order using
+    the same {total, offset, limit, results} envelope as the daily endpoints.
+    `normalize` optionally reshapes the merged record list (e.g. cryptocraft).
+
+    With `?stream=1` or `Accept: application/x-ndjson` the records are streamed
+    as NDJSON page by page instead (see `_ndjson_response`), from the same
+    async fan-out as each page in order completes.
+    """
+    from src.scrapper.common import (
+        async_fetch_range,
+        async_iter_range_records,
+        iter_async,
+        run_async,
+    )
+
+    try:
+        get_records, get_url = _resolve_helpers(site_module_path)
+    except Exception:
+        logger.exception("Failed to resolve %s helpers", site_name)
+        return jsonify({"error": "Server configuration error"}), 500
+
+    range_err, start, end = _validate_range_params(
+        request.args.get("start"), request.args.get("end")
+    )
+    if range_err:
+        return jsonify({"error": range_err}), 400
+
+    query, query_err = _validate_query_params(request.args)
+    if query_err:
+        return jsonify({"error": query_err}), 400
+
+    try:
+        async_get_records = _resolve_async_records(site_module_path)
+    except Exception:
+        logger.exception("Failed to resolve %s helpers", site_name)
+        return jsonify({"error": "Server configuration error"}), 500
+
+    if _wants_stream():
+        records = iter_async(
+            async_iter_range_records(async_get_records, get_url, start, end)
+        )
+        return _ndjson_response(records, query, normalize, label=f"{site_name} range")
+
+    try:
+        records = run_async(async_fetch_range(async_get_records, get_url, start, end))
+    except Exception:
+        logger.exception("Failed to fetch or parse %s range", site_name)
+        raise
+
+    total, records = query.select(records)
+    if normalize is not None:
+        records = normalize(records)
+
+    response_body = _paged_body(
+        total, records, query, {"start": start.isoformat(), "end": end.isoformat()}
+    )
+    return _conditional_json(response_body, end)
+
+
+def _daily_body(url, total, records, query, include_url=False, normalize=None):
+    """Build the daily endpoints' body for the selected records of the page at `url`.
+
+    Shared by `_daily_response` and the ASGI daily handler.
+    """
+    if normalize is not None:
+        records = normalize(records)
+    extra = {"url": url} if include_url else None
+    return _paged_body(total, records, query, extra)
+
+
+def _daily_response(site_module_path, site_name, include_url=False, normalize=None):
+    """Shared handler body for the /api/<site>/daily endpoints.
+
+    Validates day/month/year, the filter and paging parameters and the
+    optional `since` cursor, then returns the matching records of the day page
+    in the {total, offset, limit, results} envelope (plus `url` when
+    `include_url`). `normalize` optionally reshapes the returned records.
+    """
+    try:
+        get_records, get_url = _resolve_helpers(site_module_path)
+    except Exception:
+        logger.exception("Failed to resolve %s helpers", site_name)
+        return jsonify({"error": "Server configuration error"}), 500
+
+    date_err, day_i, month_i, year_i = _validate_date_params(
+        request.args.get("day"), request.args.get("month"), request.args.get("year")
+    )
+    if date_err:
+        return jsonify({"error": date_err}), 400
+
+    query, query_err = _validate_query_params(request.args)
+    if query_err:
+        return jsonify({"error": query_err}), 400
+
+    # Optional delta cursor: only records changed after revision `since`
+    since, since_err = _validate_since_param(request.args.get("since"))
+    if since_err:
+        return jsonify({"error": since_err}), 400
+
+    try:
+        url = get_url(day_i, month_i, year_i, "day")
+        if since is not None:
+            # refreshes the stored page when the cached copy has expired
+            get_records(url)
+        else:
+            total, records = _select_records(site_module_path, get_records, url, query)
+    except Exception:
+        logger.exception("Failed to fetch or parse %s records", site_name)
+        raise
+
+    if since is not None:
+        return jsonify(_delta_body(url, since, normalize)), 200
+
+    # an overridden helper may return something other than a record list
+    if total is None:
+        return jsonify(records), 200
+
+    response_body = _daily_body(url, total, records, query, include_url, normalize)
+    return _conditional_json(response_body, _day_or_none(day_i, month_i, year_i))
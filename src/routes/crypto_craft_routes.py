@@ -1,97 +1,46 @@
 import logging
-from flask import Blueprint, jsonify, request
+from flask import Blueprint
 
-from .common_helpers import (
-    _resolve_helpers,
-    _validate_date_params,
-    _validate_paging_params,
-)
+from .common_helpers import _daily_response, _range_response
 
 logger = logging.getLogger(__name__)
 
 crypto_bp = Blueprint("cryptocraft", __name__)
 
 
-@crypto_bp.route("/api/cryptocraft/daily", methods=["GET"])
-def cryptocraft_daily():
-    try:
-        get_records, get_url = _resolve_helpers("src.scrapper.cryptoCraftScrapper")
-    except Exception:
-        logger.exception("Failed to resolve cryptocraft helpers")
-        return jsonify({"error": "Server configuration error"}), 500
-
-    # validate presence and parse
-    day = request.args.get("day")
-    month = request.args.get("month")
-    year = request.args.get("year")
-    date_err, day_i, month_i, year_i = _validate_date_params(day, month, year)
-
-    if date_err:
-        return jsonify({"error": date_err}), 400
-
-    # Optional paging parameters
-    limit_param = request.args.get("limit")
-    offset_param = request.args.get("offset")
-
-    limit, offset, paging_err = _validate_paging_params(limit_param, offset_param)
-    if paging_err:
-        return jsonify({"error": paging_err}), 400
-
-    try:
-        url = get_url(day_i, month_i, year_i, "day")
-        record_json = get_records(url)
-    except Exception:
-        logger.exception("Failed to fetch or parse cryptocraft records")
-        raise
-
-    # Normalize cryptocraft records to requested shape: Impact, Event, Actual, Forecast, Previous, Time
-    try:
-        if isinstance(record_json, list):
-            normalized = []
-            for r in record_json:
-                impact = (
-                    r.get("Impact") if isinstance(r, dict) and "Impact" in r else None
-                )
-                normalized.append(
-                    {
-                        "Impact": impact if impact is not None else "",
-                        "Event": r.get("Event") if isinstance(r, dict) else None,
-                        "Actual": r.get("Actual") if isinstance(r, dict) else None,
-                        "Forecast": r.get("Forecast") if isinstance(r, dict) else None,
-                        "Previous": r.get("Previous") if isinstance(r, dict) else None,
-                        "Time": r.get("Time") if isinstance(r, dict) else None,
-                    }
-                )
-            record_json = normalized
-
-        # If records is a list apply paging (offset/limit); otherwise return as-is
-        if isinstance(record_json, list):
-            total = len(record_json)
-
-            # apply offset
-            if offset and offset > 0:
-                if offset >= total:
-                    paged = []
-                else:
-                    paged = record_json[offset:]
-            else:
-                paged = record_json[:]
-
-            # apply limit
-            if limit is not None:
-                paged = paged[:limit]
-
-            # Wrap results with pagination metadata
-            response_body = {
-                "total": total,
-                "offset": offset,
-                "limit": limit,
-                "results": paged,
+def _normalize_crypto_records(records):
+    """Reshape records to: Impact, Event, Actual, Forecast, Previous, Time."""
+    normalized = []
+    for r in records:
+        impact = r.get("Impact") if isinstance(r, dict) and "Impact" in r else None
+        normalized.append(
+            {
+                "Impact": impact if impact is not None else "",
+                "Event": r.get("Event") if isinstance(r, dict) else None,
+                "Actual": r.get("Actual") if isinstance(r, dict) else None,
+                "Forecast": r.get("Forecast") if isinstance(r, dict) else None,
+                "Previous": r.get("Previous") if isinstance(r, dict) else None,
+                "Time": r.get("Time") if isinstance(r, dict) else None,
             }
+        )
+    return normalized
 
-            return jsonify(response_body), 200
-        else:
-            return jsonify(record_json), 200
-    except Exception:
-        logger.exception("Failed to apply paging to records")
-        return jsonify({"error": "Failed to process records"}), 500
+
+@crypto_bp.route("/api/cryptocraft/daily", methods=["GET"])
+def cryptocraft_daily():
+    """CryptoCraft events for one day (day/month/year), with optional filters and paging."""
+    return _daily_response(
+        "src.scrapper.cryptoCraftScrapper",
+        "cryptocraft",
+        normalize=_normalize_crypto_records,
+    )
+
+
+@crypto_bp.route("/api/cryptocraft/range", methods=["GET"])
+def cryptocraft_range():
+    """Records for every day between `start` and `end` (inclusive), fetched in parallel."""
+    return _range_response(
+        "src.scrapper.cryptoCraftScrapper",
+        "cryptocraft",
+        normalize=_normalize_crypto_records,
+    )
@@ -1,5 +1,5 @@
 import logging
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
 
 logger = logging.getLogger(__name__)
 
@@ -15,3 +15,26 @@ def hello():
 def health():
     """Health endpoint for quick liveness check."""
     return jsonify({"status": "ok"}), 200
+
+
+@helper_bp.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Expose record cache counters (hits, misses, evictions) for sizing."""
+    from src.scrapper._scheduler import get_prefetcher
+    from src.scrapper.common import record_cache, record_flight
+
+    stats = record_cache.stats()
+    stats["single_flight"] = record_flight.stats()
+    prefetcher = get_prefetcher()
+    stats["prefetch"] = prefetcher.stats() if prefetcher is not None else None
+    return jsonify(stats), 200
+
+
+@helper_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics of this worker process (text exposition format)."""
+    from src.scrapper import _metrics
+
+    if not _metrics.METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(_metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,219 @@
+"""Async counterpart of `_http.get_page_html` with bounded concurrency.
+
+Requests go through aiohttp with a process-wide concurrency limit, a per-host
+limit and a total timeout. Responses that look like a Cloudflare challenge are
+retried through the pooled cloudscraper sessions in a worker thread, which is
+the same challenge handling the sync path uses; the clearance cookies that
+session earned are then copied into the aiohttp session, so later requests to
+the host pass without another challenge. Without aiohttp installed every
+fetch takes that thread path.
+
+Limits and client sessions are tracked per event loop. Sync callers (Flask
+views) use `run_async`, which runs coroutines on one shared background loop,
+so its limits apply across all request threads.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from . import _http, _metrics, _snapshots
+from ._utils import env_float, env_int
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:  # optional dependency; fall back to cloudscraper in threads
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MAX_CONCURRENCY = env_int("ASYNC_MAX_CONCURRENCY", 32)
+ASYNC_PER_HOST_LIMIT = env_int("ASYNC_PER_HOST_LIMIT", 4)
+ASYNC_TIMEOUT = env_float("ASYNC_TIMEOUT", 15.0)
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_CHALLENGE_STATUSES = (403, 429, 503)
+_CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "just a moment", "cf_chl_opt")
+
+
+def is_challenge(status, headers, text):
+    """Return True if a response looks like a Cloudflare challenge page."""
+    if (headers or {}).get("cf-mitigated") == "challenge":
+        return True
+    if status not in _CHALLENGE_STATUSES:
+        return False
+    head = (text or "")[:4096].lower()
+    return any(marker in head for marker in _CHALLENGE_MARKERS)
+
+
+class _LoopLimits:
+    """Semaphores and the aiohttp session belonging to one event loop."""
+
+    def __init__(self):
+        self.global_slots = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+        self.host_slots = {}
+        self.host_headers = {}  # host -> User-Agent matching adopted clearance
+        self.session = None
+
+    def host_slot(self, host):
+        slot = self.host_slots.get(host)
+        if slot is None:
+            slot = self.host_slots[host] = asyncio.Semaphore(ASYNC_PER_HOST_LIMIT)
+        return slot
+
+    def client_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=ASYNC_MAX_CONCURRENCY, limit_per_host=ASYNC_PER_HOST_LIMIT
+            )
+            # unsafe: keep cookies of IP-address hosts too (e.g. a local upstream)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=_HEADERS,
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+            )
+        return self.session
+
+
+_loop_limits = weakref.WeakKeyDictionary()
+
+
+def _limits():
+    loop = asyncio.get_running_loop()
+    limits = _loop_limits.get(loop)
+    if limits is None:
+        limits = _loop_limits[loop] = _LoopLimits()
+    return limits
+
+
+async def _fetch_with_client(limits, host, url, timeout):
+    """Return page text, or None when the response is a Cloudflare challenge."""
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    headers = limits.host_headers.get(host)
+    async with limits.client_session().get(
+        url, timeout=client_timeout, headers=headers
+    ) as resp:
+        text = await resp.text()
+        if is_challenge(resp.status, resp.headers, text):
+            return None
+        resp.raise_for_status()
+        return text
+
+
+async def async_get_page_html(url, timeout=ASYNC_TIMEOUT):
+    """Fetch page HTML without blocking the event loop and return the source text.
+
+    Raises RuntimeError on network errors, like `get_page_html`.
+    """
+    limits = _limits()
+    host = urlsplit(url).netloc.lower()
+    async with limits.global_slots, limits.host_slot(host):
+        if aiohttp is not None:
+            started = time.perf_counter()
+            try:
+                text = await _fetch_with_client(limits, host, url, timeout)
+            except Exception as e:
+                _metrics.upstream_errors.inc(
+                    host=host, client="aiohttp", type=_metrics.error_type(e)
+                )
+                logger.exception("Failed to fetch page HTML")
+                raise RuntimeError(f"Failed to get URL {url}: {e}")
+            if text is not None:
+                _metrics.upstream_fetch_seconds.observe(
+                    time.perf_counter() - started, host=host, client="aiohttp"
+                )
+                _metrics.upstream_html_bytes.observe(len(text.encode()), host=host)
+                if _snapshots.SNAPSHOT_DIR:
+                    await asyncio.to_thread(_snapshots.save_snapshot, url, text)
+                return text
+            _metrics.upstream_errors.inc(host=host, client="aiohttp", type="challenge")
+            logger.info("Cloudflare challenge for %s; retrying with cloudscraper", url)
+
+        # cloudscraper solves the challenge; it is blocking, so run it in a thread.
+        # A thread cannot be cancelled, so the wait is bounded by the scraper's
+        # own request timeout rather than by asyncio.wait_for.
+        text = await asyncio.to_thread(_http.get_page_html, url, timeout)
+        if aiohttp is not None:
+            _adopt_clearance(limits, host, url)
+        return text
+
+
+def _adopt_clearance(limits, host, url):
+    """Copy the pooled cloudscraper session's cookies and User-Agent for `host`."""
+    clearance = _http.session_pool.clearance(host)
+    if clearance is None:
+        return
+    cookies, user_agent = clearance
+    limits.client_session().cookie_jar.update_cookies(cookies, URL(url))
+    if user_agent:
+        limits.host_headers[host] = {"User-Agent": user_agent}
+
+
+async def close_client_sessions():
+    """Close the aiohttp session of the running loop (src.asgi calls it on lifespan shutdown)."""
+    limits = _loop_limits.get(asyncio.get_running_loop())
+    if limits is not None and limits.session is not None:
+        await limits.session.close()
+        limits.session = None
+
+
+_runner_lock = threading.Lock()
+_runner = None  # (pid, loop)
+
+
+def _background_loop():
+    global _runner
+    with _runner_lock:
+        # a forked worker inherits the global but not the thread running the loop
+        if _runner is None or _runner[0] != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="scrapper-async", daemon=True
+            )
+            thread.start()
+            _runner = (os.getpid(), loop)
+        return _runner[1]
+
+
+def run_async(coro, timeout=None):
+    """Run `coro` on the shared background loop from sync code and return its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    return future.result(timeout)
+
+
+async def _anext(agen):
+    return await agen.__anext__()
+
+
+async def _aclose(agen):
+    await agen.aclose()
+
+
+def iter_async(agen, timeout=None):
+    """Iterate the async generator `agen` from sync code on the shared background loop.
+
+    Each item waits at most `timeout` seconds. Closing the returned generator
+    closes `agen`, so its pending work is cancelled.
+    """
+    try:
+        while True:
+            try:
+                item = run_async(_anext(agen), timeout)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        run_async(_aclose(agen), timeout)
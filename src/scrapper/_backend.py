@@ -0,0 +1,70 @@
+"""HTML tree-builder backends for the calendar parser.
+
+The parser only relies on the BeautifulSoup Tag API, so backends are the bs4
+tree builders: `lxml` (C-backed) and the pure-Python `html.parser` that
+ships with the standard library. Most of a parse is spent building bs4 Tags
+and walking rows rather than tokenizing, so lxml is only about 1.25-1.3x
+faster end to end on the month fixtures (`python -m benchmarks.run`). Select
+one with the PARSER_BACKEND env var; the default `auto` picks the fastest
+installed one.
+"""
+
+import importlib.util
+import logging
+import os
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Ordered fastest first; value is the module that must be importable.
+BACKENDS = {
+    "lxml": "lxml",
+    "html.parser": None,
+}
+
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+
+
+def available_backends():
+    """Return the names of installed backends, fastest first."""
+    return [
+        name
+        for name, module in BACKENDS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def resolve_backend(name=None):
+    """Map a backend name (or 'auto') to an installed backend.
+
+    Unknown or missing backends fall back to the fastest installed one.
+    """
+    name = (name or PARSER_BACKEND or "auto").strip().lower()
+    installed = available_backends()
+    if name == "auto":
+        return installed[0]
+    if name in installed:
+        return name
+    logger.warning("Parser backend %r is not available; using %r", name, installed[0])
+    return installed[0]
+
+
+_active_backend = resolve_backend()
+
+
+def get_backend():
+    """Return the backend used by `make_soup` when none is given."""
+    return _active_backend
+
+
+def set_backend(name):
+    """Switch the default backend at runtime; returns the resolved name."""
+    global _active_backend
+    _active_backend = resolve_backend(name)
+    return _active_backend
+
+
+def make_soup(html, backend=None):
+    """Build a BeautifulSoup tree for `html` with the selected backend."""
+    return BeautifulSoup(html, resolve_backend(backend) if backend else _active_backend)
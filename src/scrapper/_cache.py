@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import threading
+import weakref
+import time
+from collections import OrderedDict
+from datetime import date
+
+from ._singleflight import SingleFlight
+from ._store import get_event_store, load_stored_page, save_stored_page
+from ._utils import env_float, env_int, page_span, parse_page_url
+
+logger = logging.getLogger(__name__)
+
+# Cache sizing / TTLs can be overridden via environment (.env).
+# A TTL of 0 for past pages means "never expire".
+CACHE_MAX_ENTRIES = env_int("RECORD_CACHE_SIZE", 512)
+CACHE_TTL = env_float("RECORD_CACHE_TTL", 60.0)
+CACHE_PAST_TTL = env_float("RECORD_CACHE_PAST_TTL", 86400.0)
+
+# `RecordCache.put` default: pick the TTL with `ttl_for`.
+_DEFAULT_TTL = object()
+
+
+class RecordCache:
+    """Bounded LRU cache of parsed record lists with a per-entry TTL.
+
+    Keys are (site, timeline, date) tuples as returned by `parse_page_url`.
+    Counters for hits, misses, evictions and expirations are kept so the
+    cache can be sized from real traffic (see `stats`).
+    """
+
+    def __init__(
+        self,
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl=CACHE_TTL,
+        past_ttl=CACHE_PAST_TTL,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl
+        self.past_ttl = past_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at_or_None, records)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, key, today=None):
+        """Pick the TTL for a key: short for pages touching today or later, long for past pages.
+
+        Returns None for entries that should never expire.
+        """
+        _, timeline, page_date = key
+        _, last = page_span(timeline, page_date)
+        if last < (today or date.today()):
+            return self.past_ttl or None
+        return self.ttl
+
+    def get(self, key):
+        """Return cached records for `key` or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, records = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return records
+
+    def peek(self, key):
+        """Return fresh records for `key` without touching counters or LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, records = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            return None
+        return records
+
+    def put(self, key, records, ttl=_DEFAULT_TTL):
+        """Store records for `key`; `ttl` defaults to `ttl_for(key)`.
+
+        A `ttl` of None never expires; a `ttl` of 0 stores nothing.
+        """
+        if ttl is _DEFAULT_TTL:
+            ttl = self.ttl_for(key)
+        if self.max_entries == 0 or ttl == 0:
+            return
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, records)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        """Return counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+# Shared by every site scraper; keys carry the site host so entries never collide.
+record_cache = RecordCache()
+
+# Coalesces concurrent cache misses for the same page into one upstream fetch.
+record_flight = SingleFlight()
+
+
+def _load_and_store(key, url, loader):
+    # A caller that lost the race may start a new flight just after the previous
+    # one stored its result; re-check before going upstream again.
+    records = record_cache.peek(key)
+    if records is not None:
+        return records
+    # complete past pages are served from the on-disk event store when enabled
+    records = load_stored_page(key)
+    if records is None:
+        records = loader(url)
+        save_stored_page(key, records)
+    record_cache.put(key, records)
+    return records
+
+
+def cached_records(url, loader):
+    """Return records for `url` from `record_cache`, calling `loader(url)` on a miss.
+
+    Concurrent misses for the same page share a single `loader` call (and its
+    result or error). URLs that `parse_page_url` cannot key are only coalesced.
+    """
+    key = parse_page_url(url)
+    if key is None:
+        return record_flight.do(url, loader, url)
+
+    records = record_cache.get(key)
+    if records is not None:
+        return records
+
+    return record_flight.do(key, _load_and_store, key, url, loader)
+
+
+async def _async_load(key, url, loader):
+    # the store does blocking sqlite I/O, so it only runs in a thread when enabled
+    if key is None or get_event_store() is None:
+        return await loader(url)
+    records = await asyncio.to_thread(load_stored_page, key)
+    if records is None:
+        records = await loader(url)
+        await asyncio.to_thread(save_stored_page, key, records)
+    return records
+
+
+def query_cached_records(url, query, loader):
+    """Return (total, records) for the records on `url` matching RecordQuery `query`.
+
+    Normally the full page goes through `cached_records`, so later requests
+    with other filters reuse it, and is filtered in one pass. When both the
+    record cache and the event store are disabled nothing would reuse the full
+    page, so `loader(url, query)` is called with the filters pushed into the
+    parser and non-matching rows never become records. Concurrent requests for
+    the same page and filters still share one `loader` call.
+    """
+    if record_cache.max_entries == 0 and get_event_store() is None:
+        flight_key = (parse_page_url(url) or url, query.filter_key)
+        records = record_flight.do(flight_key, loader, url, query.without_paging())
+        return len(records), query.page(records)
+    return query.select(cached_records(url, loader))
+
+
+def _refresh_and_store(key, url, loader, ttl):
+    records = loader(url)
+    save_stored_page(key, records, fresh_for=ttl)
+    default_ttl = record_cache.ttl_for(key)
+    if ttl and default_ttl:
+        default_ttl = max(ttl, default_ttl)
+    record_cache.put(key, records, default_ttl)
+    return records
+
+
+def refresh_cached_records(url, loader, ttl=None):
+    """Call `loader(url)` even when the page is cached and store the fresh result.
+
+    Used by the prefetch scheduler so request handlers find warm entries. A
+    request missing the same page meanwhile joins this load instead of
+    starting its own. `ttl` (seconds) keeps the entry at least that long,
+    and the event store serves the page to other workers until then.
+    """
+    key = parse_page_url(url)
+    if key is None:
+        return loader(url)
+    return record_flight.do(key, _refresh_and_store, key, url, loader, ttl)
+
+
+# Per-event-loop map of in-flight async loads: loop -> {key: Task}
+_async_flights = weakref.WeakKeyDictionary()
+
+
+async def _async_load_and_cache(key, url, loader):
+    records = record_cache.peek(key) if key is not None else None
+    if records is None:
+        records = await _async_load(key, url, loader)
+        if key is not None:
+            record_cache.put(key, records)
+    return records
+
+
+async def async_cached_records(url, loader):
+    """Async counterpart of `cached_records`; `loader` is a coroutine function.
+
+    Concurrent misses on the same event loop await one `loader(url)` call. The
+    load runs in its own task that every caller shields, so a cancelled caller
+    (e.g. a disconnected client) neither stops it nor cancels the others.
+    """
+    key = parse_page_url(url)
+    if key is not None:
+        records = record_cache.get(key)
+        if records is not None:
+            return records
+
+    loop = asyncio.get_running_loop()
+    flights = _async_flights.setdefault(loop, {})
+    flight_key = key if key is not None else url
+    task = flights.get(flight_key)
+    if task is None:
+        task = loop.create_task(_async_load_and_cache(key, url, loader))
+        flights[flight_key] = task
+
+        def _done(task):
+            if flights.get(flight_key) is task:
+                del flights[flight_key]
+            if not task.cancelled():
+                task.exception()  # mark retrieved when every caller was cancelled
+
+        task.add_done_callback(_done)
+    return await asyncio.shield(task)
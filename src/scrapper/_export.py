@@ -0,0 +1,26 @@
+"""Optional export helpers. pandas is imported lazily so the scraping/API path never loads it."""
+
+import logging
+
+from ._parser import parse_calendar_from_html
+
+logger = logging.getLogger(__name__)
+
+
+def records_to_dataframe(records):
+    """Return a pandas DataFrame built from a list of record dicts.
+
+    Raises ImportError with an install hint when pandas is not available.
+    """
+    try:
+        from pandas import DataFrame
+    except ImportError as e:
+        raise ImportError(
+            "pandas is required for DataFrame export; install it with `pip install pandas`"
+        ) from e
+    return DataFrame(records)
+
+
+def parse_calendar_to_dataframe(html, url, backend=None):
+    """Parse a calendar page straight into a pandas DataFrame."""
+    return records_to_dataframe(parse_calendar_from_html(html, url, backend=backend))
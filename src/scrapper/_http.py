@@ -1,20 +1,210 @@
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
 import cloudscraper
 
+from ._metrics import (
+    error_type,
+    host_of,
+    upstream_errors,
+    upstream_fetch_seconds,
+    upstream_html_bytes,
+)
+from ._snapshots import save_snapshot
+from ._utils import env_float, env_int
+
 logger = logging.getLogger(__name__)
 
+# Pool sizing can be overridden via environment (.env). Defaults suit a single worker.
+POOL_SIZE = env_int("SESSION_POOL_SIZE", 4)
+POOL_IDLE_TIMEOUT = env_float("SESSION_IDLE_TIMEOUT", 300.0)
+POOL_ACQUIRE_TIMEOUT = env_float("SESSION_ACQUIRE_TIMEOUT", 30.0)
+
+
+class SessionPool:
+    """Bounded, thread-safe pool of cloudscraper sessions keyed by host.
+
+    Each host gets at most `max_size` live sessions. Sessions that already passed
+    the Cloudflare challenge are reused so later requests skip the handshake and
+    challenge. Idle sessions older than `idle_timeout` seconds are closed, and a
+    session that raised during a request is discarded instead of returned.
+    """
+
+    def __init__(
+        self,
+        max_size=POOL_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+        factory=None,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._factory = factory or cloudscraper.create_scraper
+        self._lock = threading.Lock()
+        self._idle = {}  # host -> deque[(session, last_used)]
+        self._slots = {}  # host -> BoundedSemaphore limiting live sessions
+        self._in_use = {}  # host -> int
+        self._created = 0
+        self._discarded = 0
+
+    def _slot(self, host):
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_size)
+                self._slots[host] = slot
+                self._idle[host] = deque()
+                self._in_use[host] = 0
+            return slot
+
+    def _evict_idle_locked(self, host, now):
+        """Close sessions of `host` idle for longer than idle_timeout (lock held)."""
+        idle = self._idle.get(host)
+        if not idle or self.idle_timeout is None:
+            return
+        # oldest entries sit on the left
+        while idle and now - idle[0][1] > self.idle_timeout:
+            session, _ = idle.popleft()
+            self._close(session)
+
+    def _close(self, session):
+        self._discarded += 1
+        try:
+            session.close()
+        except Exception:
+            logger.debug("Failed to close pooled session", exc_info=True)
+
+    def acquire(self, host):
+        """Check out a session for `host`, creating one if none are idle.
+
+        Blocks while `max_size` sessions for the host are in use and raises
+        RuntimeError if none frees up within acquire_timeout seconds.
+        """
+        slot = self._slot(host)
+        if not slot.acquire(timeout=self.acquire_timeout):
+            raise RuntimeError(f"Timed out waiting for a session to {host}")
+
+        try:
+            with self._lock:
+                self._evict_idle_locked(host, time.monotonic())
+                idle = self._idle[host]
+                session = idle.pop()[0] if idle else None
+                self._in_use[host] += 1
+            if session is None:
+                session = self._factory()
+                with self._lock:
+                    self._created += 1
+            return session
+        except Exception:
+            with self._lock:
+                self._in_use[host] -= 1
+            slot.release()
+            raise
+
+    def release(self, host, session, discard=False):
+        """Return a session to the pool, or close it when `discard` is True."""
+        with self._lock:
+            self._in_use[host] -= 1
+            if discard:
+                self._close(session)
+            else:
+                self._idle[host].append((session, time.monotonic()))
+                self._evict_idle_locked(host, time.monotonic())
+        self._slots[host].release()
+
+    @contextmanager
+    def session(self, url):
+        """Context manager yielding a pooled session for the host of `url`.
+
+        Any exception raised inside the block recycles the session.
+        """
+        host = urlsplit(url).netloc.lower()
+        session = self.acquire(host)
+        try:
+            yield session
+        except BaseException:
+            self.release(host, session, discard=True)
+            raise
+        else:
+            self.release(host, session)
+
+    def clear(self):
+        """Close every idle session (e.g. after a fork or in tests)."""
+        with self._lock:
+            for idle in self._idle.values():
+                while idle:
+                    self._close(idle.popleft()[0])
+
+    def reset(self):
+        """Forget all sessions and locks without closing them.
+
+        For forked worker processes: sessions and lock state inherited from the
+        parent must not be shared, so the child starts with an empty pool and
+        zeroed counters.
+        """
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._in_use = {}
+        self._created = 0
+        self._discarded = 0
+
+    def clearance(self, host):
+        """Return (cookies, user_agent) of the last idle session for `host`, or None.
+
+        Lets another HTTP client reuse the Cloudflare clearance a pooled
+        session earned; the clearance cookie is only valid with the same
+        User-Agent.
+        """
+        with self._lock:
+            idle = self._idle.get(host)
+            if not idle:
+                return None
+            session = idle[-1][0]
+            return session.cookies.get_dict(), session.headers.get("User-Agent")
+
+    def stats(self):
+        """Return a snapshot of pool counters."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "created": self._created,
+                "discarded": self._discarded,
+                "idle": {h: len(q) for h, q in self._idle.items()},
+                "in_use": dict(self._in_use),
+            }
+
+
+# Shared by every site scraper so sessions are reused across endpoints.
+session_pool = SessionPool()
+
 
 def get_page_html(url, timeout=10):
-    """Fetch page HTML using cloudscraper and return the source text.
+    """Fetch page HTML using a pooled cloudscraper session and return the source text.
 
     Raises RuntimeError on network errors (keeps behaviour of previous scrapers).
+    With SNAPSHOT_DIR set, the raw page is also kept in the snapshot store.
     """
-    scraper = cloudscraper.create_scraper()
+    host = host_of(url)
     try:
-        resp = scraper.get(url, timeout=timeout)
-        resp.raise_for_status()
+        with session_pool.session(url) as scraper:
+            # time the request only, not the wait for a pooled session
+            started = time.perf_counter()
+            resp = scraper.get(url, timeout=timeout)
+            elapsed = time.perf_counter() - started
+            resp.raise_for_status()
     except Exception as e:
+        upstream_errors.inc(host=host, client="cloudscraper", type=error_type(e))
         logger.exception("Failed to fetch page HTML")
         raise RuntimeError(f"Failed to get URL {url}: {e}")
 
-    return resp.text
+    html = resp.text
+    upstream_fetch_seconds.observe(elapsed, host=host, client="cloudscraper")
+    upstream_html_bytes.observe(len(html.encode()), host=host)
+    save_snapshot(url, html)
+    return html
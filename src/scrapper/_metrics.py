@@ -0,0 +1,300 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+A small, dependency-free registry of counters and histograms with labels,
+plus figures read at scrape time from the record cache and session pool. The
+instrumented stages are upstream fetches (`get_page_html` and the aiohttp
+path), page parsing (`iter_calendar_records`, which `parse_calendar_from_html`
+and the NDJSON streams use), response serialization and whole HTTP requests. `render()` produces the body of `GET /metrics`.
+
+Each process keeps its own registry; under gunicorn or uvicorn with several
+workers every scrape reads the worker that answered it. Set
+METRICS_ENABLED=False to turn instrumentation and the endpoint off.
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+PREFIX = "scraper_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 131072, 262144, 524288, 1048576, 4194304)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(series))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def _render_series(self, series):
+        for key, value in series:
+            yield f"{self.name}_total{_labels_text(self.label_names, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                # per-bucket counts (last slot is +Inf), sum, count
+                state = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels):
+        """Return (count, sum) for one label set."""
+        with self._lock:
+            state = self._series.get(self._key(labels))
+            return (state[2], state[1]) if state else (0, 0.0)
+
+    def _render_series(self, series):
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                labels = _labels_text(self.label_names, key, (("le", _number(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels_text(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+upstream_fetch_seconds = Histogram(
+    "upstream_fetch_seconds",
+    "Time to download a calendar page from the upstream site.",
+    ("host", "client"),
+)
+upstream_html_bytes = Histogram(
+    "upstream_html_bytes",
+    "Size of downloaded calendar pages in bytes.",
+    ("host",),
+    SIZE_BUCKETS,
+)
+upstream_errors = Counter(
+    "upstream_errors",
+    "Failed upstream fetches by error type.",
+    ("host", "client", "type"),
+)
+parse_seconds = Histogram(
+    "parse_seconds",
+    "Time spent parsing a calendar page into records, including streamed and failed pages.",
+    ("host",),
+)
+parse_rows = Histogram(
+    "parse_rows",
+    "Records produced per parsed calendar page (streams stopped early count what they yielded).",
+    ("host",),
+    ROW_BUCKETS,
+)
+parse_errors = Counter(
+    "parse_errors",
+    "Calendar pages (stage=page) and event rows (stage=row) that failed to parse.",
+    ("host", "stage"),
+)
+serialize_seconds = Histogram(
+    "serialize_seconds",
+    "Time to serialize a JSON response body.",
+    ("endpoint",),
+)
+request_seconds = Histogram(
+    "http_request_seconds",
+    "Total time spent handling an API request.",
+    ("endpoint", "method", "status"),
+)
+
+_METRICS = (
+    upstream_fetch_seconds,
+    upstream_html_bytes,
+    upstream_errors,
+    parse_seconds,
+    parse_rows,
+    parse_errors,
+    serialize_seconds,
+    request_seconds,
+)
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def error_type(exc):
+    """Classify an upstream failure: http_<status>, timeout, connection, challenge or other."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return f"http_{status}"
+    name = type(exc).__name__.lower()
+    if "cloudflare" in name or "challenge" in name:
+        return "challenge"
+    if "timeout" in name or isinstance(exc, TimeoutError):
+        return "timeout"
+    if "connect" in name or isinstance(exc, ConnectionError):
+        return "connection"
+    return "other"
+
+
+def _collected(name, help_text, samples, label_names=(), kind="gauge"):
+    """Render a metric read at scrape time from [(label values, value)]."""
+    suffix = "_total" if kind == "counter" else ""
+    lines = [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+    for values, value in samples:
+        labels = _labels_text(label_names, values)
+        lines.append(f"{PREFIX}{name}{suffix}{labels} {_number(value)}")
+    return lines
+
+
+def _collect_state():
+    """Record cache and session pool figures, read from their own counters."""
+    from ._cache import record_cache
+    from ._http import session_pool
+
+    cache = record_cache.stats()
+    lines = _collected(
+        "record_cache_lookups",
+        "Record cache lookups by result.",
+        [(("hit",), cache["hits"]), (("miss",), cache["misses"])],
+        ("result",),
+        "counter",
+    )
+    lines += _collected(
+        "record_cache_hit_ratio",
+        "Record cache hits / lookups since start.",
+        [((), cache["hit_ratio"])],
+    )
+    lines += _collected(
+        "record_cache_entries", "Pages held in the record cache.", [((), cache["size"])]
+    )
+    lines += _collected(
+        "record_cache_removals",
+        "Record cache entries dropped, by reason.",
+        [(("lru",), cache["evictions"]), (("expired",), cache["expirations"])],
+        ("reason",),
+        "counter",
+    )
+
+    pool = session_pool.stats()
+    hosts = sorted(set(pool["in_use"]) | set(pool["idle"]))
+    lines += _collected(
+        "session_pool_sessions",
+        "Pooled upstream sessions per host, by state.",
+        [((h, "in_use"), pool["in_use"].get(h, 0)) for h in hosts]
+        + [((h, "idle"), pool["idle"].get(h, 0)) for h in hosts],
+        ("host", "state"),
+    )
+    lines += _collected(
+        "session_pool_utilization",
+        "Sessions in use per host / pool size.",
+        [((h,), pool["in_use"].get(h, 0) / pool["max_size"]) for h in hosts],
+        ("host",),
+    )
+    lines += _collected(
+        "session_pool_max_size",
+        "Max pooled sessions per host.",
+        [((), pool["max_size"])],
+    )
+    return lines
+
+
+def render():
+    """Return every metric in the Prometheus text format (version 0.0.4)."""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_collect_state())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Clear every counter and histogram (for tests)."""
+    for metric in _METRICS:
+        metric.clear()
@@ -1,11 +1,12 @@
 import logging
 import re
 import os
+import time
 from datetime import datetime
-from bs4 import BeautifulSoup
-from pandas import DataFrame
 
+from ._backend import make_soup
 from ._constants import BASE_MONTH_NUMBERS
+from ._metrics import host_of, parse_errors, parse_rows, parse_seconds
 from ._time import to_24h
 from ._utils import date_to_string
 
@@ -22,6 +23,59 @@ EVENT_CLASS = os.getenv("EVENT", "calendar__event")
 ROW_ID_ATTR = os.getenv("ROW_ID", "data-event-id")
 
 
+# Patterns used on every page/row are compiled once at import time.
+_NEW_DAY_RE = re.compile(r"new[-_ ]?day|row--new-day")
+_DATE_TEXT_RE = re.compile(r"([A-Za-z]{3,9})\s+([0-9]{1,2})(?:,?\s*([0-9]{4}))?")
+_DATE_TEXT_ALT_RE = re.compile(r"([0-9]{1,2})[\-/ ]([A-Za-z]{3,9})[\-/ ]([0-9]{4})")
+_YEAR_RE = re.compile(r"(20[0-9]{2})")
+_ICON_CLASS_RE = re.compile(r"icon|impact")
+_IMPACT_LOW_RE = re.compile(
+    r"\b(yel|yellow|impact.*yel|impact.*yellow|impact-yel|ee-impact-yel)\b"
+)
+_IMPACT_MEDIUM_RE = re.compile(
+    r"\b(ora|orange|impact.*ora|impact.*orange|impact-ora)\b"
+)
+_IMPACT_HIGH_RE = re.compile(r"\b(red|impact.*red|impact-red)\b")
+
+# Known impact icon classes resolve with a dict lookup before any regex runs
+_IMPACT_BY_CLASS = {
+    "icon--ff-impact-yel": "low",
+    "icon--ff-impact-ora": "medium",
+    "icon--ff-impact-red": "high",
+}
+
+# Memos of class strings / attribute text already classified. Pages reuse a
+# handful of values, so these stay tiny; the cap guards against odd markup.
+_MEMO_MAX = 1024
+_icon_class_memo = {}
+_impact_memo = {}
+
+_CALENDAR_TABLE_OPEN_RE = re.compile(
+    r"""<table\b[^>]*\bclass\s*=\s*["'][^"']*\bcalendar__table\b[^>]*>""", re.I
+)
+_TABLE_TAG_RE = re.compile(r"<(/?)table\b", re.I)
+
+
+def _slice_calendar_table(html):
+    """Return just the `<table class="calendar__table">...</table>` markup, or None.
+
+    Calendar pages are mostly scripts, navigation and ads; cutting the table
+    out of the raw text before tree building keeps parse time and memory
+    proportional to the table. Nested tables are balanced.
+    """
+    if not isinstance(html, str):
+        return None
+    m = _CALENDAR_TABLE_OPEN_RE.search(html)
+    if not m:
+        return None
+    depth = 1
+    for tag in _TABLE_TAG_RE.finditer(html, m.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[m.start() : html.index(">", tag.end()) + 1]
+    return None
+
+
 def _find_table(soup):
     """Try a few selectors then fall back to any table with td."""
     selectors = [
@@ -50,9 +104,7 @@ def _find_start_row(table):
     """
     start_row = table.find_next("tr", class_="calendar__row--new-day")
     if not start_row:
-        start_row = table.find_next(
-            "tr", class_=re.compile(r"new[-_ ]?day|row--new-day")
-        )
+        start_row = table.find_next("tr", class_=_NEW_DAY_RE)
     if not start_row:
         start_span = table.select_one("span.date, .date")
         if start_span:
@@ -95,6 +147,30 @@ def _find_date_node(start_row, table):
     return None
 
 
+def _parse_date_text(dt_text):
+    """Parse day/month (and optional year) from a calendar date label.
+
+    Handles 'Jan 1', 'Wed Jan 1', 'Jan 1, 2020' and '01 Jan 2020' styles.
+    Returns (day, month, year_or_None) or None if no date is found.
+    """
+    # pattern: MonthName Day [Year]
+    m = _DATE_TEXT_RE.search(dt_text)
+    if m:
+        month = BASE_MONTH_NUMBERS.get(m.group(1)[:3].title())
+        if month is not None:
+            year = int(m.group(3)) if m.group(3) else None
+            return int(m.group(2)), month, year
+
+    # Alternative pattern like '01 Jan 2020' or 'Jan 01 2020'
+    m2 = _DATE_TEXT_ALT_RE.search(dt_text)
+    if m2:
+        month = BASE_MONTH_NUMBERS.get(m2.group(2)[:3].title())
+        if month is not None:
+            return int(m2.group(1)), month, int(m2.group(3))
+
+    return None
+
+
 def _extract_start_date(start_row, url, table):
     """Extract day, month, year from the start_row text or url.
 
@@ -108,63 +184,64 @@ def _extract_start_date(start_row, url, table):
         raise ValueError("Start date text not found")
 
     dt_text = start_date.text.strip()
-
-    # pattern: MonthName Day [Year]
-    m = re.search(r"([A-Za-z]{3,9})\s+([0-9]{1,2})(?:,?\s*([0-9]{4}))?", dt_text)
-    month = None
-    day = None
-    year = None
-    if m:
-        month_str = m.group(1)
-        month_key = month_str[:3].title()
-        month = BASE_MONTH_NUMBERS.get(month_key)
-        try:
-            day = int(m.group(2))
-        except Exception:
-            day = None
-        if m.group(3):
-            try:
-                year = int(m.group(3))
-            except Exception:
-                year = None
+    parsed = _parse_date_text(dt_text)
+    if parsed is None:
+        logger.error("Failed to parse start date from text: %s", dt_text)
+        raise ValueError("Failed to parse start date")
+    day, month, year = parsed
 
     # Try to find year in url
     if year is None:
-        yr_match = re.search(r"(20[0-9]{2})", url)
+        yr_match = _YEAR_RE.search(url)
         if yr_match:
-            try:
-                year = int(yr_match.group(1))
-            except Exception:
-                year = None
+            year = int(yr_match.group(1))
 
-    # Try any 4-digit year in table text
+    # Try a 4-digit year in the start row (not the whole table: serializing
+    # every row just to find a year is far too costly per request)
     if year is None:
-        yr2 = re.search(r"(20[0-9]{2})", table.get_text())
+        yr2 = _YEAR_RE.search(start_row.get_text(" "))
         if yr2:
-            try:
-                year = int(yr2.group(1))
-            except Exception:
-                year = None
+            year = int(yr2.group(1))
 
     if year is None:
         year = datetime.now().year
 
-    # Alternative pattern like '01 Jan 2020' or 'Jan 01 2020'
-    if month is None or day is None:
-        m2 = re.search(r"([0-9]{1,2})[\-/ ]([A-Za-z]{3,9})[\-/ ]([0-9]{4})", dt_text)
-        if m2:
-            try:
-                day = int(m2.group(1))
-                month = BASE_MONTH_NUMBERS.get(m2.group(2)[:3].title())
-                year = int(m2.group(3))
-            except Exception:
-                pass
+    return int(day), int(month), int(year)
 
-    if month is None or day is None:
-        logger.error("Failed to parse start date from text: %s", dt_text)
-        raise ValueError("Failed to parse start date")
 
-    return int(day), int(month), int(year)
+def _is_new_day_row(row_classes):
+    return "new-day" in row_classes or "new_day" in row_classes
+
+
+def _new_day_date(row, day, month, year):
+    """Return the (day, month, year) a `calendar__row--new-day` row starts.
+
+    Week and month pages only label days as 'Mon Jan 6'; the year is carried
+    over from the previous day and bumped when the month wraps (Dec -> Jan).
+    Returns the current date unchanged when the row has no readable label.
+    """
+    node = row.find(class_="date") or row.find("span")
+    if node is None:
+        return day, month, year
+    parsed = _parse_date_text(node.get_text(" ", strip=True))
+    if parsed is None:
+        return day, month, year
+    new_day, new_month, new_year = parsed
+    if new_year is None:
+        new_year = year + 1 if new_month < month else year
+    return new_day, new_month, new_year
+
+
+# Column order used when cells carry no recognisable class
+_COLUMN_ORDER = [
+    TIME_CLASS,
+    CURRENCY_CLASS,
+    EVENT_CLASS,
+    FORECAST_CLASS,
+    ACTUAL_CLASS,
+    PREV_CLASS,
+    IMPACT_CLASS,
+]
 
 
 def _find_cell_with_class(cells, class_name):
@@ -187,17 +264,8 @@ def _find_cell_with_class(cells, class_name):
             return descendant
 
     # 3) fallback by column index
-    order = [
-        TIME_CLASS,
-        CURRENCY_CLASS,
-        EVENT_CLASS,
-        FORECAST_CLASS,
-        ACTUAL_CLASS,
-        PREV_CLASS,
-        IMPACT_CLASS,
-    ]
     try:
-        idx = order.index(class_name)
+        idx = _COLUMN_ORDER.index(class_name)
         if idx < len(cells):
             return cells[idx]
     except ValueError:
@@ -206,6 +274,61 @@ def _find_cell_with_class(cells, class_name):
     return None
 
 
+class _ColumnLayout:
+    """Field -> column mapping for one table, resolved once from a data row.
+
+    Each field maps to (index, mode) where mode is 'cell' (the td carries the
+    class), 'nested' (a descendant of the td carries it) or 'position' (no
+    class found; column order fallback). Rows with a different shape are not
+    matched and go through the per-row `_find_cell_with_class` scan instead.
+    """
+
+    def __init__(self, width, columns):
+        self.width = width
+        self.columns = columns
+
+    @classmethod
+    def from_cells(cls, cells):
+        columns = {}
+        for class_name in _COLUMN_ORDER:
+            found = None
+            for idx, cell in enumerate(cells):
+                if class_name in (cell.get("class") or []):
+                    found = (idx, "cell")
+                    break
+            if found is None:
+                for idx, cell in enumerate(cells):
+                    if cell.find(class_=class_name):
+                        found = (idx, "nested")
+                        break
+            if found is None:
+                idx = _COLUMN_ORDER.index(class_name)
+                found = (idx, "position") if idx < len(cells) else None
+            columns[class_name] = found
+        return cls(len(cells), columns)
+
+    def pick(self, cells):
+        """Return {class_name: cell_or_None} for a matching row, or None."""
+        if len(cells) != self.width:
+            return None
+        picked = {}
+        for class_name, found in self.columns.items():
+            if found is None:
+                picked[class_name] = None
+                continue
+            idx, mode = found
+            cell = cells[idx]
+            if mode == "cell":
+                if class_name not in (cell.get("class") or []):
+                    return None
+            elif mode == "nested":
+                cell = cell.find(class_=class_name)
+                if cell is None:
+                    return None
+            picked[class_name] = cell
+        return picked
+
+
 def _find_impact_node(cell):
     """Locate the most likely node inside impact cell that indicates impact.
 
@@ -216,11 +339,16 @@ def _find_impact_node(cell):
 
     # 1) any element whose classes contain icon-like indicators
     for tag in cell.find_all(True):
-        classes = tag.get("class") or []
-        if any(
-            re.search(r"icon|impact|calendar__impact-icon|icon--ff-impact", c)
-            for c in classes
-        ):
+        classes = tag.get("class")
+        if not classes:
+            continue
+        key = " ".join(classes)
+        is_icon = _icon_class_memo.get(key)
+        if is_icon is None:
+            is_icon = bool(_ICON_CLASS_RE.search(key))
+            if len(_icon_class_memo) < _MEMO_MAX:
+                _icon_class_memo[key] = is_icon
+        if is_icon:
             return tag
 
     # 2) any img element (src often contains 'impact-yel' etc)
@@ -247,41 +375,49 @@ def _normalize_impact_value(node):
     if node is None:
         return "n/a"
 
+    class_list = node.get("class") or []
+
+    # Known icon classes (the common case) need no string building at all
+    for c in class_list:
+        impact = _IMPACT_BY_CLASS.get(c)
+        if impact is not None:
+            return impact
+
     # Collect candidate strings from classes, src, alt, title and text
-    classes = " ".join(node.get("class") or [])
+    classes = " ".join(class_list)
     src = node.get("src") or ""
     alt = node.get("alt") or ""
     title = node.get("title") or ""
     text = getattr(node, "text", "") or ""
 
     combined = " ".join([classes, src, alt, title, text]).lower()
+    impact = _impact_memo.get(combined)
+    if impact is not None:
+        return impact
 
     # Look for known markers
-    if re.search(
-        r"\b(yel|yellow|impact.*yel|impact.*yellow|impact-yel|ee-impact-yel)\b",
-        combined,
-    ):
-        return "low"
-    if re.search(r"\b(ora|orange|impact.*ora|impact.*orange|impact-ora)\b", combined):
-        return "medium"
-    if re.search(r"\b(red|impact.*red|impact-red)\b", combined):
-        return "high"
-
-    # Legacy class names used by previous parser
-    if "icon--ff-impact-yel" in classes:
-        return "low"
-    if "icon--ff-impact-ora" in classes:
-        return "medium"
-    if "icon--ff-impact-red" in classes:
-        return "high"
-
-    return "n/a"
-
-
-def _parse_row_to_record(row, base_day, base_month, base_year, dt):
+    if _IMPACT_LOW_RE.search(combined):
+        impact = "low"
+    elif _IMPACT_MEDIUM_RE.search(combined):
+        impact = "medium"
+    elif _IMPACT_HIGH_RE.search(combined):
+        impact = "high"
+    else:
+        impact = "n/a"
+
+    if len(_impact_memo) < _MEMO_MAX:
+        _impact_memo[combined] = impact
+    return impact
+
+
+def _parse_row_to_record(
+    row, base_day, base_month, base_year, dt, layout=None, query=None
+):
     """Parse a single table row into a record dict or return None to skip.
     Args:
     dt: current rolling datetime used by to_24h
+    layout: optional _ColumnLayout of the table; rows it does not match are scanned per cell
+    query: optional RecordQuery; rows it rejects are skipped before the remaining cells are read
     Returns tuple (record_dict, updated_dt) or (None, dt) on skip.
     """
     row_class_arr = row.get("class") or []
@@ -293,11 +429,19 @@ def _parse_row_to_record(row, base_day, base_month, base_year, dt):
     if not cells:
         return None, dt
 
+    picked = layout.pick(cells) if layout is not None else None
+    if picked is not None:
+        find_cell = picked.get
+    else:
+
+        def find_cell(class_name):
+            return _find_cell_with_class(cells, class_name)
+
     # --------------- Data Event ID ---------------
     row_id = row.get(f"{ROW_ID_ATTR}", None)
 
     # --------------- Time ---------------
-    time_cell = _find_cell_with_class(cells, TIME_CLASS)
+    time_cell = find_cell(TIME_CLASS)
     time_text = _safe_cell_text(time_cell)
 
     try:
@@ -307,31 +451,35 @@ def _parse_row_to_record(row, base_day, base_month, base_year, dt):
         return None, dt
 
     # --------------- [Currency] ---------------
-    curr_cell = _find_cell_with_class(cells, CURRENCY_CLASS)
+    curr_cell = find_cell(CURRENCY_CLASS)
     curr = _safe_cell_text(curr_cell)
 
     # --------------- Event ---------------
-    event_cell = _find_cell_with_class(cells, EVENT_CLASS)
+    event_cell = find_cell(EVENT_CLASS)
     name = _safe_cell_text(event_cell)
     if not name or name.lower() in ("n/a", "tbd", "tba"):
         return None, local_dt
+    if query is not None and not query.accepts_row(local_dt, curr, name):
+        return None, local_dt
 
     # --------------- Forecast ---------------
-    forecast_cell = _find_cell_with_class(cells, FORECAST_CLASS)
+    forecast_cell = find_cell(FORECAST_CLASS)
     forecast = _safe_cell_text(forecast_cell)
 
     # --------------- Actual ---------------
-    actual_cell = _find_cell_with_class(cells, ACTUAL_CLASS)
+    actual_cell = find_cell(ACTUAL_CLASS)
     actual = _safe_cell_text(actual_cell)
 
     # --------------- Previous ---------------
-    prev_cell = _find_cell_with_class(cells, PREV_CLASS)
+    prev_cell = find_cell(PREV_CLASS)
     previous = _safe_cell_text(prev_cell)
 
     # --------------- Impact ---------------
-    impact_cell = _find_cell_with_class(cells, IMPACT_CLASS)
+    impact_cell = find_cell(IMPACT_CLASS)
     impact_node = _find_impact_node(impact_cell)
     impact = _normalize_impact_value(impact_node)
+    if query is not None and not query.accepts_impact(impact):
+        return None, local_dt
 
     record = {
         "ID": row_id,
@@ -347,39 +495,110 @@ def _parse_row_to_record(row, base_day, base_month, base_year, dt):
     return record, local_dt
 
 
-def parse_calendar_from_html(html, url):
-    """Parse a calendar page HTML and return a list of record dicts.
-
-    Raises ValueError for parse problems (consistent with existing scrapers).
-    """
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    table = _find_table(soup)
+def _calendar_table(html, backend):
+    # Fast path: build a tree of the calendar table only; fall back to the
+    # full document (and the selector cascade in _find_table) if that misses.
+    table = None
+    fragment = _slice_calendar_table(html)
+    if fragment is not None:
+        table = _find_table(make_soup(fragment, backend))
+    if table is None:
+        table = _find_table(make_soup(html, backend))
     if table is None:
         logger.error("Calendar table not found in page")
         raise ValueError("Calendar table not found in page")
+    return table
+
+
+def iter_calendar_records(html, url, offset=0, limit=None, backend=None, query=None):
+    """Yield the records of a calendar page one row at a time.
+
+    Rows are turned into record dicts only as the caller consumes them, so
+    stopping early skips the rest of the table. With `offset`/`limit` the
+    generator stops by itself once it has produced `offset + limit` records;
+    the first `offset` are parsed (they carry the running date) but not
+    yielded. A RecordQuery `query` drops non-matching rows before their
+    record dict is built; offset/limit count matching records only (the
+    query's own paging is not applied). Raises ValueError on first iteration
+    if the calendar table is missing.
+
+    When the generator finishes, is closed or fails, the time spent inside
+    it (not in the consumer) and the rows it yielded go to the parse metrics;
+    pages and rows that fail to parse are counted in `parse_errors`.
+    """
+    host = host_of(url)
+    records = _iter_records(html, url, offset, limit, backend, query, host)
+    elapsed = 0.0
+    produced = 0
+    failed = False
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                rec = next(records, None)
+            except Exception:
+                failed = True
+                parse_errors.inc(host=host, stage="page")
+                raise
+            finally:
+                elapsed += time.perf_counter() - started
+            if rec is None:
+                return
+            produced += 1
+            yield rec
+    finally:
+        records.close()
+        parse_seconds.observe(elapsed, host=host)
+        if not failed:
+            parse_rows.observe(produced, host=host)
+
+
+def _iter_records(html, url, offset, limit, backend, query, host):
+    table = _calendar_table(html, backend)
+    stop = None if limit is None else offset + limit
+    if stop == 0:
+        return
 
     start_row = _find_start_row(table)
     day, month, year = _extract_start_date(start_row, url, table)
-    dt = datetime.now()
+    dt = datetime(year, month, day)
 
     table_body = table.find("tbody")
     rows = table_body.find_all("tr") if table_body else table.find_all("tr")
-    recs = []
+    produced = 0
+    layout = None
     for row in rows:
         try:
-            rec, dt = _parse_row_to_record(row, day, month, year, dt)
-            if not rec:
-                continue
-            recs.append(rec)
+            # Week/month pages hold several days: every new-day row starts the next one.
+            if row is not start_row and _is_new_day_row(
+                " ".join(row.get("class") or [])
+            ):
+                day, month, year = _new_day_date(row, day, month, year)
+                dt = datetime(year, month, day)
+            if layout is None:
+                cells = row.find_all("td")
+                if len(cells) > 1:
+                    layout = _ColumnLayout.from_cells(cells)
+            rec, dt = _parse_row_to_record(row, day, month, year, dt, layout, query)
         except Exception:
+            parse_errors.inc(host=host, stage="row")
             logger.exception("Failed to parse one event row, skipping")
             continue
+        if not rec:
+            continue
 
-    try:
-        df = DataFrame(recs)
-        return df.to_dict(orient="records")
-    except Exception:
-        logger.exception("Failed to convert records to DataFrame")
-        raise ValueError("Failed to convert records to DataFrame")
+        produced += 1
+        if produced > offset:
+            yield rec
+        if stop is not None and produced >= stop:
+            return
+
+
+def parse_calendar_from_html(html, url, backend=None, query=None):
+    """Parse a calendar page HTML and return a list of record dicts.
+
+    `backend` overrides the tree builder chosen via PARSER_BACKEND (see _backend).
+    `query` (a RecordQuery) keeps only matching records; paging is left to the caller.
+    Raises ValueError for parse problems (consistent with existing scrapers).
+    """
+    return list(iter_calendar_records(html, url, backend=backend, query=query))
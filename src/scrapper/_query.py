@@ -0,0 +1,118 @@
+"""Server-side filters and paging for calendar records.
+
+A RecordQuery is handed to the scraping layer so filtering and paging happen
+where records are produced: the parser checks the cheap fields of a row
+before it reads the rest or builds a record dict, and cached pages are
+filtered in a single pass that only keeps the requested page of results.
+"""
+
+from ._range import record_datetime
+
+IMPACT_LEVELS = ("low", "medium", "high", "n/a")
+
+
+class RecordQuery:
+    """Filters (currency, impact, event substring, time-of-day window) plus
+    offset/limit paging.
+
+    `currency` and `impact` are collections matched case-insensitively;
+    `event` is a case-insensitive substring of the event name; `time_from`
+    and `time_to` are inclusive `datetime.time` bounds on the record time.
+    Unset filters match everything.
+    """
+
+    def __init__(
+        self,
+        currency=None,
+        impact=None,
+        event=None,
+        time_from=None,
+        time_to=None,
+        offset=0,
+        limit=None,
+    ):
+        self.currency = frozenset(c.upper() for c in currency) if currency else None
+        self.impact = frozenset(i.lower() for i in impact) if impact else None
+        self.event = event.lower() if event else None
+        self.time_from = time_from
+        self.time_to = time_to
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def has_filters(self):
+        return any(
+            f is not None
+            for f in (
+                self.currency,
+                self.impact,
+                self.event,
+                self.time_from,
+                self.time_to,
+            )
+        )
+
+    @property
+    def filter_key(self):
+        """Hashable form of the filters (paging excluded), e.g. to coalesce equal loads."""
+        return (self.currency, self.impact, self.event, self.time_from, self.time_to)
+
+    def without_paging(self):
+        """Return a copy with the same filters and no offset/limit."""
+        return RecordQuery(
+            self.currency, self.impact, self.event, self.time_from, self.time_to
+        )
+
+    def accepts_row(self, dt, currency, event):
+        """Check the filters the parser can test before reading the rest of a row."""
+        if self.currency is not None and (currency or "").upper() not in self.currency:
+            return False
+        if self.event is not None and self.event not in (event or "").lower():
+            return False
+        if self.time_from is not None or self.time_to is not None:
+            if dt is None:
+                return False
+            t = dt.time()
+            if self.time_from is not None and t < self.time_from:
+                return False
+            if self.time_to is not None and t > self.time_to:
+                return False
+        return True
+
+    def accepts_impact(self, impact):
+        return self.impact is None or (impact or "").lower() in self.impact
+
+    def matches(self, record):
+        """Return True if a record dict passes every filter."""
+        if not isinstance(record, dict):
+            return False
+        needs_time = self.time_from is not None or self.time_to is not None
+        dt = record_datetime(record) if needs_time else None
+        return self.accepts_row(
+            dt, record.get("Currency"), record.get("Event")
+        ) and self.accepts_impact(record.get("Impact"))
+
+    def page(self, records):
+        """Apply offset/limit; without paging the list itself is returned (no copy)."""
+        if not self.offset and self.limit is None:
+            return records
+        stop = None if self.limit is None else self.offset + self.limit
+        return records[self.offset : stop]
+
+    def select(self, records):
+        """Return (total, page): the number of matching records and the requested page.
+
+        One pass over `records`; only the records inside the page are kept.
+        """
+        if not self.has_filters:
+            return len(records), self.page(records)
+        stop = None if self.limit is None else self.offset + self.limit
+        total = 0
+        selected = []
+        for rec in records:
+            if not self.matches(rec):
+                continue
+            if total >= self.offset and (stop is None or total < stop):
+                selected.append(rec)
+            total += 1
+        return total, selected
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from ._utils import TIMELINES, env_int, page_span, week_start
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent upstream page fetches for one range request.
+RANGE_WORKERS = env_int("RANGE_WORKERS", 8)
+
+RECORD_TIME_FORMAT = "%d/%m/%Y %H:%M"
+
+
+def _page_for(timeline, d):
+    """Return (page_date, last_covered_day) of the `timeline` page containing `d`."""
+    if timeline == "month":
+        page_date = d.replace(day=1)
+    elif timeline == "week":
+        page_date = week_start(d)
+    else:
+        page_date = d
+    return page_date, page_span(timeline, page_date)[1]
+
+
+def plan_pages(start, end, timelines=TIMELINES):
+    """Return the fewest calendar pages covering [start, end] as (timeline, date) tuples.
+
+    Pages may extend past either end of the range, and a week page may share
+    days with a neighbouring month page; `merge_records` takes each day from
+    one page only (see `page_windows`). When two plans need the same number of requests the one with
+    smaller pages wins, so a single day still maps to one day page. Pages are
+    returned in chronological order.
+    """
+    if end < start:
+        return []
+    n = (end - start).days + 1
+    # best[i] = (page count, pages) covering days i..n-1; solved right to left
+    best = [None] * n + [(0, ())]
+    for i in range(n - 1, -1, -1):
+        d = start + timedelta(days=i)
+        choice = None
+        # try small pages first so ties keep the smaller page
+        for timeline in ("day", "week", "month"):
+            if timeline not in timelines:
+                continue
+            page_date, last = _page_for(timeline, d)
+            nxt = min(n, (last - start).days + 1)
+            count, pages = best[nxt]
+            if choice is None or count + 1 < choice[0]:
+                choice = (count + 1, ((timeline, page_date),) + pages)
+        best[i] = choice
+    return list(best[0][1])
+
+
+def record_datetime(record):
+    """Parse the `Time` field of a record (dd/mm/YYYY HH:MM) or return None."""
+    try:
+        return datetime.strptime(record.get("Time") or "", RECORD_TIME_FORMAT)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def fetch_pages(get_records, get_url, pages, max_workers=RANGE_WORKERS):
+    """Fetch and parse `pages` concurrently, yielding record lists in page order.
+
+    `get_records(url)` / `get_url(day, month, year, timeline)` are the usual
+    scraper helpers. A bounded thread pool keeps at most `max_workers` pages in
+    flight. Results are yielded as soon as the next page in order is ready, and
+    a new page is only started when one is handed out, so a slow consumer holds
+    no more than `max_workers` pages. Closing the generator early cancels the
+    pages not started yet.
+    """
+    if not pages:
+        return
+    urls = iter(get_url(d.day, d.month, d.year, timeline) for timeline, d in pages)
+    workers = max(1, min(max_workers, len(pages)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque(
+            pool.submit(get_records, url) for _, url in zip(range(workers), urls)
+        )
+        try:
+            while pending:
+                records = pending.popleft().result()
+                url = next(urls, None)
+                if url is not None:
+                    pending.append(pool.submit(get_records, url))
+                yield records
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def page_windows(pages, start, end):
+    """Return the (first, last) days each of the chronological `pages` contributes.
+
+    A week page and a month page can share days (e.g. the week of Jan 27 and
+    the month of February). Each day is taken from the first page covering
+    it, so records on shared days are not returned twice. Windows are
+    clipped to [start, end]; a page adding no new day gets an empty window.
+    """
+    windows = []
+    covered = start - timedelta(days=1)
+    for timeline, page_date in pages:
+        first, last = page_span(timeline, page_date)
+        lo = max(first, start, covered + timedelta(days=1))
+        hi = min(last, end)
+        windows.append((lo, hi))
+        covered = max(covered, hi)
+    return windows
+
+
+def merge_records(page_results, pages, start, end):
+    """Merge per-page record lists into one time-ordered list limited to [start, end].
+
+    Each page only keeps the days of its `page_windows` entry, so pages that
+    overlap do not duplicate records. Records whose time cannot be parsed are
+    kept and ordered by their page start.
+    """
+    keyed = []
+    windows = page_windows(pages, start, end)
+    for (timeline, page_date), (lo, hi), records in zip(pages, windows, page_results):
+        if not isinstance(records, list):
+            continue
+        fallback = datetime.combine(
+            page_span(timeline, page_date)[0], datetime.min.time()
+        )
+        for rec in records:
+            dt = record_datetime(rec) if isinstance(rec, dict) else None
+            if dt is not None and not (lo <= dt.date() <= hi):
+                continue
+            keyed.append((dt or fallback, rec))
+    # sort is stable, so same-time records keep their on-page order
+    keyed.sort(key=lambda item: item[0])
+    return [rec for _, rec in keyed]
+
+
+def fetch_range(get_records, get_url, start, end, max_workers=RANGE_WORKERS):
+    """Fetch every page covering [start, end] in parallel and return merged records."""
+    pages = plan_pages(start, end)
+    results = list(fetch_pages(get_records, get_url, pages, max_workers=max_workers))
+    return merge_records(results, pages, start, end)
+
+
+def iter_range_records(get_records, get_url, start, end, max_workers=RANGE_WORKERS):
+    """Yield the records of [start, end] in time order, one page at a time.
+
+    Same records and order as `fetch_range`: planned pages are chronological
+    and each only contributes its `page_windows` days (week and month pages
+    may overlap), so every page is yielded as soon as it and every earlier
+    page are fetched, and callers can stream results without holding the
+    whole range in memory.
+    """
+    pages = plan_pages(start, end)
+    windows = page_windows(pages, start, end)
+    for page, (lo, hi), records in zip(
+        pages,
+        windows,
+        fetch_pages(get_records, get_url, pages, max_workers=max_workers),
+    ):
+        if lo <= hi:
+            yield from merge_records([records], [page], lo, hi)
+
+
+async def async_fetch_pages(get_records, get_url, pages, max_concurrency=RANGE_WORKERS):
+    """Async `fetch_pages`: `get_records` is a coroutine function.
+
+    At most `max_concurrency` pages are in flight; results keep page order.
+    """
+    slots = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(timeline, d):
+        async with slots:
+            return await get_records(get_url(d.day, d.month, d.year, timeline))
+
+    return await asyncio.gather(*(fetch(timeline, d) for timeline, d in pages))
+
+
+async def async_iter_pages(get_records, get_url, pages, max_concurrency=RANGE_WORKERS):
+    """Async generator version of `fetch_pages`: `get_records` is a coroutine function.
+
+    Yields record lists in page order. At most `max_concurrency` pages are in
+    flight and a new page is only started when one is handed out; closing the
+    generator cancels the pages still pending.
+    """
+    if not pages:
+        return
+    urls = iter(get_url(d.day, d.month, d.year, timeline) for timeline, d in pages)
+    workers = max(1, min(max_concurrency, len(pages)))
+    pending = deque(
+        asyncio.ensure_future(get_records(url)) for _, url in zip(range(workers), urls)
+    )
+    try:
+        while pending:
+            records = await pending.popleft()
+            url = next(urls, None)
+            if url is not None:
+                pending.append(asyncio.ensure_future(get_records(url)))
+            yield records
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def async_iter_range_records(
+    get_records, get_url, start, end, max_concurrency=RANGE_WORKERS
+):
+    """Async `iter_range_records`: yield the records of [start, end] in time order."""
+    pages = plan_pages(start, end)
+    windows = page_windows(pages, start, end)
+    results = async_iter_pages(
+        get_records, get_url, pages, max_concurrency=max_concurrency
+    )
+    try:
+        index = 0
+        async for records in results:
+            page, (lo, hi) = pages[index], windows[index]
+            index += 1
+            if lo <= hi:
+                for rec in merge_records([records], [page], lo, hi):
+                    yield rec
+    finally:
+        await results.aclose()
+
+
+async def async_fetch_range(
+    get_records, get_url, start, end, max_concurrency=RANGE_WORKERS
+):
+    """Async `fetch_range`: fetch all pages covering [start, end] concurrently."""
+    pages = plan_pages(start, end)
+    results = await async_fetch_pages(
+        get_records, get_url, pages, max_concurrency=max_concurrency
+    )
+    return merge_records(results, pages, start, end)
@@ -0,0 +1,238 @@
+"""Background prefetch of the calendar pages clients ask for most.
+
+A daemon thread re-fetches today, tomorrow and the current week for every
+site and writes the results into the record cache (and the event store when
+enabled), so request handlers find warm entries instead of scraping inline.
+It runs every PREFETCH_INTERVAL seconds, and every PREFETCH_HOT_INTERVAL
+seconds while an event on those pages is within PREFETCH_HOT_WINDOW seconds
+of its release time.
+
+Only one process per host refreshes: workers compete for an exclusive lock
+on PREFETCH_LOCK_PATH and the others stand by, retrying every interval so one
+takes over if the refresher exits. Refreshed pages are written to the event
+store as fresh for two intervals, so with EVENT_STORE_PATH set the standby
+workers answer those pages from the store instead of scraping them again.
+"""
+
+import importlib
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+try:  # POSIX only; without it every process refreshes
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from ._range import record_datetime
+from ._utils import env_float, week_start
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "False").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+PREFETCH_INTERVAL = env_float("PREFETCH_INTERVAL", 300.0)
+PREFETCH_HOT_INTERVAL = env_float("PREFETCH_HOT_INTERVAL", 30.0)
+PREFETCH_HOT_WINDOW = env_float("PREFETCH_HOT_WINDOW", 600.0)
+# Empty disables the election (every process refreshes)
+PREFETCH_LOCK_PATH = os.getenv(
+    "PREFETCH_LOCK_PATH", os.path.join(tempfile.gettempdir(), "scrapper-prefetch.lock")
+)
+
+SITE_MODULES = (
+    "forexFactoryScrapper",
+    "cryptoCraftScrapper",
+    "energyExchScrapper",
+    "metalsMineScrapper",
+)
+
+
+def hot_pages(today):
+    """Return the (timeline, date) pages kept warm: today, tomorrow, this week."""
+    return [
+        ("day", today),
+        ("day", today + timedelta(days=1)),
+        ("week", week_start(today)),
+    ]
+
+
+class LeaderLock:
+    """Non-blocking exclusive `flock` on a file, held until released or exit."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    @property
+    def held(self):
+        return self._fh is not None
+
+    def acquire(self):
+        """Return True when this process holds the lock (taking it if free)."""
+        if self._fh is not None or fcntl is None:
+            return True
+        fh = open(self.path, "a")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._fh = fh
+        return True
+
+    def release(self):
+        if self._fh is not None:
+            self._fh.close()  # closing the file drops the lock
+            self._fh = None
+
+
+class PrefetchScheduler:
+    """Periodically refresh the hot pages of each site module.
+
+    `sites` are scraper modules (anything with `get_url` and `refresh_records`);
+    they default to the four bundled scrapers. `clock` returns the current
+    naive datetime, comparable with record times. With a `lock` (LeaderLock)
+    the thread only refreshes while it holds the lock.
+
+    Refreshed pages are kept for twice the interval, so they stay warm until
+    the next run has finished even when it is slow.
+    """
+
+    def __init__(
+        self,
+        sites=None,
+        interval=PREFETCH_INTERVAL,
+        hot_interval=PREFETCH_HOT_INTERVAL,
+        hot_window=PREFETCH_HOT_WINDOW,
+        clock=datetime.now,
+        lock=None,
+    ):
+        if sites is None:
+            sites = [
+                importlib.import_module(f".{m}", __package__) for m in SITE_MODULES
+            ]
+        self.sites = list(sites)
+        self.interval = interval
+        self.hot_interval = min(hot_interval, interval)
+        self.hot_window = timedelta(seconds=hot_window)
+        self.refresh_ttl = 2 * interval
+        self._clock = clock
+        self._lock = lock
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.failures = 0
+        self.last_delay = None
+
+    def urls(self, today=None):
+        today = today or self._clock().date()
+        for site in self.sites:
+            for timeline, d in hot_pages(today):
+                yield site, site.get_url(d.day, d.month, d.year, timeline)
+
+    def next_delay(self, release_times):
+        """Seconds until the next run given the release times seen on hot pages."""
+        now = self._clock()
+        upcoming = []
+        for t in release_times:
+            if abs(t - now) <= self.hot_window:
+                return self.hot_interval
+            if t > now:
+                upcoming.append(t)
+        if not upcoming:
+            return self.interval
+        # wake up in time to be refreshing when the next window opens
+        until_hot = (min(upcoming) - self.hot_window - now).total_seconds()
+        return max(self.hot_interval, min(self.interval, until_hot))
+
+    def run_once(self):
+        """Refresh every hot page once and return the delay before the next run."""
+        release_times = []
+        for site, url in self.urls():
+            try:
+                records = site.refresh_records(url, ttl=self.refresh_ttl)
+            except Exception:
+                self.failures += 1
+                logger.warning("Prefetch of %s failed", url, exc_info=True)
+                continue
+            for rec in records if isinstance(records, list) else ():
+                dt = record_datetime(rec) if isinstance(rec, dict) else None
+                if dt is not None:
+                    release_times.append(dt)
+        self.runs += 1
+        self.last_delay = self.next_delay(release_times)
+        return self.last_delay
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._lock is not None and not self._lock.acquire():
+                # another process refreshes; try again in case it goes away
+                self._stop.wait(self.interval)
+                continue
+            try:
+                delay = self.run_once()
+            except Exception:
+                logger.exception("Prefetch run failed")
+                delay = self.interval
+            self._stop.wait(delay)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="scrapper-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock is not None:
+            self._lock.release()
+
+    def stats(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self._lock is None or self._lock.held,
+            "runs": self.runs,
+            "failures": self.failures,
+            "next_delay": self.last_delay,
+        }
+
+
+_scheduler_lock = threading.Lock()
+_scheduler = None  # (pid, PrefetchScheduler)
+
+
+def start_prefetcher():
+    """Start the process-wide scheduler if PREFETCH_ENABLED; return it or None.
+
+    Safe to call more than once and after a fork: each process gets its own
+    thread, since threads do not survive fork. The threads elect one
+    refresher through PREFETCH_LOCK_PATH.
+    """
+    global _scheduler
+    if not PREFETCH_ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler[0] != os.getpid():
+            lock = LeaderLock(PREFETCH_LOCK_PATH) if PREFETCH_LOCK_PATH else None
+            _scheduler = (os.getpid(), PrefetchScheduler(lock=lock))
+        scheduler = _scheduler[1]
+    scheduler.start()
+    return scheduler
+
+
+def get_prefetcher():
+    """Return this process's running scheduler, or None."""
+    if _scheduler is None or _scheduler[0] != os.getpid():
+        return None
+    return _scheduler[1]
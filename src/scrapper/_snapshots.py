@@ -0,0 +1,356 @@
+"""Optional on-disk cache of the raw calendar pages fetched from upstream.
+
+Enabled by setting SNAPSHOT_DIR. Every page `get_page_html` (or its async
+counterpart) downloads is stored compressed, addressed by the SHA-256 of its
+content, so identical fetches share one blob. An SQLite index maps
+(url, fetch time) to blobs; a re-fetch that returns the same content as the
+URL's latest snapshot only updates that snapshot's fetch time. When the blobs
+outgrow SNAPSHOT_MAX_BYTES, or the index holds more than SNAPSHOT_MAX_SNAPSHOTS
+snapshots, the oldest snapshots are evicted. `replay` re-parses stored pages
+with the current parser, so history can be rebuilt without network traffic.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from ._utils import env_int
+
+try:
+    import zstandard
+except ImportError:  # optional dependency; gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_MAX_BYTES = env_int("SNAPSHOT_MAX_BYTES", 1024**3)
+SNAPSHOT_MAX_SNAPSHOTS = env_int("SNAPSHOT_MAX_SNAPSHOTS", 100_000)
+# auto: zstd when the zstandard package is installed, gzip otherwise
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "auto").lower()
+
+_EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs (digest)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_digest ON snapshots (digest);
+"""
+
+
+def resolve_codec(name=SNAPSHOT_COMPRESSION):
+    """Map a SNAPSHOT_COMPRESSION value to 'zstd' or 'gzip'."""
+    if name in ("zstd", "zst"):
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        return "zstd"
+    if name in ("gzip", "gz"):
+        return "gzip"
+    if name == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    raise ValueError(f"Unknown snapshot compression {name!r}; use auto, zstd or gzip")
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd snapshot found but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """Content-addressed, size-capped store of raw page HTML.
+
+    Blobs live under `<root>/objects/<first two hex chars>/<digest><ext>`;
+    `<root>/index.sqlite3` records every (url, fetched_at, digest) snapshot.
+    Writes take SQLite's write lock, so several worker processes can share
+    one store.
+    """
+
+    def __init__(
+        self,
+        root,
+        max_bytes=SNAPSHOT_MAX_BYTES,
+        codec=None,
+        max_snapshots=SNAPSHOT_MAX_SNAPSHOTS,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_snapshots = max_snapshots
+        self.codec = codec or resolve_codec()
+        self._local = threading.local()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _blob_path(self, digest, codec):
+        return os.path.join(
+            self.root, "objects", digest[:2], digest + _EXTENSIONS[codec]
+        )
+
+    def save(self, url, html, fetched_at=None):
+        """Store `html` fetched from `url`; returns the content digest.
+
+        When the latest snapshot of `url` has the same content, only its
+        `fetched_at` is moved forward. The check, the insert and the eviction
+        run in one transaction.
+        """
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        conn = self._connect()
+        written = None
+        try:
+            with conn:
+                # take the write lock first: other threads and processes share the index
+                conn.execute("BEGIN IMMEDIATE")
+                latest = conn.execute(
+                    "SELECT id, digest FROM snapshots WHERE url = ?"
+                    " ORDER BY fetched_at DESC, id DESC LIMIT 1",
+                    (url,),
+                ).fetchone()
+                if latest is not None and latest[1] == digest:
+                    conn.execute(
+                        "UPDATE snapshots SET fetched_at = MAX(fetched_at, ?) WHERE id = ?",
+                        (fetched_at, latest[0]),
+                    )
+                    return digest
+                known = conn.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                if known is None:
+                    blob = compress(raw, self.codec)
+                    path = self._blob_path(digest, self.codec)
+                    written = (digest, path)
+                    self._write_blob(path, blob)
+                    conn.execute(
+                        "INSERT INTO blobs (digest, codec, size, raw_size) VALUES (?, ?, ?, ?)",
+                        (digest, self.codec, len(blob), len(raw)),
+                    )
+                snapshot_id = conn.execute(
+                    "INSERT INTO snapshots (url, fetched_at, digest) VALUES (?, ?, ?)",
+                    (url, fetched_at, digest),
+                ).lastrowid
+                orphaned = self._evict(conn, keep=snapshot_id)
+        except BaseException:
+            # the transaction rolled back, so the new blob file is not counted anywhere
+            if written is not None:
+                try:
+                    self._remove_unreferenced(conn, [written])
+                except (OSError, sqlite3.Error):
+                    logger.exception("Failed to remove blob %s", written[1])
+            raise
+        self._remove_unreferenced(conn, orphaned)
+        return digest
+
+    @staticmethod
+    def _write_blob(path, blob):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(blob)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _remove_unreferenced(self, conn, blobs):
+        """Delete the files of `blobs` [(digest, path)] that no index row references.
+
+        Checked under the write lock: another writer may have stored the same
+        content again since the row was dropped, and its file must stay.
+        """
+        if not blobs:
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for digest, path in blobs:
+                if conn.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone():
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self, conn, keep):
+        """Drop the oldest snapshots (and orphaned blobs) until within max_bytes
+        and max_snapshots; returns [(digest, path)] of the blob files to delete.
+
+        The snapshot `keep` (the one just written) is never evicted. Runs
+        inside the caller's transaction.
+        """
+        if not self.max_bytes and not self.max_snapshots:
+            return []
+        total, count = conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM blobs),"
+            " (SELECT COUNT(*) FROM snapshots)"
+        ).fetchone()
+        orphaned = []
+        while (self.max_bytes and total > self.max_bytes) or (
+            self.max_snapshots and count > self.max_snapshots
+        ):
+            oldest = conn.execute(
+                "SELECT id, digest FROM snapshots WHERE id != ?"
+                " ORDER BY fetched_at, id LIMIT 1",
+                (keep,),
+            ).fetchone()
+            if oldest is None:
+                break
+            snapshot_id, digest = oldest
+            conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+            count -= 1
+            still_used = conn.execute(
+                "SELECT 1 FROM snapshots WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if still_used:
+                continue
+            codec, size = conn.execute(
+                "SELECT codec, size FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            orphaned.append((digest, self._blob_path(digest, codec)))
+            total -= size
+        return orphaned
+
+    def locate(self, digest):
+        """Return (path, codec) of the blob stored under `digest`."""
+        row = (
+            self._connect()
+            .execute("SELECT codec FROM blobs WHERE digest = ?", (digest,))
+            .fetchone()
+        )
+        if row is None:
+            raise KeyError(digest)
+        return self._blob_path(digest, row[0]), row[0]
+
+    def load(self, digest):
+        """Return the HTML stored under `digest`."""
+        path, codec = self.locate(digest)
+        with open(path, "rb") as fh:
+            return decompress(fh.read(), codec).decode("utf-8")
+
+    def entries(self, url=None, since=None, until=None, latest_only=False):
+        """Return [(url, fetched_at, digest)] ordered by fetch time.
+
+        Filters by exact `url` and the fetch-time window [since, until] (epoch
+        seconds). With `latest_only`, keeps only the newest snapshot per URL.
+        """
+        sql = "SELECT url, fetched_at, digest FROM snapshots WHERE 1 = 1"
+        params = []
+        if url is not None:
+            sql += " AND url = ?"
+            params.append(url)
+        if since is not None:
+            sql += " AND fetched_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND fetched_at <= ?"
+            params.append(until)
+        sql += " ORDER BY fetched_at, id"
+        rows = self._connect().execute(sql, params).fetchall()
+        if latest_only:
+            newest = {}
+            for row in rows:
+                newest[row[0]] = row
+            rows = sorted(newest.values(), key=lambda row: row[1])
+        return rows
+
+    def latest(self, url):
+        """Return the most recent HTML stored for `url`, or None."""
+        rows = self.entries(url=url)
+        return self.load(rows[-1][2]) if rows else None
+
+    def replay(self, parse=None, **filters):
+        """Re-parse stored pages; yields (url, fetched_at, records).
+
+        `parse(html, url)` defaults to `parse_calendar_from_html`; `filters`
+        are passed to `entries`. Pages that fail to parse are logged and skipped.
+        """
+        if parse is None:
+            from ._parser import parse_calendar_from_html as parse
+
+        for url, fetched_at, digest in self.entries(**filters):
+            try:
+                records = parse(self.load(digest), url)
+            except Exception:
+                logger.exception("Failed to replay snapshot of %s", url)
+                continue
+            yield url, fetched_at, records
+
+    def stats(self):
+        conn = self._connect()
+        blobs, size, raw_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM blobs"
+        ).fetchone()
+        snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        return {
+            "snapshots": snapshots,
+            "blobs": blobs,
+            "bytes": size,
+            "raw_bytes": raw_size,
+            "max_bytes": self.max_bytes,
+            "max_snapshots": self.max_snapshots,
+            "codec": self.codec,
+        }
+
+
+_store_lock = threading.Lock()
+_snapshot_store = None
+
+
+def get_snapshot_store():
+    """Return the shared SnapshotStore, or None when SNAPSHOT_DIR is unset."""
+    global _snapshot_store
+    if not SNAPSHOT_DIR:
+        return None
+    with _store_lock:
+        if _snapshot_store is None:
+            _snapshot_store = SnapshotStore(SNAPSHOT_DIR)
+        return _snapshot_store
+
+
+def save_snapshot(url, html):
+    """Keep a fetched page when snapshots are enabled; failures are logged, not raised."""
+    store = get_snapshot_store()
+    if store is None:
+        return
+    try:
+        store.save(url, html)
+    except (OSError, sqlite3.Error):
+        logger.exception("Failed to write snapshot of %s", url)
@@ -0,0 +1,349 @@
+"""Persistent SQLite store of scraped calendar records.
+
+Enabled by setting EVENT_STORE_PATH to a database file. Every page fetched
+from upstream is written here. Pages whose days were already over when they
+were fetched are marked complete, and later requests for them are answered
+from the store without touching the network. Events that disappear from a
+re-scraped page are kept as tombstones, so delta clients learn about the
+removal.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from ._utils import page_span
+
+logger = logging.getLogger(__name__)
+
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", "")
+
+_STORE_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    site TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    event_time TEXT NOT NULL,
+    currency TEXT,
+    impact TEXT,
+    event TEXT,
+    record TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (site, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_currency ON events (site, currency, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_impact ON events (site, impact, event_time);
+CREATE TABLE IF NOT EXISTS pages (
+    site TEXT NOT NULL,
+    timeline TEXT NOT NULL,
+    page_date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    complete INTEGER NOT NULL,
+    fresh_until REAL,
+    PRIMARY KEY (site, timeline, page_date)
+);
+"""
+
+# Runs after the events table is migrated (stores created before revisions)
+_REVISION_INDEX = "CREATE INDEX IF NOT EXISTS idx_events_revision ON events (revision)"
+
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 500
+
+
+def _event_time(record, fallback):
+    """Return the record time as 'YYYY-MM-DD HH:MM' (sortable), or `fallback`."""
+    try:
+        dt = datetime.strptime(record.get("Time") or "", "%d/%m/%Y %H:%M")
+    except (AttributeError, TypeError, ValueError):
+        return fallback
+    return dt.strftime(_STORE_TIME_FORMAT)
+
+
+def event_key(record):
+    """Return the stable identity of a record.
+
+    Uses the `data-event-id` captured by the parser (ID) and falls back to a
+    hash of time, currency and event name for records without one.
+    """
+    event_id = record.get("ID")
+    if event_id:
+        return str(event_id)
+    raw = "|".join(str(record.get(k) or "") for k in ("Time", "Currency", "Event"))
+    return "h:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class EventStore:
+    """SQLite-backed store of calendar records, indexed by (site, event time,
+    currency, impact, event id).
+
+    Every write that changes a record stamps it with a new store-wide
+    revision number, so `changes_since` can return only the records that
+    changed after a client's last cursor (e.g. actuals filled in on release).
+    A stored event missing from a later scrape of its page is marked removed
+    under a new revision rather than deleted.
+
+    Connections are opened per thread (and per process, so forked workers
+    don't share one). WAL journaling lets readers run while a writer commits.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if "revision" not in columns:
+                conn.execute(
+                    "ALTER TABLE events ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+                )
+            if "removed" not in columns:
+                conn.execute(
+                    "ALTER TABLE events ADD COLUMN removed INTEGER NOT NULL DEFAULT 0"
+                )
+            conn.execute(_REVISION_INDEX)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+            if "fresh_until" not in columns:
+                conn.execute("ALTER TABLE pages ADD COLUMN fresh_until REAL")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _stored_records(self, conn, site, event_ids):
+        """Return {event_id: record json} for the live ids already stored for `site`."""
+        stored = {}
+        for i in range(0, len(event_ids), _LOOKUP_CHUNK):
+            chunk = event_ids[i : i + _LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            stored.update(
+                conn.execute(
+                    f"SELECT event_id, record FROM events WHERE site = ? AND removed = 0"
+                    f" AND event_id IN ({marks})",
+                    [site, *chunk],
+                )
+            )
+        return stored
+
+    def save_page(self, key, records, fetched_at=None, fresh_for=None):
+        """Upsert the records of one page and remember when it was fetched.
+
+        Only records that differ from the stored copy are written; they share a
+        new revision. Stored events of the page's days that the scrape no
+        longer lists are marked removed under the same revision; an empty
+        scrape (more likely a failed parse than a cleared calendar) removes
+        nothing. The page is marked complete when all of its days were over at
+        fetch time. With `fresh_for` (seconds) `load_page` also serves an
+        incomplete page until then, which is how the prefetcher shares its
+        refreshes with other workers. Returns the number of changed or removed
+        records.
+        """
+        site, timeline, page_date = key
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        fresh_until = fetched_at + fresh_for if fresh_for else None
+        first, last = page_span(timeline, page_date)
+        complete = date.fromtimestamp(fetched_at) > last
+        fallback = f"{first.isoformat()} 00:00"
+        rows = {}
+        for rec in records:
+            if isinstance(rec, dict):
+                rows[event_key(rec)] = (
+                    _event_time(rec, fallback),
+                    rec.get("Currency"),
+                    rec.get("Impact"),
+                    rec.get("Event"),
+                    json.dumps(rec, sort_keys=True),
+                )
+
+        with self._connect() as conn:
+            # take the write lock first so concurrent writers get distinct revisions
+            conn.execute("BEGIN IMMEDIATE")
+            stored = self._stored_records(conn, site, list(rows))
+            changed = [
+                (site, event_id, *row, fetched_at)
+                for event_id, row in rows.items()
+                if stored.get(event_id) != row[4]
+            ]
+            gone = []
+            if rows:
+                listed = conn.execute(
+                    "SELECT event_id FROM events WHERE site = ? AND removed = 0"
+                    " AND event_time >= ? AND event_time < ?",
+                    (site, first.isoformat(), (last + timedelta(days=1)).isoformat()),
+                )
+                gone = [event_id for (event_id,) in listed if event_id not in rows]
+            if changed or gone:
+                revision = conn.execute(
+                    "SELECT COALESCE(MAX(revision), 0) + 1 FROM events"
+                ).fetchone()[0]
+            if changed:
+                conn.executemany(
+                    "INSERT INTO events (site, event_id, event_time, currency, impact, event,"
+                    " record, updated_at, revision) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (site, event_id) DO UPDATE SET event_time = excluded.event_time,"
+                    " currency = excluded.currency, impact = excluded.impact,"
+                    " event = excluded.event, record = excluded.record,"
+                    " updated_at = excluded.updated_at, revision = excluded.revision,"
+                    " removed = 0",
+                    [row + (revision,) for row in changed],
+                )
+            if gone:
+                conn.executemany(
+                    "UPDATE events SET removed = 1, updated_at = ?, revision = ?"
+                    " WHERE site = ? AND event_id = ?",
+                    [(fetched_at, revision, site, event_id) for event_id in gone],
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (site, timeline, page_date, fetched_at, complete,"
+                " fresh_until) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    site,
+                    timeline,
+                    page_date.isoformat(),
+                    fetched_at,
+                    int(complete),
+                    fresh_until,
+                ),
+            )
+        return len(changed) + len(gone)
+
+    def _page_state(self, key):
+        site, timeline, page_date = key
+        return (
+            self._connect()
+            .execute(
+                "SELECT complete, fresh_until FROM pages"
+                " WHERE site = ? AND timeline = ? AND page_date = ?",
+                (site, timeline, page_date.isoformat()),
+            )
+            .fetchone()
+        )
+
+    def is_complete(self, key):
+        row = self._page_state(key)
+        return bool(row and row[0])
+
+    def load_page(self, key, now=None):
+        """Return the stored records of a complete page, or of a page saved
+        with `fresh_for` that is still fresh; otherwise None.
+        """
+        row = self._page_state(key)
+        if row is None:
+            return None
+        complete, fresh_until = row
+        now = time.time() if now is None else now
+        if not complete and not (fresh_until and now < fresh_until):
+            return None
+        site, timeline, page_date = key
+        first, last = page_span(timeline, page_date)
+        return self.query(site, first, last)
+
+    def query(self, site, start, end, currency=None, impact=None):
+        """Return records of `site` between the dates `start` and `end` (inclusive)."""
+        sql = (
+            "SELECT record FROM events WHERE site = ? AND removed = 0"
+            " AND event_time >= ? AND event_time < ?"
+        )
+        params = [site, start.isoformat(), (end + timedelta(days=1)).isoformat()]
+        if currency is not None:
+            sql += " AND currency = ?"
+            params.append(currency)
+        if impact is not None:
+            sql += " AND impact = ?"
+            params.append(impact)
+        # rowid keeps the on-page order of events sharing a time
+        sql += " ORDER BY event_time, rowid"
+        rows = self._connect().execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def current_revision(self):
+        """Return the latest revision written to the store (0 when empty)."""
+        row = self._connect().execute("SELECT MAX(revision) FROM events").fetchone()
+        return row[0] or 0
+
+    def changes_since(self, site, start, end, since):
+        """Return (records, cursor): records of `site` between `start` and `end`
+        changed after revision `since`, and the cursor to pass next time.
+
+        Events removed from the calendar since then come back as their last
+        stored record with `"Removed": true`.
+        """
+        cursor = self.current_revision()
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT record, removed FROM events WHERE site = ? AND event_time >= ?"
+                " AND event_time < ? AND revision > ? AND revision <= ?"
+                " ORDER BY event_time, rowid",
+                (
+                    site,
+                    start.isoformat(),
+                    (end + timedelta(days=1)).isoformat(),
+                    since,
+                    cursor,
+                ),
+            )
+            .fetchall()
+        )
+        records = []
+        for record, removed in rows:
+            record = json.loads(record)
+            if removed:
+                record["Removed"] = True
+            records.append(record)
+        return records, cursor
+
+
+_store_lock = threading.Lock()
+_event_store = None
+
+
+def get_event_store():
+    """Return the shared EventStore, or None when EVENT_STORE_PATH is unset."""
+    global _event_store
+    if not EVENT_STORE_PATH:
+        return None
+    with _store_lock:
+        if _event_store is None:
+            _event_store = EventStore(EVENT_STORE_PATH)
+        return _event_store
+
+
+def load_stored_page(key):
+    """Return stored records for a complete or still fresh page, or None (also when disabled)."""
+    store = get_event_store()
+    if store is None:
+        return None
+    try:
+        return store.load_page(key)
+    except sqlite3.Error:
+        logger.exception("Failed to read page from the event store")
+        return None
+
+
+def save_stored_page(key, records, fresh_for=None):
+    """Write freshly fetched records to the store; failures are logged, not raised."""
+    store = get_event_store()
+    if store is None or not isinstance(records, list):
+        return
+    try:
+        store.save_page(key, records, fresh_for=fresh_for)
+    except sqlite3.Error:
+        logger.exception("Failed to write page to the event store")
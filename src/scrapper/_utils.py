@@ -1,15 +1,92 @@
-from ._constants import BASE_MONTH_NAMES
+import calendar
+import logging
+import os
+import re
+from datetime import date, timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+from ._constants import BASE_MONTH_NAMES, BASE_MONTH_NUMBERS
+
+logger = logging.getLogger(__name__)
+
+TIMELINES = ("day", "week", "month")
+
+_URL_DATE_RE = re.compile(r"^([A-Za-z]{3})([0-9]{1,2})?\.([0-9]{4})$")
+
+
+def env_int(name, default):
+    """Read an integer from the environment, falling back to `default` if unset or invalid."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning(
+            "%s env var is not an integer; falling back to %s", name, default
+        )
+        return default
+
+
+def env_float(name, default):
+    """Read a float from the environment, falling back to `default` if unset or invalid."""
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning("%s env var is not a number; falling back to %s", name, default)
+        return default
 
 
 def build_url(base_url, day=1, month=1, year=2020, timeline="day"):
     """Build a calendar URL for the target site.
 
-    Keeps the same date format used across scrapers: "Mon{day}.{year}" (e.g. Jan1.2020)
+    Keeps the same date format used across scrapers: "Mon{day}.{year}" (e.g. Jan1.2020).
+    Month pages are addressed without a day ("Mon.{year}", e.g. Jan.2020).
     """
-    date_str = f"{BASE_MONTH_NAMES.get(month, 'Jan')}{day}.{year}"
+    if timeline == "month":
+        date_str = f"{BASE_MONTH_NAMES.get(month, 'Jan')}.{year}"
+    else:
+        date_str = f"{BASE_MONTH_NAMES.get(month, 'Jan')}{day}.{year}"
     return f"{base_url}?{timeline}={date_str}"
 
 
+def parse_page_url(url):
+    """Split a calendar URL built by `build_url` into (site, timeline, date).
+
+    `site` is the lower-cased host. Returns None when the URL does not carry a
+    recognised timeline/date query parameter.
+    """
+    parts = urlsplit(url)
+    for key, value in parse_qsl(parts.query):
+        if key not in TIMELINES:
+            continue
+        m = _URL_DATE_RE.match(value.strip())
+        if not m:
+            return None
+        month = BASE_MONTH_NUMBERS.get(m.group(1).title())
+        if month is None:
+            return None
+        try:
+            page_date = date(int(m.group(3)), month, int(m.group(2) or 1))
+        except ValueError:
+            return None
+        return parts.netloc.lower(), key, page_date
+    return None
+
+
+def week_start(d):
+    """Return the Sunday starting the calendar week that contains `d`."""
+    return d - timedelta(days=(d.weekday() + 1) % 7)
+
+
+def page_span(timeline, page_date):
+    """Return the (first, last) dates covered by a calendar page."""
+    if timeline == "week":
+        return page_date, page_date + timedelta(days=6)
+    if timeline == "month":
+        first = page_date.replace(day=1)
+        last_day = calendar.monthrange(first.year, first.month)[1]
+        return first, first.replace(day=last_day)
+    return page_date, page_date
+
+
 def date_to_string(local_dt):
     """Convert a datetime object to the string format used in URLs (e.g. Jan1.2020)."""
     p_day = f"{local_dt.day:02d}"
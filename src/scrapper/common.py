@@ -1,8 +1,35 @@
 from ._constants import BASE_MONTH_NAMES, BASE_MONTH_NUMBERS, DEFAULT_HOUR_OFFSET
-from ._utils import build_url
-from ._http import get_page_html
+from ._utils import build_url, page_span, parse_page_url
+from ._cache import (
+    RecordCache,
+    async_cached_records,
+    cached_records,
+    query_cached_records,
+    record_cache,
+    record_flight,
+    refresh_cached_records,
+)
+from ._singleflight import SingleFlight
+from ._store import EventStore, event_key, get_event_store
+from ._snapshots import SnapshotStore, get_snapshot_store
+from ._http import SessionPool, get_page_html, session_pool
+from ._async_http import async_get_page_html, iter_async, run_async
 from ._time import to_24h
-from ._parser import parse_calendar_from_html
+from ._parser import iter_calendar_records, parse_calendar_from_html
+from ._query import IMPACT_LEVELS, RecordQuery
+from ._export import parse_calendar_to_dataframe, records_to_dataframe
+from ._range import (
+    async_fetch_pages,
+    async_fetch_range,
+    async_iter_pages,
+    async_iter_range_records,
+    fetch_pages,
+    fetch_range,
+    iter_range_records,
+    merge_records,
+    plan_pages,
+    record_datetime,
+)
 
 # Re-export names expected by existing scrapers
 __all__ = [
@@ -10,7 +37,42 @@ __all__ = [
     "BASE_MONTH_NUMBERS",
     "DEFAULT_HOUR_OFFSET",
     "build_url",
+    "page_span",
+    "parse_page_url",
+    "RecordCache",
+    "cached_records",
+    "query_cached_records",
+    "async_cached_records",
+    "record_cache",
+    "record_flight",
+    "refresh_cached_records",
+    "SingleFlight",
+    "EventStore",
+    "event_key",
+    "get_event_store",
+    "SnapshotStore",
+    "get_snapshot_store",
     "get_page_html",
+    "async_get_page_html",
+    "run_async",
+    "iter_async",
+    "SessionPool",
+    "session_pool",
     "to_24h",
     "parse_calendar_from_html",
+    "iter_calendar_records",
+    "RecordQuery",
+    "IMPACT_LEVELS",
+    "records_to_dataframe",
+    "parse_calendar_to_dataframe",
+    "plan_pages",
+    "record_datetime",
+    "fetch_pages",
+    "merge_records",
+    "fetch_range",
+    "iter_range_records",
+    "async_fetch_pages",
+    "async_iter_pages",
+    "async_iter_range_records",
+    "async_fetch_range",
 ]
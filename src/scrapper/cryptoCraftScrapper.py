@@ -1,14 +1,22 @@
+import asyncio
 import logging
+import os
 from src.scrapper.common import (
+    async_cached_records,
+    async_get_page_html,
     build_url,
+    cached_records,
     get_page_html,
     parse_calendar_from_html,
+    query_cached_records,
+    refresh_cached_records,
     to_24h,
 )
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://www.cryptocraft.com/calendar"
+# CRYPTOCRAFT_URL points the scraper elsewhere, e.g. at the load-test fake upstream
+BASE_URL = os.getenv("CRYPTOCRAFT_URL", "https://www.cryptocraft.com/calendar")
 
 
 def get_url(day=1, month=1, year=2020, timeline="day"):
@@ -24,8 +32,15 @@ def get_24h(day, month, year, am_pm, last=None):
 
 
 def _get_crypto_object(raw, url):
-    """Convert a raw event dict to the normalized record shape."""
+    """Convert a raw event dict to the normalized record shape.
+
+    Currency (the coin) and ID (`data-event-id`) are kept so currency filters
+    work on cached records and the event store tracks events by their id; the
+    API routes drop both when reshaping their responses.
+    """
     return {
+        "ID": raw.get("ID"),
+        "Currency": raw.get("Currency", "n/a"),
         "Impact": raw.get("Impact", "n/a"),
         "Event": raw.get("Event", "n/a"),
         "Actual": raw.get("Actual", "n/a"),
@@ -36,13 +51,8 @@ def _get_crypto_object(raw, url):
     }
 
 
-def get_records(url):
-    """Fetch calendar page, parse events and normalize to cryptorecord shape.
-
-    Returns a list of records with keys: Impact, Event, Actual, Forecast, Previous, Time
-    """
-    page_html = get_page_html(url)
-    raw = parse_calendar_from_html(page_html, url)
+def _parse_records(page_html, url, query=None):
+    raw = parse_calendar_from_html(page_html, url, query=query)
 
     normalized = []
     for r in raw:
@@ -51,3 +61,40 @@ def get_records(url):
         obj = _get_crypto_object(r, url)
         normalized.append(obj)
     return normalized
+
+
+def _fetch_records(url, query=None):
+    return _parse_records(get_page_html(url), url, query)
+
+
+async def _async_fetch_records(url):
+    page_html = await async_get_page_html(url)
+    return await asyncio.to_thread(_parse_records, page_html, url)
+
+
+def get_records(url):
+    """Fetch calendar page, parse events and normalize to cryptorecord shape.
+
+    Returns a list of records with keys: ID, Currency, Impact, Event, Actual,
+    Forecast, Previous, Time, Page.
+    Results are served from the shared record cache when fresh.
+    """
+    return cached_records(url, _fetch_records)
+
+
+async def async_get_records(url):
+    """Async `get_records`: non-blocking fetch, parse in a worker thread, shared cache."""
+    return await async_cached_records(url, _async_fetch_records)
+
+
+def query_records(url, query):
+    """Return (total, records) for the records on `url` matching a RecordQuery."""
+    return query_cached_records(url, query, _fetch_records)
+
+
+def refresh_records(url, ttl=None):
+    """Re-fetch `url` upstream, bypassing the cache, and write the result back.
+
+    The result stays cached for at least `ttl` seconds when given.
+    """
+    return refresh_cached_records(url, _fetch_records, ttl)
@@ -1,14 +1,22 @@
+import asyncio
 import logging
+import os
 from src.scrapper.common import (
+    async_cached_records,
+    async_get_page_html,
     build_url,
+    cached_records,
     get_page_html,
     parse_calendar_from_html,
+    query_cached_records,
+    refresh_cached_records,
     to_24h,
 )
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://www.forexfactory.com/calendar"
+# FOREXFACTORY_URL points the scraper elsewhere, e.g. at the load-test fake upstream
+BASE_URL = os.getenv("FOREXFACTORY_URL", "https://www.forexfactory.com/calendar")
 
 
 def get_url(day=1, month=1, year=2020, timeline="day"):
@@ -23,7 +31,37 @@ def get_24h(day, month, year, am_pm, last=None):
     return to_24h(day, month, year, am_pm, last)
 
 
-def get_records(url):
-    """Fetch calendar page and parse events into records (delegates to common parser)."""
+def _fetch_records(url, query=None):
     page_html = get_forex_page_html(url)
-    return parse_calendar_from_html(page_html, url)
+    return parse_calendar_from_html(page_html, url, query=query)
+
+
+async def _async_fetch_records(url):
+    page_html = await async_get_page_html(url)
+    return await asyncio.to_thread(parse_calendar_from_html, page_html, url)
+
+
+def get_records(url):
+    """Fetch calendar page and parse events into records (delegates to common parser).
+
+    Results are served from the shared record cache when fresh.
+    """
+    return cached_records(url, _fetch_records)
+
+
+async def async_get_records(url):
+    """Async `get_records`: non-blocking fetch, parse in a worker thread, shared cache."""
+    return await async_cached_records(url, _async_fetch_records)
+
+
+def query_records(url, query):
+    """Return (total, records) for the records on `url` matching a RecordQuery."""
+    return query_cached_records(url, query, _fetch_records)
+
+
+def refresh_records(url, ttl=None):
+    """Re-fetch `url` upstream, bypassing the cache, and write the result back.
+
+    The result stays cached for at least `ttl` seconds when given.
+    """
+    return refresh_cached_records(url, _fetch_records, ttl)
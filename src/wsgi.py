@@ -0,0 +1,60 @@
+"""Production WSGI entry point (gunicorn).
+
+Importing this module loads the Flask app together with every site scraper,
+the parser backend and the shared session pool, so that with `preload_app`
+the gunicorn master pays those imports once and forked workers share the
+memory copy-on-write.
+
+Run with `python -m src.wsgi` or `gunicorn -c gunicorn.conf.py src.wsgi:app`.
+"""
+
+import importlib
+import logging
+import os
+
+from .app import app
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_MODULES = (
+    "src.scrapper.forexFactoryScrapper",
+    "src.scrapper.cryptoCraftScrapper",
+    "src.scrapper.energyExchScrapper",
+    "src.scrapper.metalsMineScrapper",
+)
+
+
+def preload():
+    """Import scrapers and resolve the parser backend ahead of forking."""
+    for module_path in SCRAPER_MODULES:
+        importlib.import_module(module_path)
+    from .scrapper._backend import get_backend
+
+    logger.info("Preloaded scrapers (parser backend: %s)", get_backend())
+
+
+# `python -m src.wsgi` only launches gunicorn, which imports this module again
+if __name__ != "__main__":
+    preload()
+
+application = app
+
+
+def run_wsgi():
+    """Start gunicorn with the project's gunicorn.conf.py."""
+    import sys
+
+    from gunicorn.app.wsgiapp import run
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.argv = [
+        "gunicorn",
+        "-c",
+        os.path.join(root, "gunicorn.conf.py"),
+        "src.wsgi:app",
+    ]
+    run()
+
+
+if __name__ == "__main__":
+    run_wsgi()
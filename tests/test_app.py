@@ -177,3 +177,31 @@ def test_forex_paging_invalid_params(monkeypatch):
     # negative offset
     resp = client.get("/api/forex/daily?day=1&month=1&year=2020&offset=-1")
     assert resp.status_code == 400
+
+
+def test_daily_etag_and_cache_control(monkeypatch):
+    monkeypatch.setattr(main, "get_records", lambda url: SAMPLE_RECORDS_MULTI)
+    monkeypatch.setattr(
+        main, "get_url", lambda day, month, year, timeline: "http://example"
+    )
+    client = app.test_client()
+
+    resp = client.get("/api/energyexch/daily?day=1&month=1&year=2020")
+    assert resp.status_code == 200
+    assert resp.cache_control.max_age == 86400
+    etag = resp.headers["ETag"]
+
+    resp = client.get(
+        "/api/energyexch/daily?day=1&month=1&year=2020",
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+    assert resp.data == b""
+
+    # paging changes the body, so it changes the ETag
+    resp = client.get(
+        "/api/energyexch/daily?day=1&month=1&year=2020&limit=1",
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
@@ -0,0 +1,181 @@
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+# ensure src is importable
+ROOT = os.path.dirname(os.path.dirname(__file__))
+SRC = os.path.join(ROOT, "src")
+for p in (SRC, ROOT):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+pytest.importorskip("asgiref")
+
+main = importlib.import_module("main")
+src_app = importlib.import_module("src.app")
+asgi = importlib.import_module("src.asgi")
+
+SAMPLE_RECORDS_MULTI = [
+    {"Time": f"01/01/2020 00:0{i}", "Currency": f"USD{i}", "Event": "NFP"}
+    for i in range(5)
+]
+
+
+def _call(path, query="", headers=()):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"x-request-id", b"cid-1"),
+            *headers,
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    headers = {k.decode().lower(): v.decode() for k, v in start["headers"]}
+    return start["status"], headers, json.loads(body) if body else None
+
+
+def _patch(monkeypatch, records):
+    for mod in (src_app, main):
+        monkeypatch.setattr(mod, "get_records", lambda url: records)
+        monkeypatch.setattr(
+            mod, "get_url", lambda day, month, year, timeline: "http://example"
+        )
+
+
+def test_asgi_daily_paging(monkeypatch):
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    status, headers, data = _call(
+        "/api/forex/daily", "day=1&month=1&year=2020&offset=1&limit=2"
+    )
+    assert status == 200
+    assert headers["x-request-id"] == "cid-1"
+    assert data["total"] == 5
+    assert data["url"] == "http://example"
+    assert data["results"] == SAMPLE_RECORDS_MULTI[1:3]
+
+
+def test_asgi_daily_validation(monkeypatch):
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    status, _, data = _call("/api/metalsmine/daily", "day=aa&month=1&year=2020")
+    assert status == 400
+    assert "error" in data
+
+
+def test_asgi_daily_upstream_error(monkeypatch):
+    def _raise(url):
+        raise RuntimeError("boom")
+
+    for mod in (src_app, main):
+        monkeypatch.setattr(mod, "get_records", _raise)
+    status, _, data = _call("/api/energyexch/daily", "day=1&month=1&year=2020")
+    assert status == 500
+    assert data["code"] == 500
+    assert data["correlation_id"] == "cid-1"
+
+
+def test_asgi_delegates_other_routes_to_flask():
+    status, _, data = _call("/api/health")
+    assert status == 200
+    assert data == {"status": "ok"}
+
+
+def test_asgi_daily_etag_and_not_modified(monkeypatch):
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    status, headers, _ = _call("/api/forex/daily", "day=1&month=1&year=2020")
+    assert status == 200
+    assert headers["cache-control"] == "public, max-age=86400"
+    etag = headers["etag"]
+
+    status, headers, data = _call(
+        "/api/forex/daily",
+        "day=1&month=1&year=2020",
+        headers=[(b"if-none-match", etag.encode())],
+    )
+    assert status == 304
+    assert data is None
+    assert headers["etag"] == etag
+
+
+def test_asgi_daily_records_request_metrics(monkeypatch):
+    from src.scrapper import _metrics
+
+    _metrics.reset()
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    status, _, _ = _call("/api/metalsmine/daily", "day=1&month=1&year=2020")
+    assert status == 200
+    labels = {"endpoint": "/api/metalsmine/daily", "method": "GET", "status": 200}
+    assert _metrics.request_seconds.snapshot(**labels)[0] == 1
+    assert _metrics.serialize_seconds.snapshot(endpoint="/api/metalsmine/daily")[0] == 1
+
+
+def test_asgi_daily_matches_flask_body_and_etag(monkeypatch):
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    query = "day=1&month=1&year=2020&currency=USD1,USD2&limit=1"
+    status, headers, data = _call("/api/forex/daily", query)
+    assert status == 200
+    resp = main.app.test_client().get(f"/api/forex/daily?{query}")
+    assert resp.get_json() == data
+    assert resp.headers["ETag"] == headers["etag"]
+
+
+def test_asgi_sends_since_requests_to_flask(monkeypatch):
+    _patch(monkeypatch, SAMPLE_RECORDS_MULTI)
+    # answered by the Flask route, which validates the cursor
+    status, _, data = _call("/api/forex/daily", "day=1&month=1&year=2020&since=x")
+    assert status == 400
+    assert "since" in data["error"]
+
+
+def test_asgi_lifespan_starts_and_stops_the_worker(monkeypatch):
+    events = []
+
+    class FakeScheduler:
+        def stop(self, timeout=None):
+            events.append("stop")
+
+    monkeypatch.setattr(asgi, "start_prefetcher", lambda: events.append("start"))
+    monkeypatch.setattr(asgi, "get_prefetcher", lambda: FakeScheduler())
+
+    async def close_sessions():
+        events.append("close")
+
+    monkeypatch.setattr(asgi, "close_client_sessions", close_sessions)
+    incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append((message["type"], list(events)))
+
+    asyncio.run(asgi.application({"type": "lifespan"}, receive, send))
+    assert sent == [
+        ("lifespan.startup.complete", ["start"]),
+        ("lifespan.shutdown.complete", ["start", "stop", "close"]),
+    ]
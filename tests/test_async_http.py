@@ -0,0 +1,160 @@
+import asyncio
+import importlib
+
+import pytest
+
+from src.scrapper import _async_http, _cache
+from src.scrapper._async_http import async_get_page_html, is_challenge, run_async
+from src.scrapper._cache import RecordCache, async_cached_records
+
+main = importlib.import_module("main")
+app = main.app
+
+CHALLENGE_HTML = "<html><title>Just a moment...</title><script>cf_chl_opt={}</script>"
+
+
+async def _serve(handler, coro_fn):
+    web = pytest.importorskip("aiohttp.web")
+    server_app = web.Application()
+    server_app.router.add_get("/calendar", handler)
+    runner = web.AppRunner(server_app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await coro_fn(f"http://127.0.0.1:{port}/calendar?day=Jan1.2020")
+    finally:
+        await _async_http.close_client_sessions()
+        await runner.cleanup()
+
+
+def test_is_challenge():
+    assert is_challenge(503, {}, CHALLENGE_HTML)
+    assert is_challenge(200, {"cf-mitigated": "challenge"}, "")
+    assert not is_challenge(200, {}, "<table class='calendar__table'></table>")
+    assert not is_challenge(503, {}, "Service Unavailable")
+
+
+def test_async_get_page_html_returns_text():
+    web = pytest.importorskip("aiohttp.web")
+
+    async def handler(request):
+        return web.Response(text="<table>ok</table>", content_type="text/html")
+
+    assert asyncio.run(_serve(handler, async_get_page_html)) == "<table>ok</table>"
+
+
+def test_async_get_page_html_retries_challenge_with_cloudscraper(monkeypatch):
+    web = pytest.importorskip("aiohttp.web")
+    solved = []
+
+    def fake_get_page_html(url, timeout=10):
+        solved.append(url)
+        return "<table>solved</table>"
+
+    monkeypatch.setattr(_async_http._http, "get_page_html", fake_get_page_html)
+
+    async def handler(request):
+        return web.Response(status=503, text=CHALLENGE_HTML, content_type="text/html")
+
+    assert asyncio.run(_serve(handler, async_get_page_html)) == "<table>solved</table>"
+    assert len(solved) == 1
+
+
+def test_challenge_clearance_is_reused_by_aiohttp(monkeypatch):
+    web = pytest.importorskip("aiohttp.web")
+    solved = []
+    monkeypatch.setattr(
+        _async_http._http,
+        "get_page_html",
+        lambda url, timeout=10: solved.append(url) or "<table>solved</table>",
+    )
+    monkeypatch.setattr(
+        _async_http._http.session_pool,
+        "clearance",
+        lambda host: ({"cf_clearance": "token"}, "Solver/1.0"),
+    )
+
+    async def handler(request):
+        if (
+            request.cookies.get("cf_clearance") == "token"
+            and request.headers.get("User-Agent") == "Solver/1.0"
+        ):
+            return web.Response(text="<table>ok</table>", content_type="text/html")
+        return web.Response(status=503, text=CHALLENGE_HTML, content_type="text/html")
+
+    async def fetch_twice(url):
+        return [await async_get_page_html(url), await async_get_page_html(url)]
+
+    assert asyncio.run(_serve(handler, fetch_twice)) == [
+        "<table>solved</table>",
+        "<table>ok</table>",
+    ]
+    assert len(solved) == 1
+
+
+def test_async_get_page_html_without_aiohttp(monkeypatch):
+    monkeypatch.setattr(_async_http, "aiohttp", None)
+    monkeypatch.setattr(
+        _async_http._http, "get_page_html", lambda url, timeout=10: "<html/>"
+    )
+    assert asyncio.run(async_get_page_html("https://example.com/a")) == "<html/>"
+
+
+def test_async_cached_records_coalesces(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=8))
+    calls = []
+
+    async def loader(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return [{"Event": "NFP"}]
+
+    async def fan_out():
+        url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+        return await asyncio.gather(
+            *(async_cached_records(url, loader) for _ in range(10))
+        )
+
+    results = run_async(fan_out())
+    assert len(calls) == 1
+    assert results == [[{"Event": "NFP"}]] * 10
+
+
+def test_async_cached_records_survives_a_cancelled_leader(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=8))
+    calls = []
+
+    async def loader(url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return [{"Event": "NFP"}]
+
+    async def scenario():
+        url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+        leader = asyncio.ensure_future(async_cached_records(url, loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(async_cached_records(url, loader))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter, leader.cancelled()
+
+    assert run_async(scenario()) == ([{"Event": "NFP"}], True)
+    assert len(calls) == 1
+
+
+def test_range_route_uses_async_scraper(monkeypatch):
+    forex = importlib.import_module("src.scrapper.forexFactoryScrapper")
+    seen = []
+
+    async def fake_async_get_records(url):
+        seen.append(url)
+        return [{"Time": "02/01/2020 10:00", "Event": "PMI"}]
+
+    monkeypatch.setattr(forex, "async_get_records", fake_async_get_records)
+    client = app.test_client()
+    resp = client.get("/api/forex/range?start=2020-01-02&end=2020-01-02")
+    assert resp.status_code == 200
+    assert seen == [forex.get_url(2, 1, 2020, "day")]
+    assert resp.get_json()["results"] == [{"Time": "02/01/2020 10:00", "Event": "PMI"}]
@@ -0,0 +1,39 @@
+from benchmarks import run
+from benchmarks.make_fixtures import SITES, TIMELINES, build_page
+from src.scrapper._parser import parse_calendar_from_html
+
+
+def test_checked_in_fixtures_match_generator():
+    fixtures = run.load_fixtures()
+    assert len(fixtures) == len(SITES) * len(TIMELINES)
+    for name, url, html in fixtures:
+        site, timeline = name.split("_")
+        expected_url, expected_html, rows = build_page(site, timeline)
+        assert (url, html) == (expected_url, expected_html), name
+        assert len(parse_calendar_from_html(html, url)) == rows, name
+
+
+def test_bench_fixture_reports_percentiles_and_memory():
+    [(_, url, html)] = run.load_fixtures(["forexfactory"], ["day"])
+    res = run.bench_fixture(url, html, repeat=3, warmup=1)
+    assert res["rows"] == 18
+    assert 0 < res["p50_ms"] <= res["p95_ms"] <= res["p99_ms"]
+    assert res["rows_per_s"] > 0 and res["peak_kib"] > 0
+
+
+def test_compare_flags_regressions():
+    base = {"rows": 18, "p50_ms": 10.0, "peak_kib": 100.0}
+    assert run.compare({"a": dict(base, p50_ms=11.0)}, {"a": base}) == []
+    problems = run.compare(
+        {"a": {"rows": 17, "p50_ms": 12.0, "peak_kib": 120.0}, "new": base},
+        {"a": base},
+    )
+    assert len(problems) == 3
+    assert all(p.startswith("a:") for p in problems)
+
+
+def test_percentile_nearest_rank():
+    values = sorted(float(i) for i in range(1, 101))
+    assert run.percentile(values, 50) == 50.0
+    assert run.percentile(values, 99) == 99.0
+    assert run.percentile([], 50) == 0.0
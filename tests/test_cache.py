@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import date
+
+from src.scrapper import _cache
+from src.scrapper._cache import RecordCache, cached_records
+from src.scrapper._singleflight import SingleFlight
+from src.scrapper._utils import parse_page_url
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_page_url():
+    key = parse_page_url("https://www.forexfactory.com/calendar?day=Jan5.2020")
+    assert key == ("www.forexfactory.com", "day", date(2020, 1, 5))
+    assert parse_page_url("http://example") is None
+
+
+def test_cache_ttl_expiry():
+    clock = FakeClock()
+    cache = RecordCache(max_entries=4, ttl=10, past_ttl=0, clock=clock)
+    key = ("site", "day", date(2020, 1, 1))
+    cache.put(key, [1], ttl=10)
+    assert cache.get(key) == [1]
+    clock.now = 11
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_cache_zero_ttl_does_not_cache_live_pages():
+    clock = FakeClock()
+    cache = RecordCache(max_entries=4, ttl=0, past_ttl=0, clock=clock)
+    today = date.today()
+    live, past = ("s", "day", today), ("s", "day", date(2020, 1, 1))
+    cache.put(live, [1])
+    cache.put(past, [2])
+    cache.put(("s", "day", date(2020, 1, 2)), [3], ttl=0)
+    clock.now = 1e9
+    assert cache.get(live) is None
+    # past_ttl=0 still means "never expire"
+    assert cache.get(past) == [2]
+    assert cache.stats()["size"] == 1
+
+
+def test_cache_lru_eviction():
+    cache = RecordCache(max_entries=2, ttl=60, past_ttl=0)
+    k1, k2, k3 = [("site", "day", date(2020, 1, d)) for d in (1, 2, 3)]
+    cache.put(k1, [1])
+    cache.put(k2, [2])
+    cache.get(k1)  # k1 is now most recently used
+    cache.put(k3, [3])
+    assert cache.get(k2) is None
+    assert cache.get(k1) == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_for_past_and_today():
+    cache = RecordCache(ttl=30, past_ttl=0)
+    today = date(2020, 1, 10)
+    assert cache.ttl_for(("s", "day", date(2020, 1, 9)), today=today) is None
+    assert cache.ttl_for(("s", "day", date(2020, 1, 10)), today=today) == 30
+    # a week page that ends today is still live
+    assert cache.ttl_for(("s", "week", date(2020, 1, 4)), today=today) == 30
+
+
+def test_cached_records_calls_loader_once(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=8))
+    calls = []
+
+    def loader(url):
+        calls.append(url)
+        return [{"Event": "NFP"}]
+
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    assert cached_records(url, loader) == [{"Event": "NFP"}]
+    assert cached_records(url, loader) == [{"Event": "NFP"}]
+    assert len(calls) == 1
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ["result"]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    assert started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        for _ in range(5)
+    ]
+    for t in followers:
+        t.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    coalesced = flight.stats()["coalesced"]
+    # release before asserting so a failure doesn't leave threads blocked
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+
+    assert coalesced == 5
+    assert not any(t.is_alive() for t in [leader] + followers)
+    assert len(calls) == 1
+    assert results == [["result"]] * 6
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    try:
+        flight.do("k", boom)
+        assert False, "expected error"
+    except RuntimeError as e:
+        assert "upstream down" in str(e)
+    assert flight.in_flight() == 0
@@ -0,0 +1,103 @@
+from src.scrapper import _http
+from src.scrapper._http import SessionPool
+
+
+class FakeResponse:
+    def __init__(self, text="<html></html>", fail=False):
+        self.text = text
+        self.fail = fail
+
+    def raise_for_status(self):
+        if self.fail:
+            raise RuntimeError("HTTP 503")
+
+
+class FakeSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.closed = False
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        return FakeResponse(fail=self.fail)
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_session_per_host():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    pool = SessionPool(max_size=2, factory=factory)
+    with pool.session("https://www.forexfactory.com/calendar?day=Jan1.2020") as s1:
+        pass
+    with pool.session("https://www.forexfactory.com/calendar?day=Jan2.2020") as s2:
+        pass
+    assert s1 is s2
+    assert len(created) == 1
+
+    with pool.session("https://www.cryptocraft.com/calendar?day=Jan1.2020") as s3:
+        pass
+    assert s3 is not s1
+    assert len(created) == 2
+
+
+def test_pool_discards_session_on_error():
+    pool = SessionPool(max_size=1, factory=FakeSession)
+    try:
+        with pool.session("https://example.com/a") as s1:
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert s1.closed
+    with pool.session("https://example.com/a") as s2:
+        pass
+    assert s2 is not s1
+
+
+def test_pool_evicts_idle_sessions():
+    pool = SessionPool(max_size=1, idle_timeout=0, factory=FakeSession)
+    with pool.session("https://example.com/a") as s1:
+        pass
+    with pool.session("https://example.com/a") as s2:
+        pass
+    assert s1.closed
+    assert s2 is not s1
+
+
+def test_pool_bounded_acquire_times_out():
+    pool = SessionPool(max_size=1, acquire_timeout=0.01, factory=FakeSession)
+    held = pool.acquire("example.com")
+    try:
+        pool.acquire("example.com")
+        assert False, "expected timeout"
+    except RuntimeError:
+        pass
+    pool.release("example.com", held)
+    assert pool.acquire("example.com") is held
+
+
+def test_get_page_html_uses_shared_pool(monkeypatch):
+    pool = SessionPool(max_size=1, factory=FakeSession)
+    monkeypatch.setattr(_http, "session_pool", pool)
+    assert _http.get_page_html("https://example.com/a") == "<html></html>"
+    assert _http.get_page_html("https://example.com/b") == "<html></html>"
+    assert pool.stats()["created"] == 1
+
+
+def test_pool_reset_forgets_inherited_sessions():
+    pool = SessionPool(max_size=1, factory=FakeSession)
+    with pool.session("https://example.com/a") as s1:
+        pass
+    pool.reset()
+    with pool.session("https://example.com/a") as s2:
+        pass
+    assert s2 is not s1
+    stats = pool.stats()
+    assert stats["in_use"] == {"example.com": 0}
+    assert stats["created"] == 1 and stats["discarded"] == 0
@@ -0,0 +1,86 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from loadtest import driver, fake_upstream
+from src.scrapper._async_http import is_challenge
+from src.scrapper._parser import parse_calendar_from_html
+
+
+@pytest.fixture
+def upstream():
+    behaviour = fake_upstream.UpstreamBehaviour(latency=0.0, seed=1)
+    servers = fake_upstream.start_servers(port=0, behaviour=behaviour)
+    yield behaviour, servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fake_upstream_serves_parseable_pages(upstream):
+    _, servers = upstream
+    env = fake_upstream.env_for(servers)
+    url = env["FOREXFACTORY_URL"] + "?day=Mar6.2024"
+    html = urllib.request.urlopen(url).read().decode()
+    assert len(parse_calendar_from_html(html, url)) == 18
+    assert servers[0].counts["ok"] == 1
+
+
+def test_fake_upstream_moves_pages_to_the_requested_dates(upstream):
+    _, servers = upstream
+    base = fake_upstream.env_for(servers)["CRYPTOCRAFT_URL"]
+    url = base + "?day=Jan5.2020"
+    records = parse_calendar_from_html(urllib.request.urlopen(url).read().decode(), url)
+    assert len(records) == 18
+    assert {r["Time"][:10] for r in records} == {"05/01/2020"}
+
+    url = base + "?month=Feb.2023"
+    records = parse_calendar_from_html(urllib.request.urlopen(url).read().decode(), url)
+    days = {r["Time"][:10] for r in records}
+    assert min(days) == "01/02/2023" and len(days) == 28
+    assert all(d.endswith("/02/2023") for d in days)
+
+
+def test_fake_upstream_errors_and_challenges(upstream):
+    behaviour, servers = upstream
+    url = servers[1].url + "?week=Mar3.2024"
+
+    behaviour.error_rate = 1.0
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(url)
+    assert err.value.code == 500
+
+    behaviour.error_rate, behaviour.challenge_rate = 0.0, 1.0
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(url)
+    body = err.value.read().decode()
+    assert is_challenge(err.value.code, dict(err.value.headers), body)
+    assert servers[1].counts == {"ok": 0, "error": 1, "challenge": 1, "not_found": 0}
+
+
+def test_run_load_reports_latency_and_errors():
+    calls = []
+
+    def fake_get(path):
+        calls.append(path)
+        if "metalsmine" in path:
+            return 502
+        if "energyexch" in path:
+            raise TimeoutError()
+        return 200
+
+    report = driver.run_load(
+        "http://unused", rps=200, duration=0.2, dates=3, seed=3, get=fake_get
+    )
+
+    assert report["requests"] == len(calls) == 40
+    assert all(p.startswith("/api/") and "/daily?day=" in p for p in calls)
+    sites = report["sites"]
+    assert sites["metalsmine"]["errors"] == {
+        "http_502": sites["metalsmine"]["requests"]
+    }
+    assert sites["energyexch"]["errors"] == {"timeout": sites["energyexch"]["requests"]}
+    assert report["ok"] == sites["forex"]["ok"] + sites["cryptocraft"]["ok"]
+    assert 0 <= report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    assert "total" in driver.format_report(report)
@@ -0,0 +1,147 @@
+import importlib
+
+import pytest
+
+from src.scrapper import _http, _metrics
+from src.scrapper._http import SessionPool
+from src.scrapper._parser import iter_calendar_records, parse_calendar_from_html
+
+main = importlib.import_module("main")
+src_app = importlib.import_module("src.app")
+
+PAGE_HTML = """
+<table class="calendar calendar__table">
+  <tr class="calendar__row--new-day">
+    <td colspan="6"><span class="date">Jan 1, 2020</span></td>
+  </tr>
+  <tbody>
+    <tr><td>00:00</td><td>USD</td><td>NFP</td><td>n/a</td><td>n/a</td><td>n/a</td></tr>
+  </tbody>
+</table>
+"""
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    _metrics.reset()
+    yield
+    _metrics.reset()
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = _metrics.Histogram("test_seconds", "Test.", ("host",), buckets=(0.1, 1.0))
+    hist.observe(0.05, host="a")
+    hist.observe(0.5, host="a")
+    hist.observe(5, host="a")
+
+    lines = hist.render()
+    assert lines[:2] == [
+        "# HELP scraper_test_seconds Test.",
+        "# TYPE scraper_test_seconds histogram",
+    ]
+    assert 'scraper_test_seconds_bucket{host="a",le="0.1"} 1' in lines
+    assert 'scraper_test_seconds_bucket{host="a",le="1"} 2' in lines
+    assert 'scraper_test_seconds_bucket{host="a",le="+Inf"} 3' in lines
+    assert 'scraper_test_seconds_count{host="a"} 3' in lines
+    assert hist.snapshot(host="a") == (3, 5.55)
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(_metrics, "METRICS_ENABLED", False)
+    _metrics.upstream_errors.inc(host="a", client="x", type="timeout")
+    assert _metrics.upstream_errors.value(host="a", client="x", type="timeout") == 0
+
+
+def test_parse_records_time_and_rows():
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    assert len(parse_calendar_from_html(PAGE_HTML, url)) == 1
+    host = "www.forexfactory.com"
+    assert _metrics.parse_seconds.snapshot(host=host)[0] == 1
+    assert _metrics.parse_rows.snapshot(host=host) == (1, 1.0)
+
+
+def test_streamed_and_failed_parses_are_recorded():
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    host = "www.forexfactory.com"
+    records = iter_calendar_records(PAGE_HTML, url)
+    assert len(list(records)) == 1
+    assert _metrics.parse_rows.snapshot(host=host) == (1, 1.0)
+
+    with pytest.raises(ValueError):
+        list(iter_calendar_records("<html></html>", url))
+    assert _metrics.parse_errors.value(host=host, stage="page") == 1
+    assert _metrics.parse_seconds.snapshot(host=host)[0] == 2
+    assert _metrics.parse_rows.snapshot(host=host)[0] == 1
+
+
+def test_get_page_html_records_fetch_and_errors(monkeypatch):
+    class Resp:
+        def __init__(self, status):
+            self.status_code = status
+            self.text = PAGE_HTML
+
+        def raise_for_status(self):
+            if self.status_code >= 400:
+                err = RuntimeError("boom")
+                err.response = self
+                raise err
+
+    statuses = [200, 503]
+
+    class Session:
+        def get(self, url, timeout):
+            return Resp(statuses.pop(0))
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(_http, "session_pool", SessionPool(factory=Session))
+    _http.get_page_html("https://example.com/calendar?day=Jan1.2020")
+    with pytest.raises(RuntimeError):
+        _http.get_page_html("https://example.com/calendar?day=Jan2.2020")
+
+    labels = {"host": "example.com", "client": "cloudscraper"}
+    assert _metrics.upstream_fetch_seconds.snapshot(**labels)[0] == 1
+    assert _metrics.upstream_html_bytes.snapshot(host="example.com") == (
+        1,
+        len(PAGE_HTML),
+    )
+    assert _metrics.upstream_errors.value(type="http_503", **labels) == 1
+
+
+def test_error_type_classification():
+    assert _metrics.error_type(TimeoutError()) == "timeout"
+    assert _metrics.error_type(ConnectionRefusedError()) == "connection"
+    assert (
+        _metrics.error_type(type("CloudflareChallengeError", (Exception,), {})())
+        == "challenge"
+    )
+    assert _metrics.error_type(ValueError()) == "other"
+
+
+def test_metrics_endpoint_exposes_request_stages(monkeypatch):
+    records = [{"Time": "01/01/2020 00:00", "Currency": "USD", "Event": "NFP"}]
+    for module in (src_app, main):
+        monkeypatch.setattr(module, "get_records", lambda url: records)
+        monkeypatch.setattr(module, "get_url", lambda d, m, y, t: "http://example")
+
+    client = main.app.test_client()
+    assert client.get("/api/forex/daily?day=1&month=1&year=2020").status_code == 200
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    body = resp.get_data(as_text=True)
+    assert (
+        'scraper_http_request_seconds_count{endpoint="/api/forex/daily",method="GET",status="200"} 1'
+        in body
+    )
+    assert 'scraper_serialize_seconds_count{endpoint="/api/forex/daily"} 1' in body
+    assert "# TYPE scraper_record_cache_lookups counter" in body
+    assert "scraper_record_cache_hit_ratio " in body
+    assert "# TYPE scraper_session_pool_utilization gauge" in body
+
+
+def test_metrics_endpoint_disabled(monkeypatch):
+    monkeypatch.setattr(_metrics, "METRICS_ENABLED", False)
+    assert main.app.test_client().get("/metrics").status_code == 404
@@ -1,6 +1,17 @@
 import os
 import sys
-from src.scrapper._parser import parse_calendar_from_html
+
+import pytest
+
+from src.scrapper._backend import available_backends, make_soup
+from src.scrapper._export import records_to_dataframe
+from src.scrapper._parser import (
+    _find_impact_node,
+    _normalize_impact_value,
+    _slice_calendar_table,
+    iter_calendar_records,
+    parse_calendar_from_html,
+)
 
 # ensure src is importable
 ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -39,3 +50,151 @@ def test_event_extraction_from_calendar_title():
     rec = recs[0]
     assert rec.get("Event") == "Protocol Upgrade"
     assert rec.get("Time").startswith("01/01/2020")
+
+
+WEEK_HTML = """
+<table class="calendar__table">
+  <tbody>
+    <tr class="calendar__row calendar__row--new-day" data-event-id="1">
+      <td class="calendar__date"><span class="date">Tue <span>Dec 31</span></span></td>
+      <td class="calendar__time">8:30am</td>
+      <td class="calendar__currency">USD</td>
+      <td class="calendar__event">Pending Home Sales</td>
+    </tr>
+    <tr class="calendar__row" data-event-id="2">
+      <td class="calendar__date"></td>
+      <td class="calendar__time">10:00am</td>
+      <td class="calendar__currency">USD</td>
+      <td class="calendar__event">CB Consumer Confidence</td>
+    </tr>
+    <tr class="calendar__row calendar__row--new-day" data-event-id="3">
+      <td class="calendar__date"><span class="date">Wed <span>Jan 1</span></span></td>
+      <td class="calendar__time">All Day</td>
+      <td class="calendar__currency">ALL</td>
+      <td class="calendar__event">Bank Holiday</td>
+    </tr>
+    <tr class="calendar__row calendar__row--new-day" data-event-id="4">
+      <td class="calendar__date"><span class="date">Thu <span>Jan 2</span></span></td>
+      <td class="calendar__time">9:45am</td>
+      <td class="calendar__currency">USD</td>
+      <td class="calendar__event">Final Manufacturing PMI</td>
+    </tr>
+  </tbody>
+</table>
+"""
+
+
+def test_week_page_starts_new_date_on_each_new_day_row():
+    recs = parse_calendar_from_html(
+        WEEK_HTML, "https://www.forexfactory.com/calendar?week=Dec29.2019"
+    )
+    assert [(r["ID"], r["Time"]) for r in recs] == [
+        ("1", "31/12/2019 08:30"),
+        ("2", "31/12/2019 10:00"),
+        ("3", "01/01/2020 00:00"),
+        ("4", "02/01/2020 09:45"),
+    ]
+
+
+def test_iter_calendar_records_pushes_down_offset_and_limit(monkeypatch):
+    from src.scrapper import _parser
+
+    url = "https://www.forexfactory.com/calendar?week=Dec29.2019"
+    assert list(iter_calendar_records(WEEK_HTML, url)) == parse_calendar_from_html(
+        WEEK_HTML, url
+    )
+
+    parsed = []
+    real = _parser._parse_row_to_record
+
+    def counting(row, *args, **kwargs):
+        parsed.append(row.get("data-event-id"))
+        return real(row, *args, **kwargs)
+
+    monkeypatch.setattr(_parser, "_parse_row_to_record", counting)
+    recs = list(iter_calendar_records(WEEK_HTML, url, offset=1, limit=2))
+    # the running date still advances through skipped rows
+    assert [(r["ID"], r["Time"]) for r in recs] == [
+        ("2", "31/12/2019 10:00"),
+        ("3", "01/01/2020 00:00"),
+    ]
+    # rows after offset + limit are never parsed
+    assert parsed == ["1", "2", "3"]
+
+
+def test_backends_produce_identical_records():
+    url = "https://www.forexfactory.com/calendar?week=Dec29.2019"
+    results = [
+        parse_calendar_from_html(html, url, backend=backend)
+        for backend in available_backends()
+        for html in (SAMPLE_HTML, WEEK_HTML)
+    ]
+    expected = results[:2]
+    for i in range(0, len(results), 2):
+        assert results[i : i + 2] == expected
+
+
+def test_calendar_table_is_sliced_out_of_full_page():
+    page = (
+        "<html><head><script>var t = 1 < 2;</script></head><body>"
+        "<table class='nav'><tr><td>menu</td></tr></table>"
+        + SAMPLE_HTML
+        + "<div class='footer'>ads</div></body></html>"
+    )
+    fragment = _slice_calendar_table(page)
+    assert fragment.startswith('<table class="calendar calendar__table">')
+    assert fragment.endswith("</table>")
+    assert "menu" not in fragment and "ads" not in fragment
+    assert parse_calendar_from_html(page, "http://example.com/2020") == (
+        parse_calendar_from_html(SAMPLE_HTML, "http://example.com/2020")
+    )
+
+
+def test_fallback_to_full_document_when_fast_path_misses():
+    html = SAMPLE_HTML.replace("calendar calendar__table", "calendar")
+    assert _slice_calendar_table(html) is None
+    recs = parse_calendar_from_html(html, "http://example.com/2020")
+    assert [r["Event"] for r in recs] == ["Protocol Upgrade"]
+
+
+def test_rows_not_matching_column_layout_fall_back_to_cell_scan():
+    # the second row has an extra leading cell, so it does not fit the layout
+    # resolved from the first row and is scanned cell by cell instead
+    html = WEEK_HTML.replace(
+        '<td class="calendar__date"></td>',
+        '<td class="calendar__date"></td><td class="calendar__extra">x</td>',
+    )
+    recs = parse_calendar_from_html(
+        html, "https://www.forexfactory.com/calendar?week=Dec29.2019"
+    )
+    assert [(r["Time"], r["Currency"], r["Event"]) for r in recs[:2]] == [
+        ("31/12/2019 08:30", "USD", "Pending Home Sales"),
+        ("31/12/2019 10:00", "USD", "CB Consumer Confidence"),
+    ]
+
+
+def test_impact_normalization_from_classes_and_attributes():
+    soup = make_soup(
+        '<td class="calendar__impact">'
+        '<span class="icon icon--ff-impact-red"></span>'
+        '<img src="/img/impact-ora.png">'
+        '<span title="Low Impact Expected" class="yel"></span>'
+        "<span>none</span>"
+        "</td>"
+    )
+    nodes = soup.find_all(["span", "img"])
+    assert [_normalize_impact_value(n) for n in nodes] == [
+        "high",
+        "medium",
+        "low",
+        "n/a",
+    ]
+    assert _find_impact_node(soup.td) is nodes[0]
+
+
+def test_records_to_dataframe_export():
+    pytest.importorskip("pandas")
+    recs = parse_calendar_from_html(SAMPLE_HTML, "http://example.com/2020")
+    df = records_to_dataframe(recs)
+    assert list(df["Event"]) == ["Protocol Upgrade"]
+    assert df.to_dict(orient="records") == recs
@@ -0,0 +1,196 @@
+import importlib
+import threading
+import time as clock
+from datetime import time
+
+import pytest
+
+from src.scrapper import _cache
+from src.scrapper._cache import RecordCache, query_cached_records
+from src.scrapper._parser import parse_calendar_from_html
+from src.scrapper._query import RecordQuery
+from src.scrapper._singleflight import SingleFlight
+
+main = importlib.import_module("main")
+src_app = importlib.import_module("src.app")
+app = main.app
+
+RECORDS = [
+    {
+        "Time": "01/01/2020 08:30",
+        "Currency": "USD",
+        "Event": "Nonfarm Payrolls",
+        "Impact": "high",
+    },
+    {
+        "Time": "01/01/2020 09:00",
+        "Currency": "EUR",
+        "Event": "CPI y/y",
+        "Impact": "medium",
+    },
+    {
+        "Time": "01/01/2020 14:00",
+        "Currency": "usd",
+        "Event": "FOMC Statement",
+        "Impact": "high",
+    },
+    {
+        "Time": "01/01/2020 16:00",
+        "Currency": "JPY",
+        "Event": "Trade Balance",
+        "Impact": "low",
+    },
+]
+
+PAGE_HTML = """
+<table class="calendar__table"><tbody>
+  <tr class="calendar__row calendar__row--new-day" data-event-id="1">
+    <td class="calendar__date"><span class="date">Wed <span>Jan 1</span></span></td>
+    <td class="calendar__time">8:30am</td>
+    <td class="calendar__currency">USD</td>
+    <td class="calendar__event">Nonfarm Payrolls</td>
+  </tr>
+  <tr class="calendar__row" data-event-id="2">
+    <td class="calendar__date"></td>
+    <td class="calendar__time">9:00am</td>
+    <td class="calendar__currency">EUR</td>
+    <td class="calendar__event">CPI y/y</td>
+  </tr>
+  <tr class="calendar__row" data-event-id="3">
+    <td class="calendar__date"></td>
+    <td class="calendar__time"></td>
+    <td class="calendar__currency">EUR</td>
+    <td class="calendar__event">Core CPI y/y</td>
+  </tr>
+</tbody></table>
+"""
+
+
+def test_select_filters_and_pages_in_one_pass():
+    query = RecordQuery(currency=["usd"], impact=["HIGH"], limit=1, offset=1)
+    total, page = query.select(RECORDS)
+    assert total == 2
+    assert [r["Event"] for r in page] == ["FOMC Statement"]
+
+    query = RecordQuery(event="cpi", time_from=time(9, 0), time_to=time(15, 0))
+    assert [r["Event"] for r in query.select(RECORDS)[1]] == ["CPI y/y"]
+
+    # no filters and no paging: the list itself, not a copy
+    assert RecordQuery().select(RECORDS)[1] is RECORDS
+
+
+def test_parser_skips_rows_rejected_by_query():
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    recs = parse_calendar_from_html(PAGE_HTML, url, query=RecordQuery(currency=["EUR"]))
+    # a row without its own time still inherits the one of the skipped rows before it
+    assert [(r["ID"], r["Time"]) for r in recs] == [
+        ("2", "01/01/2020 09:00"),
+        ("3", "01/01/2020 09:00"),
+    ]
+
+
+def test_query_pushed_into_loader_when_nothing_reuses_the_page(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=0))
+    monkeypatch.setattr(_cache, "get_event_store", lambda: None)
+    seen = []
+
+    def loader(url, query=None):
+        seen.append(query)
+        return [r for r in RECORDS if query is None or query.matches(r)]
+
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    total, page = query_cached_records(
+        url, RecordQuery(currency=["USD"], limit=1), loader
+    )
+    assert total == 2 and len(page) == 1
+    assert seen[0].currency == {"USD"} and seen[0].limit is None
+
+
+def test_pushed_down_query_coalesces_concurrent_misses(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=0))
+    monkeypatch.setattr(_cache, "get_event_store", lambda: None)
+    flight = SingleFlight()
+    monkeypatch.setattr(_cache, "record_flight", flight)
+    release = threading.Event()
+    calls = []
+
+    def loader(url, query=None):
+        calls.append(query.filter_key)
+        release.wait(5)
+        return [r for r in RECORDS if query.matches(r)]
+
+    url = "https://www.forexfactory.com/calendar?day=Jan1.2020"
+    results = []
+
+    def request(currency):
+        results.append(
+            query_cached_records(url, RecordQuery(currency=[currency]), loader)
+        )
+
+    threads = [threading.Thread(target=request, args=("USD",)) for _ in range(20)]
+    threads.append(threading.Thread(target=request, args=("EUR",)))
+    for t in threads:
+        t.start()
+    deadline = clock.monotonic() + 5
+    while flight.stats()["coalesced"] < 19 and clock.monotonic() < deadline:
+        clock.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert not any(t.is_alive() for t in threads)
+    # one load per distinct set of filters
+    assert sorted(min(c[0]) for c in calls) == ["EUR", "USD"]
+    assert results.count((2, [RECORDS[0], RECORDS[2]])) == 20
+    assert results.count((1, [RECORDS[1]])) == 1
+
+
+@pytest.mark.parametrize("cache_entries", [0, 8])
+def test_crypto_currency_filter_same_with_and_without_cache(monkeypatch, cache_entries):
+    crypto = importlib.import_module("src.scrapper.cryptoCraftScrapper")
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=cache_entries))
+    monkeypatch.setattr(_cache, "get_event_store", lambda: None)
+    monkeypatch.setattr(crypto, "get_page_html", lambda url: PAGE_HTML)
+    url = "https://www.cryptocraft.com/calendar?day=Jan1.2020"
+    total, page = crypto.query_records(url, RecordQuery(currency=["EUR"], limit=1))
+    assert total == 2
+    assert [(r["Event"], r["Time"], r["Page"]) for r in page] == [
+        ("CPI y/y", "01/01/2020 09:00", url)
+    ]
+    assert page[0]["Currency"] == "EUR"
+
+    async def page_html(url):
+        return PAGE_HTML
+
+    # the range route filters what (async_)get_records returns
+    monkeypatch.setattr(crypto, "async_get_page_html", page_html)
+    resp = app.test_client().get(
+        "/api/cryptocraft/range?start=2020-01-01&end=2020-01-01&currency=EUR"
+    )
+    data = resp.get_json()
+    assert data["total"] == 2
+    assert "Currency" not in data["results"][0]
+
+
+def test_daily_route_filters(monkeypatch):
+    monkeypatch.setattr(main, "get_records", lambda url: RECORDS)
+    monkeypatch.setattr(main, "get_url", lambda d, m, y, t: "http://example")
+    client = app.test_client()
+
+    resp = client.get(
+        "/api/forex/daily?day=1&month=1&year=2020&currency=USD&impact=high&limit=1"
+    )
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["total"] == 2
+    assert [r["Event"] for r in data["results"]] == ["Nonfarm Payrolls"]
+
+    resp = client.get("/api/metalsmine/daily?day=1&month=1&year=2020&time_from=13:00")
+    assert [r["Event"] for r in resp.get_json()["results"]] == [
+        "FOMC Statement",
+        "Trade Balance",
+    ]
+
+    for bad in ("impact=extreme", "time_from=9am", "time_from=10:00&time_to=09:00"):
+        resp = client.get(f"/api/forex/daily?day=1&month=1&year=2020&{bad}")
+        assert resp.status_code == 400
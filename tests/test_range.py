@@ -0,0 +1,241 @@
+import importlib
+import json
+from datetime import date, timedelta
+
+from src.scrapper._async_http import iter_async
+from src.scrapper._range import (
+    async_iter_range_records,
+    fetch_pages,
+    fetch_range,
+    iter_range_records,
+    plan_pages,
+)
+from src.scrapper._utils import page_span
+
+main = importlib.import_module("main")
+src_app = importlib.import_module("src.app")
+app = main.app
+
+
+def _fake_url(day, month, year, timeline):
+    return f"http://example/{timeline}/{year}-{month:02d}-{day:02d}"
+
+
+def _fake_records(url):
+    # one late and one early record per covered day, returned out of order
+    timeline, ymd = url.rsplit("/", 2)[1:]
+    first, last = page_span(timeline, date.fromisoformat(ymd))
+    records = []
+    for i in range((last - first).days + 1):
+        d = first + timedelta(days=i)
+        records.append({"Time": f"{d:%d/%m/%Y} 15:00", "Event": f"late {d}"})
+        records.append({"Time": f"{d:%d/%m/%Y} 08:30", "Event": f"early {d}"})
+    return records
+
+
+def _patch(monkeypatch, get_records=_fake_records):
+    for mod in (src_app, main):
+        monkeypatch.setattr(mod, "get_records", get_records)
+        monkeypatch.setattr(mod, "get_url", _fake_url)
+
+
+def test_plan_pages_days():
+    pages = plan_pages(date(2020, 1, 30), date(2020, 2, 1), timelines=("day",))
+    assert [d for _, d in pages] == [
+        date(2020, 1, 30),
+        date(2020, 1, 31),
+        date(2020, 2, 1),
+    ]
+
+
+def test_plan_pages_prefers_fewest_pages():
+    # a single day stays a day page
+    assert plan_pages(date(2020, 1, 8), date(2020, 1, 8)) == [("day", date(2020, 1, 8))]
+    # three days inside one Sunday-based week -> one week page
+    assert plan_pages(date(2020, 1, 6), date(2020, 1, 8)) == [
+        ("week", date(2020, 1, 5))
+    ]
+    # a whole year -> twelve month pages
+    pages = plan_pages(date(2020, 1, 1), date(2020, 12, 31))
+    assert pages == [("month", date(2020, m, 1)) for m in range(1, 13)]
+    # partial months are covered by month/week pages, never more than needed
+    assert plan_pages(date(2020, 1, 15), date(2020, 3, 3)) == [
+        ("month", date(2020, 1, 1)),
+        ("month", date(2020, 2, 1)),
+        ("week", date(2020, 3, 1)),
+    ]
+
+
+def test_fetch_range_merges_in_time_order():
+    records = fetch_range(_fake_records, _fake_url, date(2020, 1, 1), date(2020, 1, 3))
+    assert [r["Event"] for r in records] == [
+        "early 2020-01-01",
+        "late 2020-01-01",
+        "early 2020-01-02",
+        "late 2020-01-02",
+        "early 2020-01-03",
+        "late 2020-01-03",
+    ]
+
+
+def test_forex_range_success(monkeypatch):
+    seen = []
+
+    def get_records(url):
+        seen.append(url)
+        return _fake_records(url)
+
+    _patch(monkeypatch, get_records)
+    client = app.test_client()
+    resp = client.get(
+        "/api/forex/range?start=2020-01-01&end=2020-01-05&limit=3&offset=1"
+    )
+    assert resp.status_code == 200
+    data = resp.get_json()
+    # Jan 1-5 2020 spans two weeks, so one month page covers it
+    assert seen == ["http://example/month/2020-01-01"]
+    assert data["start"] == "2020-01-01"
+    assert data["end"] == "2020-01-05"
+    assert data["total"] == 10
+    assert data["offset"] == 1
+    assert data["limit"] == 3
+    assert [r["Event"] for r in data["results"]] == [
+        "late 2020-01-01",
+        "early 2020-01-02",
+        "late 2020-01-02",
+    ]
+
+
+def test_cryptocraft_range_normalizes(monkeypatch):
+    _patch(monkeypatch)
+    client = app.test_client()
+    resp = client.get("/api/cryptocraft/range?start=2020-01-01&end=2020-01-01")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["total"] == 2
+    assert set(data["results"][0]) == {
+        "Impact",
+        "Event",
+        "Actual",
+        "Forecast",
+        "Previous",
+        "Time",
+    }
+
+
+def test_range_invalid_params(monkeypatch):
+    _patch(monkeypatch)
+    client = app.test_client()
+    for site in ("forex", "cryptocraft", "energyexch", "metalsmine"):
+        assert client.get(f"/api/{site}/range").status_code == 400
+        resp = client.get(f"/api/{site}/range?start=2020-01-05&end=2020-01-01")
+        assert resp.status_code == 400
+        resp = client.get(f"/api/{site}/range?start=2020-1-5&end=bad")
+        assert resp.status_code == 400
+        resp = client.get(f"/api/{site}/range?start=2018-01-01&end=2020-01-01")
+        assert resp.status_code == 400
+
+
+def test_iter_range_records_matches_fetch_range():
+    start, end = date(2020, 1, 15), date(2020, 3, 3)
+    assert list(
+        iter_range_records(_fake_records, _fake_url, start, end)
+    ) == fetch_range(_fake_records, _fake_url, start, end)
+
+
+def test_overlapping_week_and_month_pages_do_not_duplicate_records():
+    # both ranges cross a month boundary and a Sunday week boundary; the
+    # planner picks a week page that shares days with a month page
+    for start, end in (
+        (date(2019, 1, 1), date(2019, 2, 2)),
+        (date(2020, 1, 29), date(2020, 2, 29)),
+    ):
+        pages = plan_pages(start, end)
+        assert {timeline for timeline, _ in pages} == {"week", "month"}
+        records = fetch_range(_fake_records, _fake_url, start, end)
+        events = [r["Event"] for r in records]
+        days = (end - start).days + 1
+        assert len(events) == len(set(events)) == 2 * days
+        assert list(iter_range_records(_fake_records, _fake_url, start, end)) == records
+
+
+def test_async_iter_range_records_streams_like_fetch_range():
+    start, end = date(2020, 1, 29), date(2020, 2, 29)
+    started = []
+
+    async def get_records(url):
+        started.append(url)
+        return _fake_records(url)
+
+    stream = iter_async(async_iter_range_records(get_records, _fake_url, start, end))
+    assert list(stream) == fetch_range(_fake_records, _fake_url, start, end)
+
+    started.clear()
+    stream = iter_async(
+        async_iter_range_records(
+            get_records, _fake_url, date(2020, 1, 1), date(2020, 1, 10), 2
+        )
+    )
+    next(stream)
+    stream.close()
+    # the first page, the one in flight beside it and the refill: never all ten
+    assert len(started) <= 3
+
+
+def test_fetch_pages_bounds_pages_in_flight():
+    started = []
+
+    def get_records(url):
+        started.append(url)
+        return [url]
+
+    pages = [("day", date(2020, 1, d)) for d in range(1, 11)]
+    gen = fetch_pages(get_records, _fake_url, pages, max_workers=2)
+    assert next(gen) == [_fake_url(1, 1, 2020, "day")]
+    gen.close()
+    # the first page, the one in flight beside it and the refill: never all ten
+    assert len(started) <= 3
+
+
+def test_range_streams_ndjson(monkeypatch):
+    seen = []
+
+    def get_records(url):
+        seen.append(url)
+        return _fake_records(url)
+
+    _patch(monkeypatch, get_records)
+    client = app.test_client()
+    resp = client.get(
+        "/api/forex/range?start=2020-01-15&end=2020-03-03&stream=1&offset=1&limit=2"
+    )
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.data.decode().splitlines()]
+    assert [r["Event"] for r in lines] == ["late 2020-01-15", "early 2020-01-16"]
+
+    resp = client.get(
+        "/api/cryptocraft/range?start=2020-01-01&end=2020-01-01",
+        headers={"Accept": "application/x-ndjson"},
+    )
+    lines = [json.loads(line) for line in resp.data.decode().splitlines()]
+    assert len(lines) == 2 and "Impact" in lines[0]
+
+
+def test_range_stream_uses_async_scraper(monkeypatch):
+    forex = importlib.import_module("src.scrapper.forexFactoryScrapper")
+    seen = []
+
+    async def fake_async_get_records(url):
+        seen.append(url)
+        return [{"Time": "02/01/2020 10:00", "Event": "PMI"}]
+
+    monkeypatch.setattr(forex, "async_get_records", fake_async_get_records)
+    resp = app.test_client().get(
+        "/api/forex/range?start=2020-01-02&end=2020-01-02&stream=1"
+    )
+    assert resp.status_code == 200
+    assert [json.loads(line)["Event"] for line in resp.data.decode().splitlines()] == [
+        "PMI"
+    ]
+    assert seen == [forex.get_url(2, 1, 2020, "day")]
@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import sqlite3
+import zipfile
+
+from src import reparse
+from src.scrapper._snapshots import SnapshotStore
+
+PAGE_HTML = """
+<table class="calendar calendar__table">
+  <tr class="calendar__row--new-day">
+    <td colspan="6"><span class="date">Jan 1, 2020</span></td>
+  </tr>
+  <tbody>
+    <tr>
+      <td>00:00</td>
+      <td>BTC</td>
+      <td>
+        <div class="calendar__event">
+          <div class="calendar__event-title">Protocol Upgrade</div>
+        </div>
+      </td>
+      <td>n/a</td>
+      <td>n/a</td>
+      <td>n/a</td>
+    </tr>
+  </tbody>
+</table>
+"""
+
+
+def _write_pages(root):
+    os.makedirs(root / "2020")
+    (root / "2020" / "jan1.html").write_text(PAGE_HTML)
+    (root / "2020" / "jan2.html.gz").write_bytes(gzip.compress(PAGE_HTML.encode()))
+    (root / "notes.txt").write_text("not a page")
+
+
+def test_reparse_directory_to_ndjson(tmp_path):
+    _write_pages(tmp_path / "pages")
+    out = tmp_path / "out.ndjson"
+    seen = []
+
+    summary = reparse.reparse(
+        str(tmp_path / "pages"), str(out), "ndjson", workers=2, report=seen.append
+    )
+
+    assert summary["files"] == 2 and summary["failed"] == 0
+    assert summary["records"] == 2
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [rec["Url"] for rec in lines] == ["2020/jan1.html", "2020/jan2.html.gz"]
+    assert lines[0]["Event"] == "Protocol Upgrade"
+    assert all(r["seconds"] >= 0 and r["bytes"] > 0 for r in seen)
+
+
+def test_reparse_zip_to_sqlite(tmp_path):
+    archive = tmp_path / "pages.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("2020/jan1.html", PAGE_HTML)
+        zf.writestr("2020/broken.html.gz", b"not gzip")
+    out = tmp_path / "out.sqlite3"
+
+    summary = reparse.reparse(str(archive), str(out), "sqlite", workers=1)
+
+    assert summary["files"] == 2 and summary["failed"] == 1
+    rows = sqlite3.connect(out).execute("SELECT url, event FROM records").fetchall()
+    assert rows == [("2020/jan1.html", "Protocol Upgrade")]
+
+
+def test_collect_tasks_uses_latest_snapshot_per_url(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip")
+    store.save(
+        "https://example.com/calendar?day=jan1.2020", "<p>old</p>", fetched_at=1.0
+    )
+    store.save("https://example.com/calendar?day=jan1.2020", PAGE_HTML, fetched_at=2.0)
+
+    [task] = list(reparse.collect_tasks(str(tmp_path)))
+    result = reparse.reparse_task(task)
+
+    assert result["url"].endswith("jan1.2020")
+    assert result["records"][0]["Event"] == "Protocol Upgrade"
+
+
+def test_main_reports_totals(tmp_path, capsys):
+    _write_pages(tmp_path / "pages")
+    out = tmp_path / "out.db"
+
+    assert reparse.main([str(tmp_path / "pages"), "-o", str(out), "-j", "1"]) == 0
+    err = capsys.readouterr().err
+    assert "2 files (0 failed), 2 records" in err
+    assert "rows/s" in err
+    assert (
+        sqlite3.connect(out).execute("SELECT COUNT(*) FROM records").fetchone()[0] == 2
+    )
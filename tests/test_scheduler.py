@@ -0,0 +1,123 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from src.scrapper import _cache
+from src.scrapper._cache import RecordCache, cached_records, refresh_cached_records
+from src.scrapper._scheduler import LeaderLock, PrefetchScheduler, hot_pages
+from src.scrapper._store import EventStore
+from src.scrapper._utils import build_url
+
+NOW = datetime(2020, 1, 8, 12, 0)  # a Wednesday
+
+
+def _fake_site(records=None, fail=False):
+    calls = []
+
+    def refresh_records(url, ttl=None):
+        calls.append(url)
+        if fail:
+            raise RuntimeError("upstream down")
+        return records or []
+
+    site = SimpleNamespace(
+        get_url=lambda day, month, year, timeline: build_url(
+            "https://example.com/calendar", day, month, year, timeline
+        ),
+        refresh_records=refresh_records,
+    )
+    return site, calls
+
+
+def test_hot_pages_cover_today_tomorrow_and_week():
+    assert hot_pages(NOW.date()) == [
+        ("day", date(2020, 1, 8)),
+        ("day", date(2020, 1, 9)),
+        ("week", date(2020, 1, 5)),
+    ]
+
+
+def test_run_once_refreshes_every_site_and_survives_failures():
+    ok, ok_calls = _fake_site()
+    bad, bad_calls = _fake_site(fail=True)
+    scheduler = PrefetchScheduler(sites=[ok, bad], clock=lambda: NOW)
+    scheduler.run_once()
+    assert ok_calls == [
+        "https://example.com/calendar?day=Jan8.2020",
+        "https://example.com/calendar?day=Jan9.2020",
+        "https://example.com/calendar?week=Jan5.2020",
+    ]
+    assert len(bad_calls) == 3
+    assert scheduler.stats()["failures"] == 3
+
+
+def test_next_delay_shortens_around_releases():
+    scheduler = PrefetchScheduler(
+        sites=[], interval=300, hot_interval=30, hot_window=600, clock=lambda: NOW
+    )
+    assert scheduler.next_delay([]) == 300
+    assert scheduler.next_delay([datetime(2020, 1, 8, 12, 5)]) == 30
+    # next release at 12:14 -> hot window opens at 12:04, i.e. in 240 s
+    assert scheduler.next_delay([datetime(2020, 1, 8, 12, 14)]) == 240
+    assert scheduler.next_delay([datetime(2020, 1, 8, 9, 0)]) == 300
+
+
+def test_refresh_bypasses_the_cache(monkeypatch):
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=8))
+    version = {"n": 0}
+
+    def loader(url):
+        version["n"] += 1
+        return [{"Actual": version["n"]}]
+
+    url = "https://www.forexfactory.com/calendar?day=Jan8.2020"
+    assert cached_records(url, loader) == [{"Actual": 1}]
+    assert refresh_cached_records(url, loader) == [{"Actual": 2}]
+    assert cached_records(url, loader) == [{"Actual": 2}]
+
+
+def test_refresh_keeps_entries_until_the_next_run(monkeypatch):
+    now = {"t": 0.0}
+    monkeypatch.setattr(
+        _cache, "record_cache", RecordCache(max_entries=8, clock=lambda: now["t"])
+    )
+    url = "https://www.forexfactory.com/calendar?day=Jan8.2099"
+    refresh_cached_records(url, lambda u: [{"Actual": 1}], ttl=600)
+    now["t"] = 300.0  # past the default 60 s TTL
+    assert _cache.record_cache.get(_cache.parse_page_url(url)) == [{"Actual": 1}]
+
+
+def test_refreshed_pages_are_served_from_the_store_while_fresh(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    key = ("www.forexfactory.com", "day", date(2099, 1, 8))
+    records = [{"ID": "1", "Time": "08/01/2099 10:00", "Event": "CPI"}]
+    store.save_page(key, records, fetched_at=1000.0, fresh_for=600)
+    assert store.load_page(key, now=1500.0) == records
+    assert store.load_page(key, now=1700.0) is None
+    # plain saves of live pages are not shared
+    store.save_page(key, records, fetched_at=1000.0)
+    assert store.load_page(key, now=1001.0) is None
+
+
+def test_only_one_process_holds_the_leader_lock(tmp_path):
+    path = str(tmp_path / "prefetch.lock")
+    first, second = LeaderLock(path), LeaderLock(path)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_standby_scheduler_does_not_refresh(tmp_path):
+    path = str(tmp_path / "prefetch.lock")
+    leader = LeaderLock(path)
+    assert leader.acquire()
+    site, calls = _fake_site()
+    scheduler = PrefetchScheduler(
+        sites=[site], interval=60, clock=lambda: NOW, lock=LeaderLock(path)
+    )
+    scheduler.start()
+    scheduler.stop(timeout=5)
+    assert calls == []
+    assert scheduler.stats()["leader"] is False
+    leader.release()
@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from src.scrapper import _http, _snapshots
+from src.scrapper._snapshots import SnapshotStore, resolve_codec
+
+URL = "https://www.forexfactory.com/calendar?day=jan1.2020"
+
+SAMPLE_HTML = """
+<table class="calendar calendar__table">
+  <tr class="calendar__row--new-day">
+    <td colspan="6"><span class="date">Jan 1, 2020</span></td>
+  </tr>
+  <tbody>
+    <tr>
+      <td>00:00</td>
+      <td>BTC</td>
+      <td>
+        <div class="calendar__event">
+          <div class="calendar__event-title">Protocol Upgrade</div>
+        </div>
+      </td>
+      <td>n/a</td>
+      <td>n/a</td>
+      <td>n/a</td>
+    </tr>
+  </tbody>
+</table>
+"""
+
+
+def test_save_and_load_deduplicates_content(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip")
+    first = store.save(URL, SAMPLE_HTML, fetched_at=1.0)
+    second = store.save(URL, SAMPLE_HTML, fetched_at=2.0)
+
+    assert first == second
+    assert store.load(first) == SAMPLE_HTML
+    assert store.latest(URL) == SAMPLE_HTML
+    stats = store.stats()
+    # an unchanged re-fetch only moves the snapshot's fetch time
+    assert stats["snapshots"] == 1 and stats["blobs"] == 1
+    assert stats["bytes"] < stats["raw_bytes"]
+    assert [e[1] for e in store.entries(url=URL, since=1.5)] == [2.0]
+
+    # the same content under another URL shares the blob
+    store.save(URL + "&v=2", SAMPLE_HTML, fetched_at=3.0)
+    stats = store.stats()
+    assert stats["snapshots"] == 2 and stats["blobs"] == 1
+
+
+def test_eviction_drops_oldest_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip", max_bytes=1)
+    old = store.save(URL, SAMPLE_HTML, fetched_at=1.0)
+    new = store.save(URL + "&v=2", SAMPLE_HTML.replace("BTC", "ETH"), fetched_at=2.0)
+
+    # the cap is below one blob: everything but the newest snapshot goes
+    assert [e[2] for e in store.entries()] == [new]
+    with pytest.raises(KeyError):
+        store.load(old)
+    assert store.load(new).count("ETH") == 1
+
+
+def test_eviction_runs_for_known_blobs_and_caps_rows(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip", max_bytes=1)
+    for i in range(50):
+        store.save(f"{URL}&v={i}", SAMPLE_HTML, fetched_at=float(i))
+    assert [e[0] for e in store.entries()] == [f"{URL}&v=49"]
+
+    store = SnapshotStore(str(tmp_path / "rows"), codec="gzip", max_snapshots=3)
+    for i in range(10):
+        store.save(URL, SAMPLE_HTML.replace("BTC", f"C{i}"), fetched_at=float(i))
+    assert [e[1] for e in store.entries()] == [7.0, 8.0, 9.0]
+    assert store.stats()["blobs"] == 3
+    blob_files = [f for _, _, files in os.walk(tmp_path / "rows") for f in files]
+    assert len([f for f in blob_files if f.endswith(".html.gz")]) == 3
+
+
+def test_evicted_blob_survives_a_concurrent_save_of_the_same_page(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip", max_snapshots=1)
+    other_process = SnapshotStore(str(tmp_path), codec="gzip", max_snapshots=0)
+    old = store.save(URL, SAMPLE_HTML, fetched_at=1.0)
+    remove_unreferenced = store._remove_unreferenced
+
+    def save_again_first(conn, blobs):
+        # another writer stores the evicted content between commit and cleanup
+        if blobs:
+            other_process.save(URL + "&v=3", SAMPLE_HTML, fetched_at=3.0)
+        remove_unreferenced(conn, blobs)
+
+    store._remove_unreferenced = save_again_first
+    store.save(URL + "&v=2", SAMPLE_HTML.replace("BTC", "ETH"), fetched_at=2.0)
+    assert store.load(old) == SAMPLE_HTML
+
+
+def test_failed_save_leaves_no_blob_file(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), codec="gzip")
+
+    def fail(conn, keep):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "_evict", fail)
+    with pytest.raises(RuntimeError):
+        store.save(URL, SAMPLE_HTML, fetched_at=1.0)
+    assert store.stats()["blobs"] == 0
+    assert [f for _, _, files in os.walk(tmp_path / "objects") for f in files] == []
+
+
+def test_replay_reparses_stored_pages(tmp_path):
+    store = SnapshotStore(str(tmp_path), codec="gzip")
+    store.save(URL, SAMPLE_HTML, fetched_at=1.0)
+
+    [(url, fetched_at, records)] = list(store.replay())
+    assert url == URL and fetched_at == 1.0
+    assert records[0]["Event"] == "Protocol Upgrade"
+
+
+def test_get_page_html_records_snapshot_when_enabled(tmp_path, monkeypatch):
+    class Resp:
+        text = SAMPLE_HTML
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def get(self, url, timeout):
+            return Resp()
+
+    monkeypatch.setattr(_snapshots, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(_snapshots, "_snapshot_store", None)
+    monkeypatch.setattr(
+        _http, "session_pool", _http.SessionPool(factory=lambda: Session())
+    )
+
+    assert _http.get_page_html(URL) == SAMPLE_HTML
+    assert _snapshots.get_snapshot_store().latest(URL) == SAMPLE_HTML
+
+
+def test_resolve_codec_rejects_unknown():
+    assert resolve_codec("gzip") == "gzip"
+    assert resolve_codec("auto") in ("zstd", "gzip")
+    with pytest.raises(ValueError):
+        resolve_codec("brotli")
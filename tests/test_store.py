@@ -0,0 +1,209 @@
+from datetime import date, datetime
+
+from src.scrapper import _cache, _store, common
+from src.scrapper._cache import RecordCache, cached_records
+from src.scrapper._store import EventStore, event_key
+
+SITE = "www.forexfactory.com"
+PAST = datetime(2020, 1, 10).timestamp()
+
+
+def _rec(event_id, time_str, currency="USD", impact="High", event="NFP"):
+    return {
+        "ID": event_id,
+        "Time": time_str,
+        "Currency": currency,
+        "Impact": impact,
+        "Event": event,
+        "Actual": "",
+        "Forecast": "",
+        "Previous": "",
+    }
+
+
+def test_event_key_falls_back_to_hash():
+    assert event_key({"ID": "123"}) == "123"
+    a = event_key({"Time": "01/01/2020 10:00", "Event": "CPI"})
+    b = event_key({"Time": "01/01/2020 10:00", "Event": "CPI"})
+    assert a == b and a.startswith("h:")
+
+
+def test_store_roundtrip_and_completeness(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    key = (SITE, "day", date(2020, 1, 5))
+    records = [_rec("2", "05/01/2020 14:30"), _rec("1", "05/01/2020 08:00")]
+
+    store.save_page(key, records, fetched_at=PAST)
+    assert store.is_complete(key)
+    loaded = store.load_page(key)
+    assert [r["ID"] for r in loaded] == ["1", "2"]
+
+    # a page fetched on its own day is still live and must go upstream again
+    live = (SITE, "day", date(2020, 1, 10))
+    store.save_page(live, [_rec("3", "10/01/2020 09:00")], fetched_at=PAST)
+    assert store.load_page(live) is None
+
+
+def test_store_upserts_by_event_id_and_filters(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    key = (SITE, "week", date(2020, 1, 5))
+    store.save_page(key, [_rec("1", "06/01/2020 10:00")], fetched_at=PAST)
+    updated = _rec("1", "06/01/2020 10:00")
+    updated["Actual"] = "1.2%"
+    store.save_page(
+        key,
+        [updated, _rec("2", "07/01/2020 10:00", currency="EUR", impact="Low")],
+        fetched_at=PAST,
+    )
+
+    rows = store.query(SITE, date(2020, 1, 5), date(2020, 1, 11))
+    assert [(r["ID"], r["Actual"]) for r in rows] == [("1", "1.2%"), ("2", "")]
+    assert [
+        r["ID"]
+        for r in store.query(SITE, date(2020, 1, 5), date(2020, 1, 11), currency="EUR")
+    ] == ["2"]
+    assert [
+        r["ID"]
+        for r in store.query(SITE, date(2020, 1, 5), date(2020, 1, 11), impact="High")
+    ] == ["1"]
+    assert store.query(SITE, date(2020, 1, 7), date(2020, 1, 7))[0]["ID"] == "2"
+
+
+def test_cached_records_serves_complete_pages_from_store(tmp_path, monkeypatch):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    monkeypatch.setattr(_store, "get_event_store", lambda: store)
+    monkeypatch.setattr(_cache, "get_event_store", lambda: store)
+    monkeypatch.setattr(_cache, "record_cache", RecordCache(max_entries=0))
+    calls = []
+
+    def loader(url):
+        calls.append(url)
+        return [_rec("9", "05/01/2020 12:00")]
+
+    url = "https://www.forexfactory.com/calendar?day=Jan5.2020"
+    first = cached_records(url, loader)
+    second = cached_records(url, loader)
+
+    assert len(calls) == 1
+    assert first[0]["ID"] == second[0]["ID"] == "9"
+    assert store.is_complete((SITE, "day", date(2020, 1, 5)))
+
+
+def test_save_page_writes_only_changed_records(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    key = (SITE, "day", date(2020, 1, 6))
+    records = [_rec("1", "06/01/2020 10:00"), _rec("2", "06/01/2020 12:00")]
+    assert store.save_page(key, records, fetched_at=PAST) == 2
+    cursor = store.current_revision()
+    assert store.save_page(key, records, fetched_at=PAST) == 0
+
+    released = dict(records[1], Actual="3.1%")
+    assert store.save_page(key, [records[0], released], fetched_at=PAST) == 1
+    changed, new_cursor = store.changes_since(
+        SITE, date(2020, 1, 6), date(2020, 1, 6), cursor
+    )
+    assert [(r["ID"], r["Actual"]) for r in changed] == [("2", "3.1%")]
+    assert new_cursor > cursor
+    assert (
+        store.changes_since(SITE, date(2020, 1, 6), date(2020, 1, 6), new_cursor)[0]
+        == []
+    )
+
+
+def test_events_missing_from_a_rescrape_get_tombstones(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    key = (SITE, "day", date(2020, 1, 6))
+    kept, dropped = _rec("1", "06/01/2020 10:00"), _rec("2", "06/01/2020 12:00")
+    store.save_page(key, [kept, dropped], fetched_at=PAST)
+    cursor = store.current_revision()
+
+    assert store.save_page(key, [kept], fetched_at=PAST) == 1
+    assert store.load_page(key) == [kept]
+    changes, cursor = store.changes_since(
+        SITE, date(2020, 1, 6), date(2020, 1, 6), cursor
+    )
+    assert changes == [{**dropped, "Removed": True}]
+
+    # an empty scrape removes nothing; a listed event comes back to life
+    assert store.save_page(key, [], fetched_at=PAST) == 0
+    assert store.save_page(key, [kept, dropped], fetched_at=PAST) == 1
+    assert store.load_page(key) == [kept, dropped]
+    changes, _ = store.changes_since(SITE, date(2020, 1, 6), date(2020, 1, 6), cursor)
+    assert changes == [dropped]
+
+
+def test_crypto_records_are_tracked_by_event_id(tmp_path):
+    import importlib
+
+    crypto = importlib.import_module("src.scrapper.cryptoCraftScrapper")
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    url = "https://www.cryptocraft.com/calendar?day=Jan6.2020"
+    key = ("www.cryptocraft.com", "day", date(2020, 1, 6))
+    raw = _rec("7", "06/01/2020 10:00", currency="BTC")
+    store.save_page(key, [crypto._get_crypto_object(raw, url)], fetched_at=PAST)
+    cursor = store.current_revision()
+
+    # a rescheduled event is an update, not a tombstone plus a new event
+    moved = crypto._get_crypto_object(dict(raw, Time="06/01/2020 14:00"), url)
+    assert store.save_page(key, [moved], fetched_at=PAST) == 1
+    changes, _ = store.changes_since(
+        "www.cryptocraft.com", date(2020, 1, 6), date(2020, 1, 6), cursor
+    )
+    assert changes == [moved]
+
+
+def test_daily_route_returns_delta_since_cursor(tmp_path, monkeypatch):
+    import importlib
+
+    main = importlib.import_module("main")
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    monkeypatch.setattr(common, "get_event_store", lambda: store)
+    key = (SITE, "day", date(2020, 1, 6))
+    store.save_page(key, [_rec("1", "06/01/2020 10:00")], fetched_at=PAST)
+    cursor = store.current_revision()
+    store.save_page(key, [_rec("1", "06/01/2020 10:00", event="CPI")], fetched_at=PAST)
+
+    monkeypatch.setattr(main, "get_records", lambda url: [])
+    monkeypatch.setattr(
+        main,
+        "get_url",
+        lambda d, m, y, t: "https://www.forexfactory.com/calendar?day=Jan6.2020",
+    )
+    client = main.app.test_client()
+    resp = client.get(f"/api/forex/daily?day=6&month=1&year=2020&since={cursor}")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["since"] == cursor and body["cursor"] == cursor + 1
+    assert [r["Event"] for r in body["results"]] == ["CPI"]
+
+    monkeypatch.setattr(common, "get_event_store", lambda: None)
+    resp = client.get("/api/forex/daily?day=6&month=1&year=2020&since=0")
+    assert resp.status_code == 400
+
+
+def test_cryptocraft_delta_keeps_ids_and_tombstones(tmp_path, monkeypatch):
+    import importlib
+
+    main = importlib.import_module("main")
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    monkeypatch.setattr(common, "get_event_store", lambda: store)
+    url = "https://www.cryptocraft.com/calendar?day=Jan6.2020"
+    key = ("www.cryptocraft.com", "day", date(2020, 1, 6))
+    kept = _rec("1", "06/01/2020 10:00", currency="BTC", event="Halving")
+    dropped = _rec("2", "06/01/2020 12:00", currency="ETH", event="Upgrade")
+    store.save_page(key, [kept, dropped], fetched_at=PAST)
+    cursor = store.current_revision()
+    store.save_page(key, [dict(kept, Actual="done")], fetched_at=PAST)
+
+    monkeypatch.setattr(main, "get_records", lambda url: [])
+    monkeypatch.setattr(main, "get_url", lambda d, m, y, t: url)
+    resp = main.app.test_client().get(
+        f"/api/cryptocraft/daily?day=6&month=1&year=2020&since={cursor}"
+    )
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [(r["ID"], r["Event"], r.get("Removed")) for r in results] == [
+        ("1", "Halving", None),
+        ("2", "Upgrade", True),
+    ]
+    assert "Currency" not in results[0]